@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    '''
+    Двухуровневый кэш токенов: ограниченный LRU в памяти процесса
+    поверх общего кэша. Локальные записи живут недолго, чтобы удаление
+    токена в другом воркере вступало в силу не позже чем через
+    TOKEN_CACHE_LOCAL_TIMEOUT секунд.
+    '''
+
+    def __init__(self):
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    @staticmethod
+    def cache_key(key) -> str:
+        return 'auth:token:v3:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def _store_local(self, key, token) -> None:
+        expires = time.monotonic() + settings.TOKEN_CACHE_LOCAL_TIMEOUT
+        with self.lock:
+            self.local[key] = (token, expires)
+            self.local.move_to_end(key)
+            while len(self.local) > settings.TOKEN_CACHE_SIZE:
+                self.local.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            token, expires = self.local.get(key, (None, 0))
+            if token is not None and expires > time.monotonic():
+                self.local.move_to_end(key)
+                self.counters['local_hits'] += 1
+                return token
+
+        token = cache.get(self.cache_key(key))
+        with self.lock:
+            self.counters['misses' if token is None else 'shared_hits'] += 1
+        if token is not None:
+            self._store_local(key, token)
+        return token
+
+    def set(self, key, token) -> None:
+        cache.set(self.cache_key(key), token, settings.TOKEN_CACHE_TIMEOUT)
+        self._store_local(key, token)
+
+    def invalidate(self, key) -> None:
+        cache.delete(self.cache_key(key))
+        with self.lock:
+            self.local.pop(key, None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(self.counters)
+            size = len(self.local)
+        total = sum(stats.values())
+        hits = stats.get('local_hits', 0) + stats.get('shared_hits', 0)
+        stats['hit_rate'] = hits / total if total else 0.0
+        stats['size'] = size
+        return stats
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    '''
+    TokenAuthentication без запроса к базе на каждый вызов API.
+    В token_cache лежит только id активного пользователя; на каждый
+    запрос собираются новые объекты токена и пользователя, остальные
+    поля пользователя загружаются из базы при первом обращении.
+    '''
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, {'user_id': user.pk})
+            return (user, token)
+
+        user = get_user_model().from_db(
+            None, ['id', 'is_active'], [entry['user_id'], True]
+        )
+        token = self.get_model().from_db(
+            None, ['key', 'user_id'], [key, entry['user_id']]
+        )
+        token.user = user
+        return (user, token)
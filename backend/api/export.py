@@ -0,0 +1,91 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+
+from recipes.models import ChangeLog, Recipe, Step
+
+from .projections import (RECIPE_COLUMNS, file_url, load_images,
+                          load_ingredients, load_tags)
+from .renderers import ORJSONRenderer
+from .serializers import from_minutes
+
+EXPORT_COLUMNS = RECIPE_COLUMNS + ('author__username', 'video')
+
+_renderer = ORJSONRenderer()
+
+
+def load_steps(recipe_ids) -> dict:
+    step_ingredients = defaultdict(list)
+    for step_id, ingredient_id in Step.ingredients.through.objects.filter(
+        step__recipe_id__in=recipe_ids
+    ).order_by('id').values_list('step_id', 'ingredient_id'):
+        step_ingredients[step_id].append(ingredient_id)
+
+    steps = defaultdict(list)
+    for step in Step.objects.filter(recipe_id__in=recipe_ids).order_by(
+        'serial_num', 'id'
+    ).values('id', 'recipe_id', 'serial_num', 'title', 'description', 'note'):
+        steps[step['recipe_id']].append({
+            'serial_num': step['serial_num'],
+            'title': step['title'],
+            'description': step['description'],
+            'note': step['note'],
+            'ingredients': step_ingredients[step['id']],
+        })
+    return steps
+
+
+def export_chunk(rows, request=None):
+    recipe_ids = [row['id'] for row in rows]
+    images = load_images(request, recipe_ids)
+    tags = load_tags(recipe_ids)
+    ingredients = load_ingredients(request, recipe_ids)
+    steps = load_steps(recipe_ids)
+
+    for row in rows:
+        yield _renderer.render({
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'servings': row['servings'],
+            'cooking_time': from_minutes(row['cooking_time']),
+            'cuisine': row['cuisine__name'],
+            'author': {
+                'id': row['author_id'],
+                'username': row['author__username'],
+            },
+            'created': row['created'],
+            'video': file_url(request, row['video']),
+            'images': images[row['id']],
+            'tags': tags[row['id']],
+            'ingredients': ingredients[row['id']],
+            'steps': steps[row['id']],
+        }) + b'\n'
+
+
+def export_recipes(request=None, since=None, chunk_size=None):
+    '''
+    Весь каталог рецептов в формате NDJSON, по строке на рецепт,
+    в порядке создания. Рецепты читаются серверным курсором, связанные
+    данные подгружаются пачками по chunk_size, поэтому память
+    не растёт с размером каталога. since оставляет только рецепты,
+    созданные или изменённые (по журналу ChangeLog) позже этой даты;
+    удалённые рецепты в выгрузку не попадают, их отдаёт /api/sync/.
+    '''
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    queryset = Recipe.objects.order_by('created', 'id')
+    if since is not None:
+        queryset = queryset.filter(
+            Q(created__gt=since) | Q(pk__in=ChangeLog.objects.filter(
+                kind=ChangeLog.RECIPE, created__gt=since
+            ).values('object_id'))
+        )
+    rows = queryset.values(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield from export_chunk(chunk, request)
@@ -0,0 +1,96 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from recipes.models import MIN_COOKING_TIME, Recipe
+
+from .filters import normalize_query
+from .serializers import from_minutes
+
+
+def cache_key(query) -> str:
+    return 'api:facets:' + hashlib.sha256(
+        normalize_query(query).encode()
+    ).hexdigest()
+
+
+def cooking_time_buckets() -> list:
+    '''Границы интервалов времени приготовления в минутах: [от, до).'''
+    bounds = [MIN_COOKING_TIME, *settings.FACETS_COOKING_TIME_BOUNDS]
+    return list(zip(bounds, bounds[1:] + [None]))
+
+
+def relation_counts(queryset, field) -> list:
+    '''Число рецептов по значениям связи many-to-many, один запрос.'''
+    relation = Recipe._meta.get_field(field)
+    target = relation.m2m_reverse_field_name()
+    return [
+        {'id': row[f'{target}_id'], 'name': row[f'{target}__name'],
+         'count': row['count']}
+        for row in relation.remote_field.through.objects.filter(
+            recipe_id__in=queryset.values('pk')
+        ).values(f'{target}_id', f'{target}__name').annotate(
+            count=Count('recipe_id')
+        ).order_by('-count', f'{target}__name')
+    ]
+
+
+def compute_facets(queryset) -> dict:
+    '''
+    Счётчики по значениям фильтров для отфильтрованных рецептов:
+    пять группирующих запросов независимо от числа значений.
+    '''
+    queryset = queryset.order_by().prefetch_related(None)
+    buckets = cooking_time_buckets()
+    totals = queryset.aggregate(
+        total=Count('id'),
+        **{
+            f'cooking_time_{number}': Count('id', filter=Q(
+                cooking_time__gte=start,
+                **({'cooking_time__lt': end} if end else {})
+            ))
+            for number, (start, end) in enumerate(buckets)
+        }
+    )
+
+    return {
+        'count': totals['total'],
+        'cuisine': [
+            {'id': row['cuisine_id'], 'name': row['cuisine__name'],
+             'count': row['count']}
+            for row in queryset.filter(cuisine__isnull=False).values(
+                'cuisine_id', 'cuisine__name'
+            ).annotate(count=Count('id')).order_by('-count', 'cuisine__name')
+        ],
+        'tags': relation_counts(queryset, 'tags'),
+        'equipment': relation_counts(queryset, 'equipment'),
+        'cooking_time': [
+            {
+                'from': from_minutes(start),
+                'to': from_minutes(end) if end else None,
+                'count': totals[f'cooking_time_{number}'],
+            }
+            for number, (start, end) in enumerate(buckets)
+        ],
+        'servings': [
+            {'value': row['servings'], 'count': row['count']}
+            for row in queryset.values('servings').annotate(
+                count=Count('id')
+            ).order_by('servings')
+        ],
+    }
+
+
+def get_facets(query, queryset) -> dict:
+    '''
+    compute_facets с кэшем по нормализованному RQL-запросу.
+    Запросы к базе выполняются только при промахе кэша.
+    '''
+    key = cache_key(query)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+    return facets
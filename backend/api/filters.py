@@ -1,6 +1,14 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 
+from cachetools import LRUCache
 from dj_rql.constants import FilterLookups
+from dj_rql.drf import RQLFilterBackend
 from dj_rql.filter_cls import RQLFilterClass
 from dj_rql.qs import PrefetchRelated
 
@@ -14,10 +22,262 @@ from recipes.models import Recipe  # Ingredient, Tag
 
 User = get_user_model()
 
+NON_RQL_PARAMS = {
+    'cursor', 'page_size', 'ordering', 'projection', 'since', 'format',
+    'count'
+}
+
+
+def split_terms(query) -> list:
+    '''Делит запрос по & верхнего уровня (не внутри скобок и кавычек).'''
+    terms, depth, quote, start = [], 0, None, 0
+    for position, char in enumerate(query):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '&' and depth == 0:
+            terms.append(query[start:position])
+            start = position + 1
+    terms.append(query[start:])
+    return [term for term in terms if term]
+
+
+def normalize_query(query) -> str:
+    '''
+    Ключ кэша фильтров: без параметров пагинации и представления,
+    которые RQL всё равно игнорирует, и с условиями верхнего уровня
+    в постоянном порядке. Иначе каждая страница курсора давала бы
+    отдельную запись в кэше.
+
+    Ссылки пагинации DRF кодируют условие вида gt(servings,1) как
+    параметр без значения: gt(servings,1)=. Такой хвост отрезается.
+
+    Значения фильтров остаются в ключе: dj_rql кэширует готовый
+    queryset с подставленными значениями, поэтому gt(servings,1)
+    и gt(servings,2) - разные записи.
+    '''
+    terms = []
+    for term in split_terms(query):
+        if term.split('=', 1)[0] in NON_RQL_PARAMS:
+            continue
+        if term.endswith(')=') and term.count('(') == term.count(')'):
+            term = term[:-1]
+        terms.append(term)
+    return '&'.join(sorted(terms))
+
+
+class RQLStats:
+    '''Счётчики и суммарное время фильтрации и компиляции RQL.'''
+
+    def __init__(self):
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, name, elapsed) -> None:
+        with self.lock:
+            self.counters[name] += 1
+            self.counters[f'{name}_time'] += elapsed
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(self.counters)
+        requests = stats.get('requests', 0)
+        misses = stats.get('compiled', 0)
+        stats['hit_rate'] = (
+            (requests - misses) / requests if requests else 0.0
+        )
+        return stats
+
+
+rql_stats = RQLStats()
+
+
+class CachedRQLFilterBackend(RQLFilterBackend):
+    '''
+    RQLFilterBackend, кэширующий результат компиляции фильтра
+    по нормализованному запросу (см. QUERIES_CACHE_BACKEND у класса
+    фильтров). При включённом SLOW_QUERY_THRESHOLD запоминает
+    нормализованный запрос для журнала медленных запросов.
+    '''
+
+    @classmethod
+    def get_query(cls, filter_instance, request, view):
+        return normalize_query(
+            super().get_query(filter_instance, request, view)
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        if settings.SLOW_QUERY_THRESHOLD > 0:
+            request._request.rql_query = self.get_query(None, request, view)
+        start = time.perf_counter()
+        try:
+            return super().filter_queryset(request, queryset, view)
+        finally:
+            rql_stats.record('requests', time.perf_counter() - start)
+
+
+class CompiledFilterMixin:
+    '''Засекает время разбора и сборки Q, то есть промахов кэша.'''
+
+    QUERIES_CACHE_BACKEND = LRUCache
+    QUERIES_CACHE_SIZE = settings.RQL_CACHE_SIZE
+
+    def apply_filters(self, query, request=None, view=None):
+        start = time.perf_counter()
+        try:
+            return super().apply_filters(query, request, view)
+        finally:
+            rql_stats.record('compiled', time.perf_counter() - start)
+
+
+def subquery_key(child):
+    '''
+    (модель, поле many-to-many, inner) для условия pk IN (подзапрос),
+    собранного SubqueryQ.build, иначе None.
+    '''
+    if isinstance(child, tuple) and child[0] == 'pk__in':
+        return getattr(child[1], 'subquery', None)
+    return None
+
+
+class SubqueryQ(Q):
+    '''
+    Q, который при каждом объединении через & и | склеивает условия
+    pk IN (SELECT ... FROM промежуточная таблица WHERE inner) по одному
+    полю в один подзапрос: положительные - тем же связующим, что у узла,
+    отрицания под AND - в NOT IN по OR условий. Так сохраняется смысл
+    JOIN, в котором все условия по одному пространству имён относятся
+    к одной связанной строке, а in(...) со списком значений даёт одно
+    полусоединение, а не подзапрос на значение.
+    '''
+
+    @classmethod
+    def build(cls, model, name, inner, negated=False):
+        field = model._meta.get_field(name)
+        queryset = field.remote_field.through.objects.filter(inner).values(
+            field.m2m_field_name()
+        )
+        queryset.subquery = (model, name, inner)
+        return cls(pk__in=queryset, _negated=negated)
+
+    @classmethod
+    def wrap(cls, q):
+        if isinstance(q, cls):
+            return q
+        obj = cls()
+        obj.connector, obj.negated, obj.children = (
+            q.connector, q.negated, q.children
+        )
+        return obj
+
+    def _combine(self, other, conn):
+        obj = super()._combine(other, conn)
+        if isinstance(obj, SubqueryQ):
+            obj.merge()
+        return obj
+
+    def merge(self) -> None:
+        children, merged = [], {}
+        for child in self.children:
+            key, negated = subquery_key(child), False
+            if (
+                key is None
+                and self.connector == self.AND
+                and isinstance(child, Q)
+                and child.negated
+                and len(child.children) == 1
+            ):
+                key, negated = subquery_key(child.children[0]), True
+            if key is None:
+                children.append(child)
+                continue
+
+            model, name, inner = key
+            group = (model, name, negated)
+            if group not in merged:
+                merged[group] = (len(children), inner)
+                children.append(child)
+                continue
+            position, merged_inner = merged[group]
+            if negated or self.connector == self.OR:
+                merged_inner = merged_inner | inner
+            else:
+                merged_inner = merged_inner & inner
+            merged[group] = (position, merged_inner)
+
+        for (model, name, negated), (position, inner) in merged.items():
+            q = self.build(model, name, inner, negated)
+            children[position] = q if negated else q.children[0]
+        self.children = children
+
+
+class SubqueryNamespaceMixin:
+    '''
+    Фильтры по пространствам имён many-to-many (SUBQUERY_NAMESPACES)
+    компилируются не в JOIN, который размножает строки рецептов,
+    а в полусоединение pk IN (SELECT ... FROM промежуточной таблицы),
+    для out - в NOT IN. В Django 2.2 Exists нельзя передать в filter(),
+    а PostgreSQL планирует IN (подзапрос) так же, как EXISTS.
+    '''
+
+    SUBQUERY_NAMESPACES = ()
+
+    def build_q_for_filter(self, data):
+        q = super().build_q_for_filter(data)
+        namespace = data.filter_name.split('.')[0]
+        if (
+            '.' not in data.filter_name
+            or namespace not in self.SUBQUERY_NAMESPACES
+            or not q
+        ):
+            return SubqueryQ.wrap(q)
+        return self.subquery_q(namespace, q)
+
+    def subquery_q(self, namespace, q, negated=False):
+        if len(q.children) == 1 and isinstance(q.children[0], Q):
+            return self.subquery_q(
+                namespace, q.children[0], negated != q.negated
+            )
+        if any(isinstance(child, Q) for child in q.children):
+            result = Q()
+            for child in q.children:
+                if not isinstance(child, Q):
+                    child = Q(child)
+                if q.connector == Q.OR:
+                    result |= self.subquery_q(namespace, child)
+                else:
+                    result &= self.subquery_q(namespace, child)
+            return ~result if negated != q.negated else result
+        if any(lookup.endswith('__isnull') for lookup, _ in q.children):
+            return SubqueryQ.wrap(~q if negated else q)
+
+        field = self.MODEL._meta.get_field(namespace)
+        target = field.m2m_reverse_field_name()
+        prefix = f'{namespace}__'
+        inner = Q(
+            *[
+                (f'{target}__{lookup[len(prefix):]}', value)
+                for lookup, value in q.children
+            ],
+            _connector=q.connector
+        )
+        return SubqueryQ.build(
+            self.MODEL, namespace, inner, negated != q.negated
+        )
+
 
-class RecipeFilters(RQLFilterClass):
+class RecipeFilters(
+    SubqueryNamespaceMixin, CompiledFilterMixin, RQLFilterClass
+):
     MODEL = Recipe
     SELECT = True
+    SUBQUERY_NAMESPACES = ('ingredients', 'equipment', 'tags', 'selections')
     FILTERS = (
         {
             'filter': 'title',
@@ -75,8 +335,13 @@ class RecipeFilters(RQLFilterClass):
             'qs': PrefetchRelated('ingredients'),
             'filters': (
                 {
+                    # in()/out() dj_rql проверяет как eq/ne по каждому
+                    # значению; без них фильтры падали с ошибкой lookup.
+                    # Поэтому eq()/ne() по id тоже доступны.
                     'filter': 'id',
                     'lookups': {
+                                    FilterLookups.EQ,
+                                    FilterLookups.NE,
                                     FilterLookups.IN,
                                     FilterLookups.OUT,
                                 }
@@ -92,8 +357,11 @@ class RecipeFilters(RQLFilterClass):
             'qs': PrefetchRelated('equipment'),
             'filters': (
                 {
+                    # Lookups как у ingredients.id.
                     'filter': 'id',
                     'lookups': {
+                                    FilterLookups.EQ,
+                                    FilterLookups.NE,
                                     FilterLookups.IN,
                                     FilterLookups.OUT,
                                 }
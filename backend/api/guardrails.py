@@ -0,0 +1,183 @@
+import hashlib
+import json
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, OperationalError, connections
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .filters import CachedRQLFilterBackend, normalize_query
+
+SEARCH_TERM = re.compile(r'\bi?like\(|=i?like=|(?:^|&)search=')
+QUERY_CANCELED = '57014'
+
+
+class QueryTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = (
+        'Запрос выполнялся слишком долго и был прерван. '
+        'Упростите фильтр или уменьшите размер страницы.'
+    )
+    default_code = 'query_timeout'
+
+
+def namespaces(filter_class) -> set:
+    return {
+        item['namespace'] for item in filter_class.FILTERS
+        if 'namespace' in item
+    }
+
+
+def plan_cost(queryset) -> float:
+    '''Оценка стоимости запроса планировщиком PostgreSQL, без выполнения.'''
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Total Cost']
+
+
+class QueryCostFilter(BaseFilterBackend):
+    '''
+    Ничего не фильтрует, а отклоняет слишком дорогие RQL-запросы
+    до их выполнения: по числу вложенных пространств имён, числу
+    условий поиска (like, ilike, search) и стоимости страницы
+    по оценке планировщика. Должен идти последним в filter_backends,
+    чтобы оценивать запрос вместе с сортировкой.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        query = normalize_query(
+            CachedRQLFilterBackend.get_query(None, request, view)
+        )
+        if not query:
+            return queryset
+
+        used = {
+            namespace for namespace in namespaces(view.rql_filter_class)
+            if re.search(rf'\b{namespace}\.', query)
+        }
+        if len(used) > settings.RQL_MAX_NAMESPACES:
+            raise ValidationError(
+                f'Слишком сложный запрос: фильтры по {len(used)} связанным '
+                f'объектам, допустимо не больше '
+                f'{settings.RQL_MAX_NAMESPACES}.'
+            )
+        searches = len(SEARCH_TERM.findall(query))
+        if searches > settings.RQL_MAX_SEARCH_TERMS:
+            raise ValidationError(
+                f'Слишком сложный запрос: {searches} условий поиска, '
+                f'допустимо не больше {settings.RQL_MAX_SEARCH_TERMS}.'
+            )
+
+        if (
+            settings.RQL_MAX_PLAN_COST > 0
+            and connections[queryset.db].vendor == 'postgresql'
+        ):
+            page_size = settings.MAX_PAGE_SIZE
+            if getattr(view, 'paginator', None) is not None:
+                page_size = view.paginator.get_page_size(request) or page_size
+            cost = self.cached_cost(queryset[:page_size + 1])
+            if cost > settings.RQL_MAX_PLAN_COST:
+                raise ValidationError(
+                    'Слишком сложный запрос: уточните фильтр '
+                    'или уменьшите размер страницы.'
+                )
+        return queryset
+
+    @staticmethod
+    def cached_cost(queryset) -> float:
+        key = 'api:rql_cost:' + hashlib.sha256(
+            str(queryset.query).encode()
+        ).hexdigest()
+        cost = cache.get(key)
+        if cost is None:
+            cost = plan_cost(queryset)
+            cache.set(key, cost, settings.RQL_COST_CACHE_TIMEOUT)
+        return cost
+
+
+class StatementTimeout:
+    '''
+    Обёртка connection.execute_wrapper: перед первым запросом
+    к каждой базе PostgreSQL задаёт statement_timeout, по окончании
+    обработки запроса возвращает значение по умолчанию; соединение,
+    в котором это не удалось, закрывается.
+    '''
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.applied = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context['connection']
+        if (
+            connection.vendor == 'postgresql'
+            and connection.alias not in self.applied
+        ):
+            self.applied.add(connection.alias)
+            with connection.cursor() as cursor:
+                cursor.execute(f'SET statement_timeout = {int(self.timeout)}')
+        return execute(sql, params, many, context)
+
+    def reset(self) -> None:
+        for alias in self.applied:
+            connection = connections[alias]
+            if connection.connection is None:
+                continue
+            if connection.needs_rollback:
+                connection.close()
+                continue
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET statement_timeout TO DEFAULT')
+            except DatabaseError:
+                connection.close()
+        self.applied.clear()
+
+
+class StatementTimeoutMixin:
+    '''
+    Ограничивает время запросов к базе для действий из
+    statement_timeouts (мс). Прерванный по таймауту запрос
+    превращается в ответ 503. Обёртка снимается и таймаут сбрасывается
+    в dispatch, в том числе при необработанном исключении.
+    '''
+
+    statement_timeouts = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        self.statement_timeout = None
+        self.timeout_stack = ExitStack()
+        try:
+            with self.timeout_stack:
+                return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.statement_timeout is not None:
+                self.statement_timeout.reset()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        timeout = self.statement_timeouts.get(self.action)
+        if timeout:
+            self.statement_timeout = StatementTimeout(timeout)
+            for connection in connections.all():
+                self.timeout_stack.enter_context(
+                    connection.execute_wrapper(self.statement_timeout)
+                )
+
+    def handle_exception(self, exc):
+        if (
+            isinstance(exc, OperationalError)
+            and getattr(exc.__cause__, 'pgcode', None) == QUERY_CANCELED
+        ):
+            exc = QueryTimeout()
+        return super().handle_exception(exc)
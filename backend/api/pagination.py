@@ -1,7 +1,163 @@
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset) -> int:
+    '''
+    Число строк по оценке планировщика PostgreSQL (EXPLAIN без
+    выполнения запроса). В других СУБД - обычный COUNT(*).
+    '''
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
 
 
 class CursorSetPagination(CursorPagination):
+    '''
+    Курсор по составному ключу (поля сортировки, id): позиция в курсоре
+    однозначна, поэтому страницы не теряют и не повторяют записи
+    с одинаковой датой создания, а смещение в курсоре не нужно.
+    Размер страницы ограничен MAX_PAGE_SIZE. С ?count=approx в ответ
+    добавляется примерное число записей.
+    '''
+
     page_size = 50
     page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_PAGE_SIZE
+    count_query_param = 'count'
     # ordering = '-created'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        pk = queryset.model._meta.pk.name
+        if any(field.lstrip('-') in (pk, 'pk') for field in ordering):
+            return ordering
+        return (*ordering, f'-{pk}' if ordering[0][0] == '-' else pk)
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return json.dumps([str(value) for value in values])
+
+    def decode_position(self, queryset, position) -> list:
+        try:
+            values = json.loads(position)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                queryset.model._meta.get_field(
+                    field.lstrip('-')
+                ).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def position_q(self, queryset, position, reverse):
+        '''
+        Записи после позиции: (a, b) > (x, y) раскрывается
+        в a > x OR (a = x AND b > y) с учётом направления каждого поля.
+        '''
+        values = self.decode_position(queryset, position)
+        q, equal = Q(), {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            q |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return q
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'approx':
+            self.count = estimate_count(queryset)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            _, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.position_q(queryset, current_position, reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.count is None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class FeedPagination(CursorSetPagination):
+    page_size = 50
+    ordering = '-created'
+
+
+class RecommendationPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    ordering = 'rank'
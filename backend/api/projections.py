@@ -0,0 +1,195 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db.models import Count
+
+from recipes.models import (FavoriteRecipe, Recipe, RecipeImage,
+                            RecipeIngredient, Step)
+from users.models import Follow
+
+from .serializers import RecipeListSerializer, from_minutes
+
+RECIPE_COLUMNS = (
+    'id', 'title', 'description', 'servings', 'cooking_time',
+    'cuisine__name', 'author_id', 'created'
+)
+LIST_PREFETCH = ('tags', 'images', 'ingredients_info')
+
+User = get_user_model()
+
+
+def use_projection(request) -> bool:
+    '''
+    Быстрый путь выключается настройкой API_LIST_PROJECTIONS,
+    параметром ?projection=0 и при RQL select(), который
+    поддерживают только сериализаторы.
+    '''
+    if not settings.API_LIST_PROJECTIONS:
+        return False
+    if request.query_params.get('projection') in ('0', 'false'):
+        return False
+    rql_select = getattr(request, 'rql_select', None)
+    return not (rql_select and rql_select.get('select'))
+
+
+def file_url(request, name):
+    '''То же, что FileField.to_representation сериализатора.'''
+    if not name:
+        return None
+    if request is None:
+        return default_storage.url(name)
+    return request.build_absolute_uri(default_storage.url(name))
+
+
+def count_by(queryset, field, ids) -> dict:
+    return dict(queryset.filter(**{f'{field}__in': ids}).values(
+        field
+    ).annotate(amount=Count('id')).values_list(field, 'amount'))
+
+
+def load_authors(request, author_ids) -> dict:
+    user = request.user
+    subscribed = set()
+    if user.is_authenticated:
+        subscribed = set(Follow.objects.filter(
+            user=user, following_id__in=author_ids
+        ).values_list('following_id', flat=True))
+    recipes_count = count_by(Recipe.objects, 'author_id', author_ids)
+
+    return {
+        author['id']: {
+            'id': author['id'],
+            'name': author['name'],
+            'surname': author['surname'],
+            'username': author['username'],
+            'image': file_url(request, author['image']),
+            'is_subscribed': author['id'] in subscribed,
+            'recipes_count': recipes_count.get(author['id'], 0),
+        }
+        for author in User.objects.filter(id__in=author_ids).values(
+            'id', 'name', 'surname', 'username', 'image'
+        )
+    }
+
+
+def load_images(request, recipe_ids) -> dict:
+    images = defaultdict(list)
+    for image in RecipeImage.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('id').values('id', 'recipe_id', 'image', 'is_cover'):
+        images[image['recipe_id']].append({
+            'id': image['id'],
+            'image': file_url(request, image['image']),
+            'is_cover': image['is_cover'],
+        })
+    return images
+
+
+def load_tags(recipe_ids) -> dict:
+    tags = defaultdict(list)
+    for recipe_id, name in Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('tag__name').values_list('recipe_id', 'tag__name'):
+        tags[recipe_id].append(name)
+    return tags
+
+
+def load_ingredients(request, recipe_ids) -> dict:
+    ingredients = defaultdict(list)
+    for row in RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('id').values(
+        'recipe_id', 'ingredient_id', 'ingredient__name',
+        'ingredient__species', 'ingredient__image',
+        'ingredient__description', 'measurement_unit', 'amount'
+    ):
+        ingredients[row['recipe_id']].append({
+            'ingredient': {
+                'id': row['ingredient_id'],
+                'name': row['ingredient__name'],
+                'species': row['ingredient__species'],
+                'image': file_url(request, row['ingredient__image']),
+                'description': row['ingredient__description'],
+            },
+            'measurement_unit': row['measurement_unit'],
+            'amount': row['amount'],
+        })
+    return ingredients
+
+
+def project_recipes(rows, request) -> list:
+    '''
+    Данные RecipeListSerializer из строк .values(*RECIPE_COLUMNS):
+    без экземпляров моделей и с одним запросом на каждую связь
+    для всей страницы.
+    '''
+    rows = list(rows)
+    if not rows:
+        return []
+    recipe_ids = [row['id'] for row in rows]
+    author_ids = {row['author_id'] for row in rows}
+
+    authors = load_authors(request, author_ids)
+    images = load_images(request, recipe_ids)
+    tags = load_tags(recipe_ids)
+    ingredients = load_ingredients(request, recipe_ids)
+    steps_amount = count_by(Step.objects, 'recipe_id', recipe_ids)
+    favorited_by_amount = count_by(
+        FavoriteRecipe.objects, 'recipe_id', recipe_ids
+    )
+    favorited = set()
+    if request.user.is_authenticated:
+        favorited = set(FavoriteRecipe.objects.filter(
+            user=request.user, recipe_id__in=recipe_ids
+        ).values_list('recipe_id', flat=True))
+
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'servings': row['servings'],
+            'cooking_time': from_minutes(row['cooking_time']),
+            'cuisine': row['cuisine__name'],
+            'images': images[row['id']],
+            'tags': tags[row['id']],
+            'ingredients_amount': len(ingredients[row['id']]),
+            'ingredients': ingredients[row['id']],
+            'steps_amount': steps_amount.get(row['id'], 0),
+            'author': authors[row['author_id']],
+            'is_favorited': row['id'] in favorited,
+            'favorited_by_amount': favorited_by_amount.get(row['id'], 0),
+        }
+        for row in rows
+    ]
+
+
+def project_recipe_ids(recipe_ids, request) -> list:
+    '''project_recipes для списка id с сохранением его порядка.'''
+    rows = {
+        row['id']: row for row in Recipe.objects.filter(
+            id__in=recipe_ids
+        ).values(*RECIPE_COLUMNS)
+    }
+    return project_recipes(
+        [rows[pk] for pk in recipe_ids if pk in rows], request
+    )
+
+
+def recipe_list_data(request, recipe_ids) -> list:
+    '''
+    Данные RecipeListSerializer в порядке recipe_ids: проекцией, а если
+    она выключена - сериализатором с заранее загруженными связями.
+    '''
+    if use_projection(request):
+        return project_recipe_ids(recipe_ids, request)
+    recipes = Recipe.objects.select_related('author').prefetch_related(
+        *LIST_PREFETCH
+    ).in_bulk(recipe_ids)
+    return RecipeListSerializer(
+        [recipes[pk] for pk in recipe_ids if pk in recipes],
+        many=True,
+        context={'request': request}
+    ).data
@@ -0,0 +1,49 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson else 0
+)
+
+_encoder = JSONEncoder()
+
+
+def orjson_default(obj):
+    '''
+    Всё, что orjson не сериализует сам (Decimal, ленивые строки,
+    даты), приводится к JSON так же, как в DRF.
+    '''
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    '''
+    JSONRenderer на orjson. Если orjson не установлен или запрошен
+    отформатированный вывод (indent), работает как обычный JSONRenderer.
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        ret = orjson.dumps(
+            data, default=orjson_default, option=ORJSON_OPTIONS
+        )
+        if b'\xe2\x80\xa8' not in ret and b'\xe2\x80\xa9' not in ret:
+            return ret
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -1,15 +1,26 @@
+import operator
+from collections.abc import Mapping
+from functools import reduce
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
 
 from dj_rql.drf.serializers import RQLMixin
 from drf_extra_fields.fields import Base64FileField, Base64ImageField
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
+from rest_framework.relations import MANY_RELATION_KWARGS
 
+from recipes.catalogue import CATALOGUES, catalogue
 from recipes.models import (MAX_COOKING_TIME, MIN_COOKING_TIME, Cuisine,
                             Equipment, FavoriteRecipe, FavoriteSelection,
                             Ingredient, Recipe, RecipeImage, RecipeIngredient,
                             RecipeReview, RecommendRecipe, Selection, Step,
-                            Tag)
+                            Tag, Upload)
+from recipes.uploads import (EXTENSIONS, chunk_count, extension, max_size,
+                             received_chunks)
 from users.models import Follow
 
 RECIPES_LIMIT_DEFAULT = '6'
@@ -36,6 +47,43 @@ def from_minutes(minutes: int) -> dict[int, int]:
     }
 
 
+def assign(instance, data) -> list:
+    '''
+    Записывает data в поля объекта и возвращает имена изменившихся полей.
+    Связи сравниваются по id, без загрузки связанных объектов.
+    '''
+    changed = []
+    for name, value in data.items():
+        field = instance._meta.get_field(name)
+        if field.is_relation:
+            current = getattr(instance, field.attname)
+            new = value.pk if value is not None else None
+        else:
+            current = getattr(instance, name)
+            new = value
+        if current != new:
+            setattr(instance, name, value)
+            changed.append(name)
+    return changed
+
+
+def apply_diff(model, created, updated, deleted) -> bool:
+    '''
+    Удаляет, обновляет и создаёт строки модели пакетными запросами.
+    updated - список пар (объект, изменившиеся поля).
+    '''
+    if deleted:
+        model.objects.filter(pk__in=deleted).delete()
+    if updated:
+        fields = set()
+        for _, changed in updated:
+            fields.update(changed)
+        model.objects.bulk_update([obj for obj, _ in updated], fields)
+    if created:
+        model.objects.bulk_create(created)
+    return bool(created or updated or deleted)
+
+
 class UserSerializer(serializers.ModelSerializer):
     ...
 #     is_subscribed = serializers.SerializerMethodField()
@@ -134,25 +182,265 @@ class CookingTimeSerializer(RQLMixin, serializers.Serializer):
         return from_minutes(value)
 
 
+class SlugCreatedField(serializers.SlugRelatedField):
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        try:
+            value = catalogue(queryset.model).get_by_slug(data)
+            if value is None:
+                value, _ = queryset.get_or_create(**{self.slug_field: data})
+            return value
+        except (TypeError, ValueError):
+            self.fail('invalid')
+
+
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    '''ManyRelatedField, который сообщает обо всех неверных id сразу.'''
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        values, errors = [], []
+        for item in data:
+            try:
+                values.append(self.child_relation.to_internal_value(item))
+            except serializers.ValidationError as exc:
+                errors.extend(exc.detail)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return values
+
+
+class BatchedRelatedField(serializers.PrimaryKeyRelatedField):
+    '''
+    PrimaryKeyRelatedField, который ищет объект среди загруженных заранее
+    корневым сериализатором (BatchedRelationsMixin), затем в справочнике
+    (recipes.catalogue) и только в последнюю очередь - запросом.
+    '''
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        if isinstance(data, bool):
+            raise TypeError
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def lookup(self, pk):
+        model = self.get_queryset().model
+        requested, objs = getattr(
+            self.root, 'resolved_relations', {}
+        ).get(model, ((), {}))
+        if pk in requested:
+            return objs.get(pk)
+        if model in CATALOGUES:
+            return catalogue(model).get(pk)
+        return self.get_queryset().filter(pk=pk).first()
+
+    def to_internal_value(self, data):
+        try:
+            pk = self.to_pk(data)
+        except (TypeError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        value = self.lookup(pk)
+        if value is None:
+            self.fail('does_not_exist', pk_value=data)
+        return value
+
+
+def collect_related_ids(serializer, data, requested) -> None:
+    '''
+    Обходит вложенный payload по полям сериализатора и собирает id
+    для всех BatchedRelatedField: {модель: (queryset, множество id)}.
+    Значения неверного типа пропускаются, о них сообщит само поле.
+    '''
+    if not isinstance(data, Mapping):
+        return
+    for field in serializer._writable_fields:
+        value = data.get(field.field_name)
+        if value is None:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            items = value if isinstance(value, list) else ()
+            for item in items:
+                collect_related_ids(field.child, item, requested)
+        elif isinstance(field, serializers.Serializer):
+            collect_related_ids(field, value, requested)
+        elif isinstance(field, BatchedManyRelatedField):
+            items = value if isinstance(value, list) else ()
+            for item in items:
+                remember_id(field.child_relation, item, requested)
+        elif isinstance(field, BatchedRelatedField):
+            remember_id(field, value, requested)
+
+
+def remember_id(field, value, requested) -> None:
+    queryset = field.get_queryset()
+    try:
+        pk = field.to_pk(value)
+    except (TypeError, DjangoValidationError):
+        return
+    requested.setdefault(queryset.model, (queryset, set()))[1].add(pk)
+
+
+class BatchedRelationsMixin:
+    '''
+    Перед проверкой полей загружает все объекты, на которые ссылаются
+    BatchedRelatedField во вложенных данных: по одному запросу pk__in
+    на модель, справочники - из памяти процесса.
+    '''
+
+    def to_internal_value(self, data):
+        requested = {}
+        collect_related_ids(self, data, requested)
+        self.resolved_relations = {}
+        for model, (queryset, pks) in requested.items():
+            if model in CATALOGUES:
+                objs = catalogue(model).in_bulk(pks)
+            else:
+                objs = queryset.in_bulk(pks)
+            self.resolved_relations[model] = (pks, objs)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.resolved_relations = {}
+
+
+class UploadTokenField(BatchedRelatedField):
+    '''
+    Токен завершённой загрузки по частям. Значение поля - имя
+    собранного файла в хранилище, id загрузок копятся в uploads
+    корневого сериализатора, который удаляет их после сохранения.
+    '''
+    default_error_messages = {
+        'does_not_exist': 'Загрузка {pk_value} не найдена или не завершена.',
+        'incorrect_type': 'Неверный токен загрузки.',
+        'wrong_kind': 'Загрузка {pk_value} - не {kind}.',
+        'already_used': 'Загрузка {pk_value} уже использована.',
+    }
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs.setdefault('queryset', Upload.objects.all())
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        return Upload.objects.filter(
+            author=self.context['request'].user
+        ).exclude(file='')
+
+    def to_internal_value(self, data):
+        upload = super().to_internal_value(data)
+        if upload.kind != self.kind:
+            self.fail(
+                'wrong_kind', pk_value=data,
+                kind=dict(Upload.KINDS)[self.kind].lower()
+            )
+        if upload.pk in self.root.uploads:
+            self.fail('already_used', pk_value=data)
+        self.root.uploads.add(upload.pk)
+        return upload.file.name
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    chunks = serializers.SerializerMethodField()
+    received = serializers.SerializerMethodField()
+    token = serializers.SerializerMethodField()
+    author = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Upload
+        fields = (
+            'id', 'kind', 'filename', 'size', 'chunk_size', 'chunks',
+            'received', 'token', 'author'
+        )
+        read_only_fields = ('id', 'chunk_size')
+
+    def validate(self, attrs):
+        allowed = EXTENSIONS[attrs['kind']]
+        if extension(attrs['filename']) not in allowed:
+            raise serializers.ValidationError({
+                'filename': f'Допустимые расширения: {", ".join(allowed)}.'
+            })
+        if not (0 < attrs['size'] <= max_size(attrs['kind'])):
+            raise serializers.ValidationError({
+                'size': f'Размер должен быть от 1 до '
+                        f'{max_size(attrs["kind"])} байт.'
+            })
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['chunk_size'] = settings.UPLOAD_CHUNK_SIZE
+        return super().create(validated_data)
+
+    def get_chunks(self, obj):
+        return chunk_count(obj)
+
+    def get_received(self, obj):
+        if obj.file:
+            return list(range(chunk_count(obj)))
+        return received_chunks(obj)
+
+    def get_token(self, obj):
+        return str(obj.pk) if obj.file else None
+
+
 class ImageSerializer(RQLMixin, serializers.ModelSerializer):
-    image = Base64ImageField(read_only=False)
+    id = serializers.IntegerField(required=False)
+    image = Base64ImageField(read_only=False, required=False)
+    token = UploadTokenField(
+        Upload.IMAGE, source='image', write_only=True, required=False
+    )
 
     class Meta:
         model = RecipeImage
         fields = (
-            'image', 'is_cover'
+            'id', 'image', 'token', 'is_cover'
         )
         extra_kwargs = {'is_cover': {'required': False, 'default': 0}}
 
+    def validate(self, attrs):
+        if 'id' not in attrs and 'image' not in attrs:
+            raise serializers.ValidationError(
+                {'image': self.fields['image'].error_messages['required']}
+            )
+        return attrs
+
+
+class CatalogueSlugField(serializers.SlugRelatedField):
+    '''SlugRelatedField по справочнику в памяти процесса.'''
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
 
-class SlugCreatedField(serializers.SlugRelatedField):
     def to_internal_value(self, data):
-        queryset = self.get_queryset()
         try:
-            value, _ = queryset.get_or_create(**{self.slug_field: data})
-            return value
+            value = catalogue(self.model).get_by_slug(data)
         except (TypeError, ValueError):
             self.fail('invalid')
+        if value is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=str(data)
+            )
+        return value
+
+    def to_representation(self, value):
+        obj = catalogue(self.model).get(value.pk)
+        if obj is None:
+            obj = self.model.objects.get(pk=value.pk)
+        return getattr(obj, self.slug_field)
 
 
 class IngredientSerializer(RQLMixin, serializers.ModelSerializer):
@@ -186,6 +474,7 @@ class StepReprSerializer(RQLMixin, serializers.ModelSerializer):
 
 
 class StepSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchedRelatedField
 
     class Meta:
         model = Step
@@ -208,8 +497,17 @@ class RecipeIngredientReprSerializer(RQLMixin, serializers.ModelSerializer):
         fields = ('ingredient', 'measurement_unit', 'amount')
         read_only_fields = fields
 
+    def to_representation(self, instance):
+        ingredient = catalogue(Ingredient).get(instance.ingredient_id)
+        if ingredient is not None:
+            RecipeIngredient.ingredient.field.set_cached_value(
+                instance, ingredient
+            )
+        return super().to_representation(instance)
+
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchedRelatedField
 
     class Meta:
         model = RecipeIngredient
@@ -261,8 +559,8 @@ class RecipeReprSerializer(RQLMixin, serializers.ModelSerializer):
     steps = StepSerializer(many=True, read_only=True)
     steps_amount = serializers.SerializerMethodField()
     equipment = EquipmentListSerializer(many=True, read_only=True)
-    cuisine = serializers.SlugRelatedField(
-        many=False, read_only=True, slug_field='name'
+    cuisine = CatalogueSlugField(
+        Cuisine, many=False, read_only=True, slug_field='name'
     )
     cooking_time = CookingTimeSerializer()
     video = Base64FileField(read_only=True)
@@ -372,12 +670,15 @@ class RecipeListSerializer(RecipeReprSerializer):
     #     ).data
 
 
-class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
+class RecipeSerializer(
+    BatchedRelationsMixin, RQLMixin, serializers.ModelSerializer
+):
+    serializer_related_field = BatchedRelatedField
     ingredients = RecipeIngredientSerializer(
         many=True, read_only=False, required=True, source='ingredients_info'
     )
     steps = StepSerializer(many=True, read_only=False, required=True)
-    selections = serializers.PrimaryKeyRelatedField(
+    selections = BatchedRelatedField(
         many=True, read_only=False, required=False,
         queryset=Selection.objects.all()
     )
@@ -385,12 +686,15 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
         many=True, read_only=False, required=False,
         slug_field='name', queryset=Tag.objects.all()
     )
-    cuisine = serializers.SlugRelatedField(
-        many=False, read_only=False, required=False,
+    cuisine = CatalogueSlugField(
+        Cuisine, many=False, read_only=False, required=False,
         slug_field='name', queryset=Cuisine.objects.all()
     )
     cooking_time = CookingTimeSerializer()
     video = Base64FileField(read_only=False, required=False)
+    video_token = UploadTokenField(
+        Upload.VIDEO, source='video', write_only=True, required=False
+    )
     images = ImageSerializer(many=True, read_only=False)
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
@@ -407,14 +711,19 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
             'должно быть мин 1.'
         ),
         'too_many': 'Слишком много {name} (макс {max}).',
+        'duplicate_steps': 'Порядковые номера шагов повторяются: {nums}.',
+        'duplicate_ingredients': 'Ингредиенты повторяются: {ids}.',
+        'uploads_used': 'Загрузка уже использована в другом рецепте.',
+        'unknown_images': 'У рецепта нет изображений с id: {ids}.',
     }
 
     class Meta:
         model = Recipe
         fields = (
             'title', 'description', 'servings', 'cooking_time',
-            'cuisine', 'ending_phrase', 'images', 'video', 'tags',
-            'selections', 'ingredients', 'steps', 'equipment', 'author'
+            'cuisine', 'ending_phrase', 'images', 'video', 'video_token',
+            'tags', 'selections', 'ingredients', 'steps', 'equipment',
+            'author'
         )
         extra_kwargs = {'equipment': {'required': False}}
 
@@ -426,16 +735,20 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
 
         model.objects.bulk_create(objs)
 
+    @transaction.atomic
     def create(self, validated_data):
+        self.lock_uploads()
         ingredients = validated_data.pop('ingredients_info')
         images = validated_data.pop('images')
         steps = validated_data.pop('steps')
         tags = validated_data.pop('tags', [])
         selections = validated_data.pop('selections', [])
+        equipment = validated_data.pop('equipment', [])
 
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         recipe.selections.set(selections)
+        recipe.equipment.set(equipment)
 
         self.set_recipe_relation(recipe, ingredients, RecipeIngredient)
         self.set_recipe_relation(recipe, images, RecipeImage)
@@ -446,8 +759,31 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
             step = Step.objects.create(**data)
             step.ingredients.set(ingredients)
 
+        self.consume_uploads()
         return recipe
 
+    def to_internal_value(self, data):
+        self.uploads = set()
+        return super().to_internal_value(data)
+
+    def lock_uploads(self) -> None:
+        '''
+        Блокирует загрузки до конца транзакции: второй запрос с тем же
+        токеном дождётся её и не найдёт уже удалённую загрузку.
+        '''
+        if self.uploads:
+            list(Upload.objects.select_for_update().filter(
+                pk__in=self.uploads
+            ).values_list('pk', flat=True))
+
+    def consume_uploads(self) -> None:
+        '''Файлы использованных загрузок теперь принадлежат рецепту.'''
+        if not self.uploads:
+            return
+        _, deleted = Upload.objects.filter(pk__in=self.uploads).delete()
+        if deleted.get(Upload._meta.label, 0) != len(self.uploads):
+            self.fail('uploads_used')
+
     def validate_cooking_time(self, value):
         if not (MIN_COOKING_TIME <= value <= MAX_COOKING_TIME):
             self.fail(
@@ -471,6 +807,25 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
         if covers_sum != 1:
             self.fail('covers_out_of_range')
 
+        ids = {image['id'] for image in data if 'id' in image}
+        if self.instance is not None:
+            ids -= set(self.instance.images.values_list('id', flat=True))
+        if ids:
+            self.fail(
+                'unknown_images', ids=', '.join(map(str, sorted(ids)))
+            )
+
+        return data
+
+    def validate_steps(self, data):
+        nums = [step['serial_num'] for step in data]
+        duplicates = {num for num in nums if nums.count(num) > 1}
+        if duplicates:
+            self.fail(
+                'duplicate_steps',
+                nums=', '.join(map(str, sorted(duplicates)))
+            )
+
         return data
 
     def validate_tags(self, data):
@@ -483,21 +838,141 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
         if not data:
             self.fail('no_data', name='ингредиента')
 
-        return data
+        ids = [item['ingredient'].pk for item in data]
+        duplicates = {pk for pk in ids if ids.count(pk) > 1}
+        if duplicates:
+            self.fail(
+                'duplicate_ingredients',
+                ids=', '.join(map(str, sorted(duplicates)))
+            )
 
-    # def update(self, instance, validated_data):
-    #     if 'recipe_ingredients' in validated_data:
-    #         RecipeIngredient.objects.filter(
-    #             recipe=instance
-    #         ).delete()
-    #         ingredients_data = validated_data.pop('ingredients_info')
-    #         self.set_ingredients(instance, ingredients_data)
+        return data
 
-    #     if 'tags' in validated_data:
-    #         tags = validated_data.pop('tags')
-    #         instance.tags.set(tags)
+    def update_ingredients(self, recipe, ingredients_data) -> bool:
+        existing = {
+            row.ingredient_id: row for row in recipe.ingredients_info.all()
+        }
+        created, updated = [], []
+        for data in ingredients_data:
+            row = existing.pop(data['ingredient'].pk, None)
+            if row is None:
+                created.append(RecipeIngredient(recipe=recipe, **data))
+                continue
+            changed = assign(row, data)
+            if changed:
+                updated.append((row, changed))
+        return apply_diff(
+            RecipeIngredient, created, updated,
+            [row.pk for row in existing.values()]
+        )
 
-    #     return super().update(instance, validated_data)
+    def update_images(self, recipe, images_data) -> bool:
+        '''
+        Картинки с id остаются на месте, у них меняется только is_cover.
+        Новый файл всегда создаёт новую строку, файлы удалённых строк
+        стираются сигналом pre_delete.
+        '''
+        existing = {image.pk: image for image in recipe.images.all()}
+        created, updated = [], []
+        for data in images_data:
+            data = dict(data)
+            image = existing.get(data.pop('id', None))
+            if image is None or 'image' in data:
+                created.append(RecipeImage(recipe=recipe, **data))
+                continue
+            del existing[image.pk]
+            changed = assign(image, data)
+            if changed:
+                updated.append((image, changed))
+        return apply_diff(RecipeImage, created, updated, list(existing))
+
+    def update_steps(self, recipe, steps_data) -> bool:
+        '''Шаги сопоставляются по serial_num.'''
+        existing, deleted = {}, []
+        for step in recipe.steps.prefetch_related('ingredients'):
+            if step.serial_num in existing:
+                deleted.append(step.pk)
+            else:
+                existing[step.serial_num] = step
+
+        created, updated, links = [], [], {}
+        through = Step.ingredients.through
+        links_added, links_removed = [], []
+        for data in steps_data:
+            data = dict(data)
+            ingredients = {
+                ingredient.pk for ingredient in data.pop('ingredients', [])
+            }
+            step = existing.pop(data['serial_num'], None)
+            if step is None:
+                created.append(Step(recipe=recipe, **data))
+                links[data['serial_num']] = ingredients
+                continue
+            changed = assign(step, data)
+            if changed:
+                updated.append((step, changed))
+            current = {ingredient.pk for ingredient in step.ingredients.all()}
+            links_added += [
+                through(step_id=step.pk, ingredient_id=pk)
+                for pk in ingredients - current
+            ]
+            if current - ingredients:
+                links_removed.append(
+                    Q(step_id=step.pk, ingredient_id__in=current - ingredients)
+                )
+        deleted += [step.pk for step in existing.values()]
+
+        if links_removed:
+            through.objects.filter(
+                reduce(operator.or_, links_removed)
+            ).delete()
+        changed = apply_diff(Step, created, updated, deleted)
+        step_ids = {step.serial_num: step.pk for step in created}
+        if None in step_ids.values():
+            step_ids = dict(Step.objects.filter(
+                recipe=recipe, serial_num__in=links
+            ).values_list('serial_num', 'id'))
+        links_added += [
+            through(step_id=step_ids[num], ingredient_id=pk)
+            for num, ingredients in links.items() for pk in ingredients
+        ]
+        through.objects.bulk_create(links_added)
+        return changed or bool(links_added or links_removed)
+
+    def update_relation(self, manager, objs) -> bool:
+        current = set(manager.values_list('pk', flat=True))
+        new = {obj.pk for obj in objs}
+        if current - new:
+            manager.remove(*(current - new))
+        if new - current:
+            manager.add(*(new - current))
+        return current != new
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        self.lock_uploads()
+        validated_data.pop('author', None)
+        changed = False
+        if 'ingredients_info' in validated_data:
+            changed |= self.update_ingredients(
+                instance, validated_data.pop('ingredients_info')
+            )
+        if 'images' in validated_data:
+            changed |= self.update_images(
+                instance, validated_data.pop('images')
+            )
+        if 'steps' in validated_data:
+            changed |= self.update_steps(instance, validated_data.pop('steps'))
+        for name in ('tags', 'selections', 'equipment'):
+            if name in validated_data:
+                changed |= self.update_relation(
+                    getattr(instance, name), validated_data.pop(name)
+                )
+
+        if assign(instance, validated_data) or changed:
+            instance.save()
+        self.consume_uploads()
+        return instance
 
     def to_representation(self, instance):
         return RecipeReprSerializer(
@@ -506,31 +981,6 @@ class RecipeSerializer(RQLMixin, serializers.ModelSerializer):
         ).data
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    recipe = serializers.PrimaryKeyRelatedField(
-        queryset=Recipe.objects.all(), required=False
-    )
-
-    class Meta:
-        model = FavoriteRecipe
-        fields = ('user', 'recipe')
-        read_only_fields = ('user', 'recipe')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=FavoriteRecipe.objects.all(),
-                fields=('user', 'recipe'),
-                message='Вы уже добавили этот рецепт в избранное.'
-            )
-        ]
-
-#     def to_representation(self, instance):
-#         return RecipeListSerializer(
-#             instance.recipe,
-#             context={'request': self.context.get('request')}
-#         ).data
-
-
 class SelectionSerializer(serializers.ModelSerializer):
     recipes = RecipeListSerializer(
         many=True, read_only=True
@@ -0,0 +1,72 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api.authentication import token_cache
+from recipes.tests.factories import IsolatedTestMixin, create_user
+
+URL = '/api/feed/'
+
+
+class TokenCacheTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        with token_cache.lock:
+            token_cache.local.clear()
+            token_cache.counters.clear()
+        self.user = create_user('user')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def auth_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len([
+            query for query in queries
+            if 'authtoken_token' in query['sql']
+        ])
+
+    def test_token_is_read_from_database_once(self):
+        self.assertEqual(self.auth_queries(), 1)
+        self.assertEqual(self.auth_queries(), 0)
+
+        stats = token_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['size'], 1)
+
+    def test_shared_cache_used_when_local_entry_missing(self):
+        self.auth_queries()
+        with token_cache.lock:
+            token_cache.local.clear()
+        self.assertEqual(self.auth_queries(), 0)
+        self.assertEqual(token_cache.stats()['shared_hits'], 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.auth_queries()
+        self.token.delete()
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.auth_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_endpoint_for_admins_only(self):
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data['token_cache'])
@@ -0,0 +1,129 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Equipment, Recipe
+from recipes.tests.factories import (UNIT, IsolatedTestMixin,
+                                     create_ingredients, create_selection,
+                                     create_user, png)
+
+URL = '/api/recipes/'
+MISSING = 999999
+
+
+class BatchedRelationsTests(IsolatedTestMixin, APITestCase):
+    '''
+    Id из вложенных данных рецепта проверяются одним запросом на модель,
+    справочники - без запросов, а обо всех несуществующих id сообщается
+    сразу.
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('author')
+        self.client.force_authenticate(self.user)
+        self.ingredients = create_ingredients(6)
+        self.equipment = [
+            Equipment.objects.create(name=name) for name in ('oven', 'pan')
+        ]
+        self.selections = [
+            create_selection(self.user, title=f'Подборка {number}')
+            for number in range(3)
+        ]
+
+    def payload(self, ingredients=None, **extra) -> dict:
+        if ingredients is None:
+            ingredients = [ingredient.pk for ingredient in self.ingredients]
+        data = {
+            'title': 'Рецепт',
+            'description': 'Описание',
+            'servings': 2,
+            'cooking_time': {'hours': 0, 'minutes': 30},
+            'images': [{'image': png(), 'is_cover': 1}],
+            'ingredients': [
+                {'ingredient': pk, 'measurement_unit': UNIT, 'amount': 1}
+                for pk in ingredients
+            ],
+            'steps': [
+                {
+                    'serial_num': number,
+                    'title': f'Шаг {number}',
+                    'description': 'Описание шага',
+                    'ingredients': ingredients[number - 1:number + 2],
+                }
+                for number in (1, 2, 3)
+            ],
+            'selections': [selection.pk for selection in self.selections],
+            'equipment': [item.pk for item in self.equipment],
+        }
+        data.update(extra)
+        return data
+
+    def post(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(URL, data, format='json')
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        return response, selects
+
+    def lookups(self, selects, table) -> list:
+        '''Запросы объектов таблицы по id, без JOIN при записи и выдаче.'''
+        return [
+            sql for sql in selects if f'WHERE "{table}"."id"' in sql
+        ]
+
+    def test_one_query_per_model(self):
+        self.post(self.payload())
+        response, selects = self.post(self.payload(title='Второй'))
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, response.data
+        )
+        self.assertEqual(len(self.lookups(selects, 'recipes_selection')), 1)
+        self.assertEqual(self.lookups(selects, 'recipes_ingredient'), [])
+        self.assertEqual(self.lookups(selects, 'recipes_equipment'), [])
+
+        recipe = Recipe.objects.get(title='Второй')
+        self.assertEqual(set(recipe.equipment.all()), set(self.equipment))
+        self.assertEqual(set(recipe.selections.all()), set(self.selections))
+        self.assertEqual(
+            list(recipe.steps.get(serial_num=3).ingredients.all()),
+            self.ingredients[2:5]
+        )
+
+    def test_all_missing_ids_reported(self):
+        selection = self.selections[0].pk
+        response, _ = self.post(self.payload(
+            selections=[selection, MISSING, MISSING + 1],
+            equipment=[self.equipment[0].pk, MISSING],
+        ))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['selections']), 2)
+        for pk, error in zip((MISSING, MISSING + 1),
+                             response.data['selections']):
+            self.assertIn(str(pk), error)
+            self.assertEqual(error.code, 'does_not_exist')
+        self.assertEqual(
+            [error.code for error in response.data['equipment']],
+            ['does_not_exist']
+        )
+
+    def test_missing_nested_ids_reported(self):
+        ingredients = [self.ingredients[0].pk, MISSING, 'abc']
+        response, _ = self.post(self.payload(ingredients=ingredients))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [
+                [error.code for error in item.get('ingredient', [])]
+                for item in response.data['ingredients']
+            ],
+            [[], ['does_not_exist'], ['incorrect_type']]
+        )
+        self.assertEqual(
+            [error.code for error in response.data['steps'][0]['ingredients']],
+            ['does_not_exist', 'incorrect_type']
+        )
+        self.assertFalse(Recipe.objects.exists())
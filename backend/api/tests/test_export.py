@@ -0,0 +1,86 @@
+import io
+import json
+
+from django.core.management import call_command
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.export import export_recipes
+from recipes.models import ChangeLog
+from recipes.tests.factories import (IsolatedTestMixin, create_ingredients,
+                                     create_recipe, create_user, minutes_ago)
+
+URL = '/api/recipes/export/'
+
+
+class ExportTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user('author')
+        ingredients = create_ingredients(2)
+        self.recipes = [
+            create_recipe(
+                self.author, title=f'Рецепт {number}', tags=['суп'],
+                ingredients=ingredients, steps=2, images=1,
+                created=minutes_ago(10 - number)
+            )
+            for number in range(3)
+        ]
+        ChangeLog.objects.update(created=minutes_ago(10))
+
+    def export(self, **kwargs) -> list:
+        return [
+            json.loads(line) for line in export_recipes(**kwargs)
+        ]
+
+    def test_all_recipes_in_creation_order(self):
+        for chunk_size in (1, 2, 10):
+            with self.subTest(chunk_size=chunk_size):
+                exported = self.export(chunk_size=chunk_size)
+                self.assertEqual(
+                    [recipe['id'] for recipe in exported],
+                    [recipe.pk for recipe in self.recipes]
+                )
+        recipe = exported[0]
+        self.assertEqual(recipe['author']['username'], 'author')
+        self.assertEqual(recipe['tags'], ['суп'])
+        self.assertEqual(len(recipe['ingredients']), 2)
+        self.assertEqual(
+            [step['serial_num'] for step in recipe['steps']], [1, 2]
+        )
+
+    def test_since_includes_new_and_edited_recipes(self):
+        since = minutes_ago(8.5)
+        edited = self.recipes[0]
+        edited.title = 'Новое название'
+        edited.save()
+
+        exported = self.export(since=since)
+        self.assertEqual(
+            [recipe['id'] for recipe in exported],
+            [edited.pk, self.recipes[2].pk]
+        )
+        self.assertEqual(exported[0]['title'], 'Новое название')
+
+    def test_endpoint_for_admins_only(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(create_user('admin', is_staff=True))
+        response = self.client.get(URL, {'since': 'вчера'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_command_writes_file(self):
+        path = f'{self.media_root}/export.ndjson'
+        stdout = io.StringIO()
+        call_command('export_recipes', output=path, stdout=stdout)
+        self.assertEqual(stdout.getvalue(), 'Выгружено рецептов: 3.\n')
+        with open(path, 'rb') as output:
+            self.assertEqual(len(output.readlines()), 3)
@@ -0,0 +1,90 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Cuisine, Equipment, Tag
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user)
+
+URL = '/api/recipes/facets/'
+
+
+@override_settings(FACETS_COOKING_TIME_BOUNDS=(30, 60))
+class FacetsTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = create_user('author')
+        russian = Cuisine.objects.create(name='Русская')
+        oven = Equipment.objects.create(name='Духовка')
+        recipes = [
+            create_recipe(
+                author, tags=['суп', 'обед'], cuisine=russian,
+                cooking_time=20, servings=2
+            ),
+            create_recipe(
+                author, tags=['обед'], cuisine=russian,
+                cooking_time=45, servings=2
+            ),
+            create_recipe(author, tags=['завтрак'], cooking_time=90),
+        ]
+        recipes[0].equipment.set([oven])
+        self.tags = dict(Tag.objects.values_list('name', 'id'))
+        self.russian, self.oven = russian, oven
+
+    def get(self, query='') -> dict:
+        response = self.client.get(f'{URL}?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts(self):
+        facets = self.get()
+        self.assertEqual(facets['count'], 3)
+        self.assertEqual(facets['cuisine'], [
+            {'id': self.russian.pk, 'name': 'Русская', 'count': 2}
+        ])
+        self.assertEqual(
+            [(tag['name'], tag['count']) for tag in facets['tags']],
+            [('обед', 2), ('завтрак', 1), ('суп', 1)]
+        )
+        self.assertEqual(facets['equipment'], [
+            {'id': self.oven.pk, 'name': 'Духовка', 'count': 1}
+        ])
+        self.assertEqual(facets['cooking_time'], [
+            {'from': {'hours': 0, 'minutes': 5},
+             'to': {'hours': 0, 'minutes': 30}, 'count': 1},
+            {'from': {'hours': 0, 'minutes': 30},
+             'to': {'hours': 1, 'minutes': 0}, 'count': 1},
+            {'from': {'hours': 1, 'minutes': 0}, 'to': None, 'count': 1},
+        ])
+        self.assertEqual(
+            [(row['value'], row['count']) for row in facets['servings']],
+            [(1, 1), (2, 2)]
+        )
+
+    def test_counts_follow_filter(self):
+        facets = self.get(f'in(tags.id,({self.tags["обед"]}))')
+        self.assertEqual(facets['count'], 2)
+        self.assertEqual(
+            [(tag['name'], tag['count']) for tag in facets['tags']],
+            [('обед', 2), ('суп', 1)]
+        )
+        self.assertEqual(
+            [row['count'] for row in facets['cooking_time']], [1, 1, 0]
+        )
+
+    def test_cached_by_normalized_query(self):
+        query = f'in(tags.id,({self.tags["обед"]}))'
+        self.get(f'{query}&page_size=5')
+        with CaptureQueriesContext(connection) as queries:
+            facets = self.get(f'cursor=abc&{query}')
+        # На PostgreSQL остаются statement_timeout и оценка плана
+        # из guardrails, сами счётчики берутся из кэша.
+        self.assertEqual([
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+        ], [])
+        self.assertEqual(facets['count'], 2)
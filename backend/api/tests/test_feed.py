@@ -0,0 +1,126 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from recipes.models import FeedEntry
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user, minutes_ago)
+from users.models import Follow
+
+URL = '/api/feed/'
+
+
+class FeedTests(IsolatedTestMixin, APITransactionTestCase):
+    '''
+    Лента раскладывается по подписчикам в transaction.on_commit,
+    поэтому тесты идут в APITransactionTestCase.
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.client.force_authenticate(self.reader)
+
+    def feed_ids(self, url=URL) -> list:
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_new_recipe_fans_out_to_followers(self):
+        stranger = create_user('stranger')
+        Follow.objects.create(user=self.reader, following=self.author)
+        recipe = create_recipe(self.author)
+
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader, recipe=recipe
+        ).exists())
+        self.assertFalse(FeedEntry.objects.filter(user=stranger).exists())
+        self.assertEqual(self.feed_ids(), [recipe.pk])
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        older = create_recipe(self.author, created=minutes_ago(2))
+        newer = create_recipe(self.author, created=minutes_ago(1))
+        follow = Follow.objects.create(user=self.reader, following=self.author)
+        self.assertEqual(self.feed_ids(), [newer.pk, older.pk])
+
+        follow.delete()
+        self.assertEqual(self.feed_ids(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_celebrity_recipes_pulled_on_first_page_only(self):
+        Follow.objects.create(user=self.reader, following=self.author)
+        Follow.objects.create(
+            user=create_user('fan'), following=self.author
+        )
+        older = create_recipe(self.author, created=minutes_ago(3))
+        newer = create_recipe(self.author, created=minutes_ago(2))
+        self.assertFalse(FeedEntry.objects.exists())
+
+        response = self.client.get(URL, {'page_size': 1})
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [newer.pk]
+        )
+        entries = FeedEntry.objects.filter(user=self.reader)
+        self.assertEqual(entries.count(), 2)
+
+        create_recipe(self.author)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [older.pk]
+        )
+        self.assertEqual(entries.count(), 2)
+        self.client.get(URL)
+        self.assertEqual(entries.count(), 3)
+
+    def test_cursor_pages_entries_with_equal_timestamps(self):
+        Follow.objects.create(user=self.reader, following=self.author)
+        created = minutes_ago(1)
+        recipes = [
+            create_recipe(self.author, created=created) for _ in range(5)
+        ]
+        FeedEntry.objects.update(created=created)
+
+        ids = self.feed_ids(f'{URL}?page_size=2')
+        self.assertEqual(
+            ids, sorted((recipe.pk for recipe in recipes), reverse=True)
+        )
+
+    def test_page_queries_do_not_grow_with_page_size(self):
+        Follow.objects.create(user=self.reader, following=self.author)
+        for number in range(6):
+            create_recipe(
+                self.author, tags=[f'tag{number}'], images=1,
+                created=minutes_ago(number)
+            )
+
+        counts = []
+        for page_size in (2, 6):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(URL, {'page_size': page_size})
+            self.assertEqual(len(response.data['results']), page_size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_serializer_fallback_matches_projection(self):
+        Follow.objects.create(user=self.reader, following=self.author)
+        for number in range(3):
+            create_recipe(
+                self.author, tags=['a'], images=1,
+                created=minutes_ago(number)
+            )
+        projected = self.client.get(URL).data['results']
+        serialized = self.client.get(URL, {'projection': 0}).data['results']
+        self.assertEqual(
+            [recipe['id'] for recipe in projected],
+            [recipe['id'] for recipe in serialized]
+        )
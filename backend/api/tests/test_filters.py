@@ -0,0 +1,85 @@
+from django.test import SimpleTestCase
+
+from dj_rql.drf import RQLFilterBackend
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.filters import normalize_query, rql_stats
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user)
+
+URL = '/api/recipes/'
+
+
+class NormalizeQueryTests(SimpleTestCase):
+
+    def test_pagination_params_dropped_and_terms_sorted(self):
+        self.assertEqual(
+            normalize_query(
+                'cursor=cD0x&ge(cooking_time,10)&page_size=5'
+                '&eq(servings,2)&projection=0'
+            ),
+            normalize_query('eq(servings,2)&ge(cooking_time,10)')
+        )
+
+    def test_drf_link_tail_removed(self):
+        self.assertEqual(
+            normalize_query('gt(servings,1)=&page_size=2'), 'gt(servings,1)'
+        )
+        self.assertEqual(normalize_query('servings=2'), 'servings=2')
+
+    def test_ampersand_inside_terms_kept(self):
+        self.assertEqual(
+            normalize_query('eq(title,"a&b")&cursor=x'), 'eq(title,"a&b")'
+        )
+
+    def test_values_are_part_of_key(self):
+        self.assertNotEqual(
+            normalize_query('gt(servings,1)'),
+            normalize_query('gt(servings,2)')
+        )
+
+
+class CompiledFilterCacheTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        RQLFilterBackend._CACHES.clear()
+        self.author = create_user('author')
+        self.recipes = [
+            create_recipe(self.author, servings=servings)
+            for servings in (1, 2, 3, 4)
+        ]
+
+    def compiled(self) -> int:
+        return rql_stats.stats().get('compiled', 0)
+
+    def ids(self, url) -> list:
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_cursor_pages_compile_filter_once(self):
+        compiled = self.compiled()
+        ids = self.ids(f'{URL}?gt(servings,1)&page_size=1')
+        self.assertEqual(
+            sorted(ids), [recipe.pk for recipe in self.recipes[1:]]
+        )
+        self.assertEqual(self.compiled() - compiled, 1)
+
+        self.ids(f'{URL}?page_size=2&gt(servings,1)')
+        self.assertEqual(self.compiled() - compiled, 1)
+
+        self.ids(f'{URL}?gt(servings,2)')
+        self.assertEqual(self.compiled() - compiled, 2)
+
+    def test_stats_endpoint(self):
+        self.client.get(URL, {'servings': 1})
+        self.client.force_authenticate(create_user('admin', is_staff=True))
+        stats = self.client.get('/api/stats/').data['rql']
+        self.assertGreaterEqual(stats['requests'], 1)
+        self.assertIn('hit_rate', stats)
@@ -0,0 +1,108 @@
+from unittest import mock, skipUnless
+
+from django.db import OperationalError, connection, connections
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+
+from api import guardrails
+from api.views import RecipeViewSet
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user)
+
+URL = '/api/recipes/'
+
+only_postgresql = skipUnless(
+    connections['default'].vendor == 'postgresql', 'Нужна база PostgreSQL.'
+)
+
+
+class Canceled(Exception):
+    pgcode = guardrails.QUERY_CANCELED
+
+
+class QueryCostFilterTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        create_recipe(create_user('author'), tags=['a'])
+
+    def get(self, query):
+        return self.client.get(f'{URL}?{query}')
+
+    @override_settings(RQL_MAX_NAMESPACES=2)
+    def test_namespaces_limit(self):
+        response = self.get('in(tags.id,(1))&in(ingredients.id,(1))')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.get(
+            'in(tags.id,(1))&in(ingredients.id,(1))&eq(equipment.id,1)'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('3 связанным объектам', str(response.data))
+
+    @override_settings(RQL_MAX_SEARCH_TERMS=2)
+    def test_search_terms_limit(self):
+        response = self.get('like(title,*a*)&ilike(description,*b*)')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.get(
+            'like(title,*a*)&or(ilike(title,*b*),like(description,*c*))'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('3 условий поиска', str(response.data))
+
+    @override_settings(RQL_MAX_PLAN_COST=0.01)
+    def test_plan_cost_only_on_postgresql(self):
+        response = self.get('gt(servings,0)')
+        if connection.vendor == 'postgresql':
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+        else:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @only_postgresql
+    def test_plan_cost_cached(self):
+        with mock.patch.object(
+            guardrails, 'plan_cost', wraps=guardrails.plan_cost
+        ) as plan_cost:
+            for _ in range(2):
+                response = self.get('gt(servings,0)&page_size=5')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(plan_cost.call_count, 1)
+
+
+class StatementTimeoutTests(IsolatedTestMixin, APITestCase):
+
+    def show_timeout(self) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            return cursor.fetchone()[0]
+
+    @only_postgresql
+    def test_timeout_set_for_action_and_reset(self):
+        def list_view(view, request, *args, **kwargs):
+            return Response({'timeout': self.show_timeout()})
+
+        default = self.show_timeout()
+        with mock.patch.dict(RecipeViewSet.statement_timeouts, list=1234):
+            with mock.patch.object(RecipeViewSet, 'list', list_view):
+                response = self.client.get(URL)
+        self.assertEqual(response.data['timeout'], '1234ms')
+        self.assertEqual(self.show_timeout(), default)
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_canceled_query_becomes_503(self):
+        def list_view(view, request, *args, **kwargs):
+            raise OperationalError('canceling statement') from Canceled()
+
+        with mock.patch.object(RecipeViewSet, 'list', list_view):
+            response = self.client.get(URL)
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response.data['detail'].code, 'query_timeout')
+        self.assertEqual(connection.execute_wrappers, [])
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.db import connection
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.pagination import CursorSetPagination
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user, minutes_ago)
+
+URL = '/api/recipes/'
+
+
+class CursorPaginationTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user('author')
+        created = minutes_ago(5)
+        self.recipes = [
+            create_recipe(self.author, created=created) for _ in range(5)
+        ] + [create_recipe(self.author, created=minutes_ago(1))]
+        self.newest_first = [self.recipes[-1].pk] + sorted(
+            (recipe.pk for recipe in self.recipes[:-1]), reverse=True
+        )
+
+    def page(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def walk(self, url, link='next', **params) -> tuple:
+        ids, pages = [], []
+        data = self.page(url, **params)
+        while True:
+            page_ids = [recipe['id'] for recipe in data['results']]
+            ids += page_ids
+            pages.append(page_ids)
+            if not data[link]:
+                return ids, pages, data
+            data = self.page(data[link])
+
+    def test_equal_timestamps_are_neither_lost_nor_repeated(self):
+        for projection in ('1', '0'):
+            with self.subTest(projection=projection):
+                ids, _, _ = self.walk(URL, page_size=2, projection=projection)
+                self.assertEqual(ids, self.newest_first)
+
+    def test_ascending_ordering(self):
+        ids, _, _ = self.walk(URL, page_size=4, ordering='created')
+        self.assertEqual(ids, self.newest_first[::-1])
+
+    def test_previous_links_return_same_pages(self):
+        _, pages, last = self.walk(URL, page_size=2)
+        self.assertEqual(len(pages), 3)
+        _, previous, _ = self.walk(last['previous'], link='previous')
+        self.assertEqual(previous, pages[-2::-1])
+
+    def test_new_recipe_does_not_shift_pages(self):
+        first = self.page(URL, page_size=3)
+        create_recipe(self.author)
+        second = self.page(first['next'])
+        ids = [
+            recipe['id'] for recipe in first['results'] + second['results']
+        ]
+        self.assertEqual(ids, self.newest_first)
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'cD1hYmM%3D'):
+            response = self.client.get(f'{URL}?cursor={cursor}')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_size_limit_and_approximate_count(self):
+        with mock.patch.object(CursorSetPagination, 'max_page_size', 4):
+            data = self.page(URL, page_size=5)
+        self.assertEqual(len(data['results']), 4)
+        self.assertNotIn('count', data)
+
+        data = self.page(URL, page_size=2, count='approx')
+        self.assertIsInstance(data['count'], int)
+        if connection.vendor != 'postgresql':
+            self.assertEqual(data['count'], 6)
+        self.assertEqual(len(data['results']), 2)
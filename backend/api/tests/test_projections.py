@@ -0,0 +1,45 @@
+import json
+
+from rest_framework.test import APITestCase
+
+from recipes.models import FavoriteRecipe
+from recipes.tests.factories import (IsolatedTestMixin, create_ingredients,
+                                     create_recipe, create_user, minutes_ago)
+from users.models import Follow
+
+URL = '/api/recipes/'
+
+
+class ProjectionTests(IsolatedTestMixin, APITestCase):
+    '''Проекция списка рецептов отдаёт то же, что RecipeListSerializer.'''
+
+    def setUp(self):
+        super().setUp()
+        self.reader = create_user('reader')
+        author = create_user('author')
+        Follow.objects.create(user=self.reader, following=author)
+        ingredients = create_ingredients(3)
+        for number, tags in enumerate((['суп', 'борщ', 'ужин'], ['обед'], [])):
+            recipe = create_recipe(
+                author, title=f'Рецепт {number}', tags=tags,
+                ingredients=ingredients[number:], steps=number, images=2,
+                created=minutes_ago(number)
+            )
+        FavoriteRecipe.objects.create(user=self.reader, recipe=recipe)
+        create_recipe(self.reader, tags=['ужин', 'борщ'])
+
+    def results(self, **params) -> list:
+        return json.loads(self.client.get(URL, params).content)['results']
+
+    def test_same_output_as_serializer(self):
+        for user in (None, self.reader):
+            self.client.force_authenticate(user)
+            with self.subTest(user=user):
+                projected = self.results()
+                self.assertEqual(len(projected), 4)
+                self.assertEqual(projected, self.results(projection=0))
+
+    def test_tags_sorted_by_name(self):
+        tags = [recipe['tags'] for recipe in self.results()]
+        self.assertEqual(tags[1], ['борщ', 'суп', 'ужин'])
+        self.assertEqual(tags[0], ['борщ', 'ужин'])
@@ -0,0 +1,184 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Cuisine, Recipe, RecipeImage, RecipeIngredient, Step
+from recipes.tests.factories import (UNIT, IsolatedTestMixin,
+                                     create_ingredients, create_user, png)
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class RecipeUpdateTests(IsolatedTestMixin, APITestCase):
+    '''Обновление рецепта изменяет только то, что поменялось.'''
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('author')
+        self.client.force_authenticate(self.user)
+        Cuisine.objects.create(name='Русская кухня')
+        self.ingredients = create_ingredients(5)
+        self.unit = UNIT
+        response = self.client.post(
+            '/api/recipes/', self.payload(), format='json'
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, response.data
+        )
+        self.recipe = Recipe.objects.get(author=self.user)
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def payload(self, **extra) -> dict:
+        ingredients = [ingredient.pk for ingredient in self.ingredients]
+        data = {
+            'title': 'Рецепт',
+            'description': 'Описание',
+            'servings': 2,
+            'cooking_time': {'hours': 0, 'minutes': 30},
+            'cuisine': 'Русская кухня',
+            'images': [{'image': png(), 'is_cover': 1}],
+            'tags': ['завтрак'],
+            'ingredients': [
+                {'ingredient': pk, 'measurement_unit': self.unit, 'amount': 1}
+                for pk in ingredients[:3]
+            ],
+            'steps': [
+                {
+                    'serial_num': number,
+                    'title': f'Шаг {number}',
+                    'description': 'Описание шага',
+                    'ingredients': ingredients[number - 1:number + 1],
+                }
+                for number in (1, 2)
+            ],
+        }
+        data.update(extra)
+        return data
+
+    def current_images(self) -> list:
+        return [
+            {'id': image.pk, 'is_cover': int(image.is_cover)}
+            for image in self.recipe.images.all()
+        ]
+
+    def patch(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, data, format='json')
+        writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(WRITES)
+        ]
+        return response, writes
+
+    def test_noop_update_writes_nothing(self):
+        response, writes = self.patch(
+            self.payload(images=self.current_images())
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(writes, [])
+
+    def test_image_kept_by_id(self):
+        image = self.recipe.images.get()
+        response, _ = self.patch({'images': [
+            {'id': image.pk, 'is_cover': 0},
+            {'image': png(), 'is_cover': 1},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        kept = RecipeImage.objects.get(pk=image.pk)
+        self.assertEqual(kept.image.name, image.image.name)
+        self.assertFalse(kept.is_cover)
+        self.assertEqual(self.recipe.images.count(), 2)
+
+    def test_unknown_image_id_rejected(self):
+        response, _ = self.patch({'images': [{'id': 0, 'is_cover': 1}]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ingredient_diff(self):
+        kept, changed, removed = self.recipe.ingredients_info.order_by(
+            'ingredient_id'
+        )
+        added = self.ingredients[4]
+        response, _ = self.patch({'ingredients': [
+            {
+                'ingredient': kept.ingredient_id,
+                'measurement_unit': self.unit,
+                'amount': 1,
+            },
+            {
+                'ingredient': changed.ingredient_id,
+                'measurement_unit': self.unit,
+                'amount': 5,
+            },
+            {
+                'ingredient': added.pk,
+                'measurement_unit': self.unit,
+                'amount': 1,
+            },
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {
+            row.ingredient_id: row
+            for row in self.recipe.ingredients_info.all()
+        }
+        self.assertEqual(
+            set(rows), {kept.ingredient_id, changed.ingredient_id, added.pk}
+        )
+        self.assertEqual(rows[kept.ingredient_id].pk, kept.pk)
+        self.assertEqual(rows[changed.ingredient_id].pk, changed.pk)
+        self.assertEqual(rows[changed.ingredient_id].amount, 5)
+        self.assertFalse(
+            RecipeIngredient.objects.filter(pk=removed.pk).exists()
+        )
+
+    def test_duplicate_ingredients_rejected(self):
+        ingredient = {
+            'ingredient': self.ingredients[0].pk,
+            'measurement_unit': self.unit,
+            'amount': 1,
+        }
+        response, writes = self.patch(
+            {'ingredients': [ingredient, dict(ingredient, amount=2)]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ingredients', response.data)
+        self.assertEqual(writes, [])
+
+        response = self.client.post(
+            '/api/recipes/',
+            self.payload(ingredients=[ingredient, ingredient]),
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_step_diff(self):
+        first, second = self.recipe.steps.order_by('serial_num')
+        ingredients = [ingredient.pk for ingredient in self.ingredients]
+        response, _ = self.patch({'steps': [
+            {
+                'serial_num': 1,
+                'title': first.title,
+                'description': first.description,
+                'ingredients': [ingredients[0], ingredients[3]],
+            },
+            {
+                'serial_num': 3,
+                'title': 'Шаг 3',
+                'description': 'Новый шаг',
+                'ingredients': [ingredients[4]],
+            },
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        steps = {step.serial_num: step for step in self.recipe.steps.all()}
+        self.assertEqual(set(steps), {1, 3})
+        self.assertEqual(steps[1].pk, first.pk)
+        self.assertFalse(Step.objects.filter(pk=second.pk).exists())
+        self.assertEqual(
+            set(steps[1].ingredients.values_list('pk', flat=True)),
+            {ingredients[0], ingredients[3]}
+        )
+        self.assertEqual(
+            set(steps[3].ingredients.values_list('pk', flat=True)),
+            {ingredients[4]}
+        )
@@ -0,0 +1,76 @@
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import ChangeLog, FavoriteRecipe
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user)
+
+URL = '/api/recipes/favorite/bulk/'
+
+
+class RelationsBulkTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('user')
+        author = create_user('author')
+        self.recipes = [create_recipe(author) for _ in range(2)]
+        self.ids = [recipe.pk for recipe in self.recipes]
+        self.client.force_authenticate(self.user)
+
+    def test_add_and_remove_are_idempotent(self):
+        response = self.client.post(URL, {'recipes': self.ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['changed']), self.ids)
+        self.assertEqual(
+            response.data['favorited_by_amount'],
+            {pk: 1 for pk in self.ids}
+        )
+
+        response = self.client.post(URL, {'recipes': self.ids}, format='json')
+        self.assertEqual(response.data['changed'], [])
+        self.assertEqual(
+            FavoriteRecipe.objects.filter(user=self.user).count(), 2
+        )
+
+        response = self.client.delete(
+            URL, {'recipes': self.ids}, format='json'
+        )
+        self.assertEqual(sorted(response.data['changed']), self.ids)
+        response = self.client.delete(
+            URL, {'recipes': self.ids}, format='json'
+        )
+        self.assertEqual(response.data['changed'], [])
+        self.assertEqual(
+            response.data['favorited_by_amount'],
+            {pk: 0 for pk in self.ids}
+        )
+        self.assertEqual(ChangeLog.objects.filter(
+            kind=ChangeLog.FAVORITE_RECIPE, user_id=self.user.pk
+        ).count(), 4)
+
+    def test_missing_recipes_are_skipped(self):
+        response = self.client.post(
+            URL, {'recipes': [self.ids[0], 0]}, format='json'
+        )
+        self.assertEqual(response.data['changed'], [self.ids[0]])
+
+    def test_invalid_body_is_rejected(self):
+        for body in (
+            self.ids, {'recipes': [True]}, {'recipes': 'abc'},
+            {'recipes': [{}]}, {},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(URL, body, format='json')
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertIn('recipes', response.data)
+        self.assertFalse(FavoriteRecipe.objects.exists())
+
+    @override_settings(RELATIONS_BULK_LIMIT=1)
+    def test_limit(self):
+        response = self.client.post(URL, {'recipes': self.ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
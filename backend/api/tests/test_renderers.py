@@ -0,0 +1,66 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer, orjson
+
+DATA = {
+    'id': 1,
+    'title': 'Борщ',
+    'amount': Decimal('1.50'),
+    'created': datetime(2022, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'unit': gettext_lazy('г'),
+    'tags': [{'id': 2, 'name': None}],
+    3: 'ключ-число',
+}
+
+
+@skipIf(orjson is None, 'orjson не установлен.')
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_same_output_as_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+        )
+
+    def test_line_separators_are_escaped(self):
+        data = {'text': 'a\u2028b\u2029c'}
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, b'{"text":"a\\u2028b\\u2029c"}')
+        self.assertEqual(rendered, JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        context = {'indent': 2}
+        self.assertEqual(
+            ORJSONRenderer().render(DATA, renderer_context=context),
+            JSONRenderer().render(DATA, renderer_context=context)
+        )
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@skipIf(orjson is None, 'orjson не установлен.')
+class ORJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), 'application/json', {})
+
+    def test_same_result_as_json_parser(self):
+        body = '{"title": "Борщ", "tags": [1, 2], "time": 1.5}'.encode()
+        self.assertEqual(
+            self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+        )
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            self.parse(ORJSONParser(), b'{"title": ')
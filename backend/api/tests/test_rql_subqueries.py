@@ -0,0 +1,106 @@
+from django.test import TestCase
+
+from api.filters import RecipeFilters
+from core.management.commands.bench_rql import JoinRecipeFilters
+from recipes.models import Equipment, Recipe, Tag
+from recipes.tests.factories import (create_ingredients, create_recipe,
+                                     create_selection, create_user)
+
+
+class SubqueryFiltersTests(TestCase):
+    '''
+    Фильтры по many-to-many через подзапросы находят те же рецепты,
+    что и JOIN (JoinRecipeFilters из bench_rql).
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user('author')
+        first, second, third = create_ingredients(3)
+        oven, pan = (
+            Equipment.objects.create(name=name) for name in ('oven', 'pan')
+        )
+        recipes = [
+            create_recipe(
+                author, tags=['a', 'b'], ingredients=[first, second],
+                servings=2
+            ),
+            create_recipe(author, tags=['a'], ingredients=[second]),
+            create_recipe(
+                author, tags=['b', 'c'], ingredients=[third], servings=4
+            ),
+            create_recipe(author),
+            create_recipe(
+                author, tags=['c'], ingredients=[first, third], servings=3
+            ),
+        ]
+        recipes[0].equipment.set([oven])
+        recipes[1].equipment.set([pan])
+        recipes[2].equipment.set([oven, pan])
+        create_selection(author, title='abc', recipes=recipes[3:])
+        create_selection(author, title='xyz', recipes=recipes[:2])
+
+        tags = dict(Tag.objects.values_list('name', 'id'))
+        cls.values = {
+            'a': tags['a'], 'b': tags['b'], 'c': tags['c'],
+            'i1': first.pk, 'i2': second.pk, 'i3': third.pk,
+            'oven': oven.pk, 'pan': pan.pk,
+        }
+
+    def ids(self, filters, query) -> set:
+        _, queryset = filters(Recipe.objects.all()).apply_filters(query)
+        return set(queryset.values_list('id', flat=True))
+
+    def assert_same(self, queries) -> None:
+        for query in queries:
+            query = query.format(**self.values)
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.ids(RecipeFilters, query),
+                    self.ids(JoinRecipeFilters, query)
+                )
+
+    def test_in_out_ne(self):
+        self.assert_same((
+            'in(ingredients.id,({i1},{i2}))',
+            'out(ingredients.id,({i1}))',
+            'ne(ingredients.id,{i1})',
+            'in(equipment.id,({pan}))',
+            'out(equipment.id,({oven},{pan}))',
+            'ne(equipment.id,{oven})',
+            'in(tags.id,({a},{c}))',
+            'out(tags.id,({b}))',
+            'not(in(tags.id,({a})))',
+        ))
+
+    def test_combined_namespaces(self):
+        self.assert_same((
+            'in(tags.id,({a},{b}))&in(ingredients.id,({i1},{i2}))'
+            '&in(equipment.id,({oven}))',
+            'in(tags.id,({b}))&out(ingredients.id,({i3}))',
+            'or(in(tags.id,({c})),in(equipment.id,({pan})))',
+            'like(selections.title,*ab*)&gt(servings,1)',
+            'like(tags.name,*a*)&eq(equipment.id,{oven})',
+        ))
+
+    def test_same_namespace_and(self):
+        self.assert_same((
+            'eq(tags.id,{a})&eq(tags.id,{b})',
+            'and(eq(tags.id,{a}),eq(tags.id,{b}))',
+            'eq(tags.name,a)&eq(tags.name,b)',
+            'or(eq(tags.id,{a}),eq(tags.id,{b}))',
+            'out(tags.id,({a}))&out(tags.id,({b}))',
+            'in(ingredients.id,({i1},{i2}))&in(ingredients.id,({i2},{i3}))',
+        ))
+
+    def test_filters_are_not_trivial(self):
+        self.assertEqual(
+            len(self.ids(RecipeFilters, 'out(tags.id,({a}))'.format(
+                **self.values
+            ))), 3
+        )
+        self.assertEqual(self.ids(
+            RecipeFilters, 'eq(tags.id,{a})&eq(tags.id,{b})'.format(
+                **self.values
+            )
+        ), set())
@@ -0,0 +1,78 @@
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import FavoriteRecipe
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_selection, create_user)
+
+URL = '/api/sync/'
+
+
+@override_settings(SYNC_LAG=0)
+class SyncTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('user')
+        self.client.force_authenticate(self.user)
+        self.selections = [
+            create_selection(self.user, title=f'Подборка {number}')
+            for number in range(3)
+        ]
+        self.token = self.client.get(URL).data['next']
+
+    def sync(self) -> dict:
+        response = self.client.get(URL, {'since': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.token = response.data['next']
+        return response.data
+
+    def changed_selections(self) -> set:
+        return {
+            selection['id']
+            for selection in self.sync()['selections']['changed']
+        }
+
+    def test_selection_changes_are_logged(self):
+        first, second, third = (selection.pk for selection in self.selections)
+        recipe = create_recipe(self.user)
+        recipe.selections.set([first])
+        data = self.sync()
+        self.assertEqual(
+            [item['id'] for item in data['recipes']['changed']], [recipe.pk]
+        )
+        self.assertEqual(
+            [item['id'] for item in data['selections']['changed']], [first]
+        )
+
+        response = self.client.patch(
+            f'/api/recipes/{recipe.pk}/', {'selections': [second]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.changed_selections(), {first, second})
+
+        self.selections[2].recipes.add(recipe)
+        self.assertEqual(self.changed_selections(), {third})
+        self.assertEqual(self.changed_selections(), set())
+
+    def test_deleted_recipe_and_private_favorites(self):
+        recipe = create_recipe(self.user)
+        FavoriteRecipe.objects.create(user=self.user, recipe=recipe)
+        FavoriteRecipe.objects.create(user=create_user('other'), recipe=recipe)
+        self.assertEqual(
+            self.sync()['favorite_recipes'],
+            {'added': [recipe.pk], 'removed': []}
+        )
+
+        recipe_id = recipe.pk
+        recipe.delete()
+        data = self.sync()
+        self.assertEqual(data['recipes']['deleted'], [recipe_id])
+        self.assertEqual(data['favorite_recipes']['removed'], [recipe_id])
+
+    def test_invalid_token(self):
+        response = self.client.get(URL, {'since': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,237 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe, Upload
+from recipes.tests.factories import (UNIT, IsolatedTestMixin,
+                                     create_ingredients, create_user,
+                                     png_bytes)
+from recipes.uploads import chunk_path, chunks_dir, write_chunk
+
+URL = '/api/uploads/'
+CHUNK_SIZE = 16
+
+
+class TempDirMixin:
+    '''Части загрузок во временном каталоге, свой на каждый тест.'''
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        temp_settings = override_settings(UPLOAD_TEMP_DIR=temp_dir)
+        temp_settings.enable()
+        self.addCleanup(temp_settings.disable)
+
+
+class BrokenStream(io.BytesIO):
+    '''Поток, который обрывается после первого блока.'''
+
+    def read(self, size=-1):
+        if self.tell() > 0:
+            raise ConnectionResetError
+        return super().read(size)
+
+
+class LockstepStream(io.BytesIO):
+    '''Поток, который отдаёт блоки вместе с другим таким же потоком.'''
+
+    def __init__(self, content, barrier):
+        super().__init__(content)
+        self.barrier = barrier
+
+    def read(self, size=-1):
+        self.barrier.wait(5)
+        return super().read(size)
+
+
+@override_settings(UPLOAD_BUFFER_SIZE=4)
+class WriteChunkTests(TempDirMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.upload = Upload(
+            pk='00000000-0000-0000-0000-000000000001',
+            size=CHUNK_SIZE * 2, chunk_size=CHUNK_SIZE
+        )
+
+    def files(self) -> list:
+        return sorted(os.listdir(chunks_dir(self.upload)))
+
+    def test_retry_replaces_chunk(self):
+        self.assertTrue(write_chunk(self.upload, 1, io.BytesIO(b'a' * 8), 8))
+        self.assertTrue(write_chunk(self.upload, 1, io.BytesIO(b'b' * 8), 8))
+        self.assertEqual(self.files(), ['1'])
+        with open(chunk_path(self.upload, 1), 'rb') as chunk:
+            self.assertEqual(chunk.read(), b'b' * 8)
+
+    def test_incomplete_writes_leave_nothing(self):
+        self.assertFalse(write_chunk(self.upload, 0, io.BytesIO(b'abc'), 8))
+        with self.assertRaises(ConnectionResetError):
+            write_chunk(self.upload, 0, BrokenStream(b'a' * 8), 8)
+        self.assertEqual(self.files(), [])
+
+    def test_concurrent_writers_do_not_mix(self):
+        barrier = threading.Barrier(2)
+        with ThreadPoolExecutor(2) as pool:
+            futures = [
+                pool.submit(
+                    write_chunk, self.upload, 0,
+                    LockstepStream(byte * 8, barrier), 8
+                )
+                for byte in (b'x', b'y')
+            ]
+        self.assertEqual([future.result() for future in futures], [True] * 2)
+        self.assertEqual(self.files(), ['0'])
+        with open(chunk_path(self.upload, 0), 'rb') as chunk:
+            self.assertIn(chunk.read(), (b'x' * 8, b'y' * 8))
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=CHUNK_SIZE)
+class UploadViewSetTests(TempDirMixin, IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('author')
+        self.client.force_authenticate(self.user)
+
+    def create(self, content, kind=Upload.IMAGE, filename='photo.png'):
+        response = self.client.post(
+            URL, {'kind': kind, 'filename': filename, 'size': len(content)},
+            format='json'
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, response.data
+        )
+        return response.data
+
+    def put_chunk(self, upload, number, part):
+        return self.client.generic(
+            'PUT', f'{URL}{upload["id"]}/chunks/{number}/', part,
+            content_type='application/octet-stream'
+        )
+
+    def upload(self, content, skip=(), **fields) -> dict:
+        upload = self.create(content, **fields)
+        for number in range(upload['chunks']):
+            if number in skip:
+                continue
+            part = content[number * CHUNK_SIZE:(number + 1) * CHUNK_SIZE]
+            response = self.put_chunk(upload, number, part)
+            self.assertEqual(
+                response.status_code, status.HTTP_200_OK, response.data
+            )
+        return upload
+
+    def finalize(self, upload):
+        return self.client.post(f'{URL}{upload["id"]}/finalize/')
+
+    def recipe_payload(self, token) -> dict:
+        ingredient, = create_ingredients(1)
+        return {
+            'title': 'Рецепт',
+            'description': 'Описание',
+            'servings': 2,
+            'cooking_time': {'hours': 0, 'minutes': 30},
+            'images': [{'token': token, 'is_cover': 1}],
+            'ingredients': [{
+                'ingredient': ingredient.pk, 'measurement_unit': UNIT,
+                'amount': 1
+            }],
+            'steps': [{
+                'serial_num': 1, 'title': 'Шаг', 'description': 'Описание',
+                'ingredients': [ingredient.pk],
+            }],
+        }
+
+    def test_resume_finalize_and_use(self):
+        content = png_bytes()
+        upload = self.upload(content, skip=(1,))
+        chunks = upload['chunks']
+        self.assertGreater(chunks, 2)
+
+        response = self.finalize(upload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Не получены части: 1.', str(response.data))
+        received = self.client.get(f'{URL}{upload["id"]}/').data['received']
+        self.assertEqual(received, [0] + list(range(2, chunks)))
+
+        self.put_chunk(upload, 1, content[CHUNK_SIZE:CHUNK_SIZE * 2])
+        response = self.finalize(upload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = response.data['token']
+        self.assertEqual(token, upload['id'])
+        self.assertFalse(os.path.exists(chunks_dir(Upload(pk=token))))
+
+        response = self.client.post(
+            '/api/recipes/', self.recipe_payload(token), format='json'
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, response.data
+        )
+        image = Recipe.objects.get().images.get().image
+        with image.open('rb'):
+            self.assertEqual(image.read(), content)
+        self.assertFalse(Upload.objects.exists())
+
+        response = self.client.post(
+            '/api/recipes/', self.recipe_payload(token), format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_chunks(self):
+        upload = self.create(b'x' * (CHUNK_SIZE + 4))
+        response = self.put_chunk(upload, 1, b'x' * CHUNK_SIZE)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('длиной 4 байт', str(response.data))
+
+        response = self.put_chunk(upload, 2, b'x' * 4)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_not_an_image(self):
+        upload = self.upload(b'not an image' * 3)
+        response = self.finalize(upload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Upload.objects.get(pk=upload['id']).file)
+
+    def test_validation(self):
+        response = self.client.post(URL, {
+            'kind': Upload.VIDEO, 'filename': 'clip.exe', 'size': 10
+        }, format='json')
+        self.assertIn('filename', response.data)
+        response = self.client.post(URL, {
+            'kind': Upload.IMAGE, 'filename': 'photo.png', 'size': 0
+        }, format='json')
+        self.assertIn('size', response.data)
+
+    def test_other_users_uploads_hidden(self):
+        upload = self.upload(b'x' * 10, kind=Upload.VIDEO, filename='a.mp4')
+        self.client.force_authenticate(create_user('other'))
+        response = self.client.get(f'{URL}{upload["id"]}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_clear_uploads(self):
+        old = self.upload(b'x' * 20, kind=Upload.VIDEO, filename='a.mp4')
+        new = self.upload(b'x' * 20, kind=Upload.VIDEO, filename='b.mp4')
+        Upload.objects.filter(pk=old['id']).update(
+            created=timezone.now() - timedelta(hours=48)
+        )
+        stdout = io.StringIO()
+        call_command('clear_uploads', hours=24, stdout=stdout)
+        self.assertIn('Удалено загрузок: 1.', stdout.getvalue())
+        self.assertEqual(
+            list(Upload.objects.values_list('pk', flat=True)),
+            [Upload.objects.get(pk=new['id']).pk]
+        )
+        self.assertFalse(os.path.exists(chunks_dir(Upload(pk=old['id']))))
@@ -0,0 +1,6 @@
+from rest_framework.throttling import UserRateThrottle
+
+
+class ExportThrottle(UserRateThrottle):
+    '''Ограничение частоты полной выгрузки рецептов (EXPORT_THROTTLE_RATE).'''
+    scope = 'export'
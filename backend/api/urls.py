@@ -2,12 +2,17 @@ from django.urls import include, path
 
 from rest_framework import routers
 
-from .views import RecipeViewSet, SelectionViewSet
+from .views import (FeedViewSet, RecipeViewSet, SelectionViewSet, StatsViewSet,
+                    SyncViewSet, UploadViewSet)
 
 router = routers.DefaultRouter()
 
 router.register('recipes', RecipeViewSet, basename='recipes')
 router.register('selections', SelectionViewSet, basename='selections')
+router.register('feed', FeedViewSet, basename='feed')
+router.register('sync', SyncViewSet, basename='sync')
+router.register('uploads', UploadViewSet, basename='uploads')
+router.register('stats', StatsViewSet, basename='stats')
 # router.register('tags', TagViewSet, basename='tags')
 # router.register('ingredients', IngredientViewSet, basename='ingredients')
 # router.register('users', CustomUserViewSet, basename='users')
@@ -1,26 +1,48 @@
 import random
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 # from django_filters.rest_framework import DjangoFilterBackend
-from dj_rql.drf import RQLFilterBackend
 # from dj_rql.drf.compat import DjangoFiltersRQLFilterBackend
 from djoser.views import UserViewSet
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, serializers, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
-# from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+# from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from recipes.models import FavoriteRecipe, Recipe, Selection
-
-from .filters import RecipeFilters
-from .pagination import CursorSetPagination
+from recipes.changelog import changes_since, decode_token, encode_token, head
+from recipes.feed import get_feed
+from recipes.matching import ingredient_index
+from recipes.models import (ChangeLog, FavoriteRecipe, FavoriteSelection,
+                            Recipe, RecommendRecipe, RecommendSelection,
+                            Selection, SimilarRecipe, Upload,
+                            UserRecommendation)
+from recipes.relations import add_relations, count_relations, remove_relations
+from recipes.uploads import (assemble, chunk_count, chunk_length, discard,
+                             write_chunk)
+
+from .authentication import token_cache
+from .export import export_recipes
+from .facets import get_facets
+from .filters import CachedRQLFilterBackend, RecipeFilters, rql_stats
+from .guardrails import QueryCostFilter, StatementTimeoutMixin
+from .pagination import (CursorSetPagination, FeedPagination,
+                         RecommendationPagination)
 from .permissions import IsAuthorOrReadOnly
-from .serializers import (FavoriteSerializer, RecipeListSerializer,
-                          RecipeSerializer, SelectionListSerializer,
-                          SelectionSerializer)
+from .projections import (RECIPE_COLUMNS, project_recipe_ids, project_recipes,
+                          recipe_list_data, use_projection)
+from .serializers import (RecipeListSerializer, RecipeSerializer,
+                          SelectionListSerializer, SelectionSerializer,
+                          UploadSerializer)
+from .throttles import ExportThrottle
 
 # from django.http import HttpResponse
 
@@ -31,15 +53,81 @@ from .serializers import (FavoriteSerializer, RecipeListSerializer,
 User = get_user_model()
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class UserRelationMixin:
+    '''
+    Идемпотентные избранное и рекомендации: одна вставка
+    INSERT ... ON CONFLICT DO NOTHING или DELETE ... RETURNING на запрос.
+    '''
+
+    def user_relation(self, request, pk, model, field, counter):
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise NotFound
+
+        if request.method == 'POST':
+            added = add_relations(model, request.user.id, field, [pk])
+            if not added and not model.objects.filter(
+                user=request.user, **{field: pk}
+            ).exists():
+                raise NotFound
+            return Response(
+                {
+                    'id': pk,
+                    counter: count_relations(model, field, [pk])[pk]
+                },
+                status=(
+                    status.HTTP_201_CREATED if added else status.HTTP_200_OK
+                )
+            )
+
+        remove_relations(model, request.user.id, field, [pk])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def user_relation_bulk(self, request, model, field, counter):
+        key = f'{field}s'
+        ids_field = serializers.ListField(
+            child=serializers.IntegerField(),
+            max_length=settings.RELATIONS_BULK_LIMIT
+        )
+        if not isinstance(request.data, dict):
+            raise ValidationError({key: f'Ожидается объект с полем {key}.'})
+        try:
+            ids = ids_field.run_validation(request.data.get(key))
+        except ValidationError as error:
+            raise ValidationError({key: error.detail})
+
+        if request.method == 'POST':
+            changed = add_relations(model, request.user.id, field, ids)
+        else:
+            changed = remove_relations(model, request.user.id, field, ids)
+
+        return Response(
+            {
+                'changed': changed,
+                counter: count_relations(model, field, ids)
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class RecipeViewSet(
+    StatementTimeoutMixin, UserRelationMixin, viewsets.ModelViewSet
+):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = [
         IsAuthorOrReadOnly,
     ]
     pagination_class = CursorSetPagination
-    filter_backends = (RQLFilterBackend, filters.OrderingFilter)
+    filter_backends = (
+        CachedRQLFilterBackend, filters.OrderingFilter, QueryCostFilter
+    )
     rql_filter_class = RecipeFilters
+    statement_timeouts = {
+        'list': settings.LIST_STATEMENT_TIMEOUT,
+        'facets': settings.FACETS_STATEMENT_TIMEOUT,
+    }
     ordering_fields = ['created']
     ordering = ('-created',)
     # filter_backends = [
@@ -57,10 +145,27 @@ class RecipeViewSet(viewsets.ModelViewSet):
         #     return ShoppingCartSerializer
         if self.action == 'list':
             return RecipeListSerializer
-        if self.action == 'favorite':
-            return FavoriteSerializer
         return RecipeSerializer
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not use_projection(request):
+            return self.paginate_response(queryset)
+
+        rows = queryset.prefetch_related(None).values(*RECIPE_COLUMNS)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(project_recipes(rows, request))
+        return self.get_paginated_response(project_recipes(page, request))
+
+    def paginate_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     # def get_queryset(self):
     #     if self.action == 'shopping_cart':
     #         return ShoppingCart.objects.all()
@@ -75,35 +180,6 @@ class RecipeViewSet(viewsets.ModelViewSet):
     # def perform_create(self, serializer):
     #     serializer.save(author=self.request.user)
 
-    def user_recipe_relation(self, request, pk, **kwargs):
-        model = kwargs.get('model')
-        error_message = kwargs.get('error_message')
-
-        if request.method == 'POST':
-            serializer = self.get_serializer(data={
-                'recipe': pk
-            })
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        if request.method == 'DELETE':
-            user = self.request.user
-            recipe = get_object_or_404(Recipe, id=pk)
-
-            try:
-                relation = model.objects.get(
-                    user=user,
-                    recipe=recipe
-                )
-            except model.DoesNotExist:
-                raise ValidationError(error_message)
-
-            self.perform_destroy(relation)
-            return Response(status=status.HTTP_204_NO_CONTENT)
-
-        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
-
     # @action(methods=['post', 'delete'], detail=True)
     # def shopping_cart(self, request, *args, **kwargs):
     #     return self.user_recipe_relation(
@@ -116,9 +192,130 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     @action(methods=['post', 'delete'], detail=True)
     def favorite(self, request, *args, **kwargs):
-        return self.user_recipe_relation(
-            request, kwargs.get('pk'), model=FavoriteRecipe,
-            error_message='Этот рецепт уже не находится у вас в избранном.'
+        return self.user_relation(
+            request, kwargs.get('pk'), FavoriteRecipe, 'recipe',
+            counter='favorited_by_amount'
+        )
+
+    @action(methods=['post', 'delete'], detail=True)
+    def recommend(self, request, *args, **kwargs):
+        return self.user_relation(
+            request, kwargs.get('pk'), RecommendRecipe, 'recipe',
+            counter='recommended_by_amount'
+        )
+
+    @action(methods=['post', 'delete'], detail=False, url_path='favorite/bulk')
+    def favorite_bulk(self, request, *args, **kwargs):
+        return self.user_relation_bulk(
+            request, FavoriteRecipe, 'recipe', counter='favorited_by_amount'
+        )
+
+    @action(
+        methods=['post', 'delete'], detail=False, url_path='recommend/bulk'
+    )
+    def recommend_bulk(self, request, *args, **kwargs):
+        return self.user_relation_bulk(
+            request, RecommendRecipe, 'recipe',
+            counter='recommended_by_amount'
+        )
+
+    @action(methods=['get'], detail=False)
+    def match(self, request, *args, **kwargs):
+        try:
+            have = [
+                int(pk) for pk in request.query_params.get('have', '').split(
+                    ','
+                ) if pk
+            ]
+            max_missing = int(request.query_params.get('max_missing', 0))
+        except ValueError:
+            raise ValidationError(
+                'Параметры have и max_missing должны быть целыми числами.'
+            )
+
+        if not have:
+            raise ValidationError('Не было передано ни одного ингредиента.')
+        if len(set(have)) > settings.MATCH_MAX_INGREDIENTS:
+            raise ValidationError(
+                'Слишком много ингредиентов (макс '
+                f'{settings.MATCH_MAX_INGREDIENTS}).'
+            )
+
+        if not (0 <= max_missing <= settings.MATCH_MAX_MISSING):
+            raise ValidationError(
+                'max_missing вне диапазона. Должно быть между 0 и '
+                f'{settings.MATCH_MAX_MISSING}.'
+            )
+
+        matches = ingredient_index.match(have, max_missing)
+        top = matches[:settings.MATCH_RESULTS_LIMIT]
+        recipes = {
+            data['id']: data for data in recipe_list_data(
+                request, [recipe_id for recipe_id, *_ in top]
+            )
+        }
+        results = []
+        for recipe_id, matched, missing, _ in top:
+            if recipe_id not in recipes:
+                continue
+            data = recipes[recipe_id]
+            data['matched_amount'] = matched
+            data['missing_amount'] = missing
+            results.append(data)
+
+        return Response(
+            {'count': len(matches), 'results': results},
+            status=status.HTTP_200_OK
+        )
+
+    @action(methods=['get'], detail=True)
+    def similar(self, request, *args, **kwargs):
+        neighbours = SimilarRecipe.objects.filter(
+            recipe_id=kwargs.get('pk')
+        ).order_by('-score').values_list('similar_id', flat=True)
+        return Response(
+            recipe_list_data(request, list(neighbours)),
+            status=status.HTTP_200_OK
+        )
+
+    @action(
+        methods=['get'], detail=False, permission_classes=[IsAuthenticated]
+    )
+    def recommended(self, request, *args, **kwargs):
+        paginator = RecommendationPagination()
+        page = paginator.paginate_queryset(
+            UserRecommendation.objects.filter(user=request.user),
+            request
+        )
+        return paginator.get_paginated_response(recipe_list_data(
+            request, [suggestion.recipe_id for suggestion in page]
+        ))
+
+    @action(methods=['get'], detail=False)
+    def facets(self, request, *args, **kwargs):
+        return Response(get_facets(
+            CachedRQLFilterBackend.get_query(None, request, self),
+            self.filter_queryset(self.get_queryset())
+        ))
+
+    @action(
+        methods=['get'], detail=False, permission_classes=[IsAdminUser],
+        throttle_classes=[ExportThrottle]
+    )
+    def export(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise ValidationError(
+                    'Неверный формат даты в since (ожидается ISO 8601).'
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        return StreamingHttpResponse(
+            export_recipes(request, since=since),
+            content_type='application/x-ndjson'
         )
 
     @action(methods=['get'], detail=False)
@@ -169,7 +366,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
     #     return response
 
 
-class SelectionViewSet(viewsets.ModelViewSet):
+class SelectionViewSet(UserRelationMixin, viewsets.ModelViewSet):
     queryset = Selection.objects.all()
     serializer_class = SelectionSerializer
     permission_classes = [
@@ -181,6 +378,20 @@ class SelectionViewSet(viewsets.ModelViewSet):
             return SelectionListSerializer
         return SelectionSerializer
 
+    @action(methods=['post', 'delete'], detail=True)
+    def favorite(self, request, *args, **kwargs):
+        return self.user_relation(
+            request, kwargs.get('pk'), FavoriteSelection, 'selection',
+            counter='favorited_by_amount'
+        )
+
+    @action(methods=['post', 'delete'], detail=True)
+    def recommend(self, request, *args, **kwargs):
+        return self.user_relation(
+            request, kwargs.get('pk'), RecommendSelection, 'selection',
+            counter='recommended_by_amount'
+        )
+
     @action(methods=['get'], detail=True)
     def random_recipe(self, request, *args, **kwargs):
         selection = get_object_or_404(Selection, pk=kwargs.get('pk'))
@@ -192,6 +403,166 @@ class SelectionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    serializer_class = RecipeListSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+    pagination_class = FeedPagination
+
+    def get_queryset(self):
+        return get_feed(
+            self.request.user,
+            first_page=self.paginator.cursor_query_param
+            not in self.request.query_params
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(recipe_list_data(
+            request, [entry.recipe_id for entry in page]
+        ))
+
+
+class SyncViewSet(viewsets.ViewSet):
+    '''
+    Дельта-синхронизация. Без since возвращает только токен текущего
+    состояния: клиент скачивает данные обычными запросами и дальше
+    присылает токен, получая изменения после него.
+    '''
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    @staticmethod
+    def split(changes) -> tuple:
+        return (
+            [pk for pk, deleted in changes.items() if not deleted],
+            [pk for pk, deleted in changes.items() if deleted],
+        )
+
+    def list(self, request, *args, **kwargs):
+        token = request.query_params.get('since')
+        if token is None:
+            return Response({'next': encode_token(head()), 'has_more': False})
+
+        since = decode_token(token)
+        if since is None:
+            raise ValidationError({'since': 'Неверный токен синхронизации.'})
+
+        changes, last, has_more = changes_since(request.user, since)
+        recipes, deleted_recipes = self.split(changes[ChangeLog.RECIPE])
+        selections, deleted_selections = self.split(
+            changes[ChangeLog.SELECTION]
+        )
+        data = {
+            'next': encode_token(last),
+            'has_more': has_more,
+            'recipes': {
+                'changed': self.recipe_data(request, recipes),
+                'deleted': deleted_recipes,
+            },
+            'selections': {
+                'changed': SelectionListSerializer(
+                    Selection.objects.filter(id__in=selections),
+                    many=True,
+                    context={'request': request}
+                ).data,
+                'deleted': deleted_selections,
+            },
+        }
+        for kind, key in (
+            (ChangeLog.FAVORITE_RECIPE, 'favorite_recipes'),
+            (ChangeLog.FAVORITE_SELECTION, 'favorite_selections'),
+            (ChangeLog.FOLLOW, 'follows'),
+        ):
+            added, removed = self.split(changes[kind])
+            data[key] = {'added': added, 'removed': removed}
+        return Response(data)
+
+    @staticmethod
+    def recipe_data(request, recipe_ids) -> list:
+        if use_projection(request):
+            return project_recipe_ids(recipe_ids, request)
+        return RecipeListSerializer(
+            Recipe.objects.filter(id__in=recipe_ids),
+            many=True,
+            context={'request': request}
+        ).data
+
+
+class StatsViewSet(viewsets.ViewSet):
+    '''Счётчики кэшей текущего процесса.'''
+    permission_classes = [
+        IsAdminUser,
+    ]
+
+    def list(self, request, *args, **kwargs):
+        return Response({
+            'token_cache': token_cache.stats(),
+            'rql': rql_stats.stats(),
+        })
+
+
+class UploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    '''
+    Загрузка видео и картинок по частям. Клиент создаёт загрузку,
+    отправляет части с номерами от 0 телом PUT (application/octet-stream),
+    после обрыва узнаёт полученные части через GET, а после finalize
+    получает токен для полей video_token и images[].token рецепта.
+    '''
+    serializer_class = UploadSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def get_queryset(self):
+        return Upload.objects.filter(author=self.request.user)
+
+    def perform_destroy(self, instance):
+        discard(instance)
+
+    @action(
+        methods=['put'], detail=True, url_path=r'chunks/(?P<number>\d+)'
+    )
+    def chunk(self, request, pk=None, number=None):
+        upload = self.get_object()
+        if upload.file:
+            raise ValidationError('Загрузка уже завершена.')
+        number = int(number)
+        if number >= chunk_count(upload):
+            raise ValidationError(
+                f'У загрузки всего {chunk_count(upload)} частей.'
+            )
+        length = chunk_length(upload, number)
+        if request.META.get('CONTENT_LENGTH') != str(length):
+            raise ValidationError(
+                f'Часть {number} должна быть длиной {length} байт.'
+            )
+        # Тело читается из потока, а не через request.data,
+        # чтобы часть не попадала в память целиком.
+        if not write_chunk(upload, number, request._request, length):
+            raise ValidationError('Часть передана не полностью.')
+        return Response(self.get_serializer(upload).data)
+
+    @action(methods=['post'], detail=True)
+    def finalize(self, request, pk=None):
+        upload = self.get_object()
+        with transaction.atomic():
+            upload = Upload.objects.select_for_update().get(pk=upload.pk)
+            if not upload.file:
+                try:
+                    assemble(upload)
+                except ValueError as exc:
+                    raise ValidationError(str(exc))
+        return Response(self.get_serializer(upload).data)
+
+
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     ...
 #     queryset = Tag.objects.all()
@@ -0,0 +1,158 @@
+import itertools
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+from django.db.backends.utils import CursorDebugWrapper, CursorWrapper
+
+PLACEHOLDER_RE = re.compile(r'%%|%s')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias):
+    '''Семафор, ограничивающий число соединений процесса с базой.'''
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = threading.BoundedSemaphore(settings.DB_POOL_SIZE)
+        return _pools[alias]
+
+
+def to_prepared_sql(sql):
+    '''Заменяет плейсхолдеры psycopg2 (%s) на параметры PREPARE ($1...).'''
+    counter = iter(range(1, sql.count('%s') + 1))
+    return PLACEHOLDER_RE.sub(
+        lambda match: '%' if match.group() == '%%' else f'${next(counter)}',
+        sql
+    )
+
+
+class PreparedCursorMixin:
+    def _execute(self, sql, params, *ignored_wrapper_args):
+        statement = self.db.get_prepared(self.cursor, sql, params)
+        if statement is None:
+            return super()._execute(sql, params, *ignored_wrapper_args)
+
+        if params:
+            placeholders = ', '.join(['%s'] * len(params))
+            statement = f'{statement} ({placeholders})'
+        return super()._execute(
+            f'EXECUTE {statement}', params, *ignored_wrapper_args
+        )
+
+
+class PreparedCursorWrapper(PreparedCursorMixin, CursorWrapper):
+    pass
+
+
+class PreparedCursorDebugWrapper(PreparedCursorMixin, CursorDebugWrapper):
+    pass
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    '''
+    PostgreSQL с ограничением числа соединений на процесс
+    (DB_POOL_SIZE), проверкой соединения перед первым использованием
+    в запросе (DB_CONN_HEALTH_CHECKS) и кэшем серверных подготовленных
+    выражений для часто повторяющихся SELECT (DB_PREPARED_STATEMENTS).
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.prepared = OrderedDict()
+        self.seen = OrderedDict()
+        self.statement_ids = itertools.count()
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias)
+        if not pool.acquire(timeout=settings.DB_POOL_TIMEOUT):
+            raise self.Database.OperationalError(
+                'Превышен лимит соединений с базой данных.'
+            )
+        try:
+            connection = super().get_new_connection(conn_params)
+        except Exception:
+            pool.release()
+            raise
+        # Место в пуле освобождается вместе с самим соединением: и при
+        # close(), и когда поток завершился, не закрыв соединение.
+        self.pool_release = weakref.finalize(connection, pool.release)
+        self.health_check_done = True
+        self.prepared.clear()
+        self.seen.clear()
+        self.statement_ids = itertools.count()
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return None
+        try:
+            return super()._close()
+        finally:
+            self.pool_release()
+
+    def close_if_unusable_or_obsolete(self):
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and settings.DB_CONN_HEALTH_CHECKS
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def get_prepared(self, cursor, sql, params):
+        '''
+        Имя подготовленного выражения для sql или None. Готовятся только
+        SELECT, выполненные не меньше DB_PREPARE_THRESHOLD раз.
+        '''
+        if (
+            not settings.DB_PREPARED_STATEMENTS
+            or params is None
+            or getattr(cursor, 'name', None)
+            or not sql.startswith('SELECT')
+        ):
+            return None
+
+        if sql in self.prepared:
+            self.prepared.move_to_end(sql)
+            return self.prepared[sql]
+
+        self.seen[sql] = self.seen.pop(sql, 0) + 1
+        if len(self.seen) > settings.DB_PREPARED_STATEMENTS_SIZE:
+            self.seen.popitem(last=False)
+        if (
+            self.seen[sql] < settings.DB_PREPARE_THRESHOLD
+            or not self.get_autocommit()
+        ):
+            return None
+
+        name = f'stmt_{next(self.statement_ids)}'
+        try:
+            cursor.execute(f'PREPARE {name} AS {to_prepared_sql(sql)}')
+        except self.Database.Error:
+            self.seen[sql] = -float('inf')
+            return None
+
+        self.prepared[sql] = name
+        if len(self.prepared) > settings.DB_PREPARED_STATEMENTS_SIZE:
+            _, evicted = self.prepared.popitem(last=False)
+            cursor.execute(f'DEALLOCATE {evicted}')
+        return name
+
+    def make_debug_cursor(self, cursor):
+        return PreparedCursorDebugWrapper(cursor, self)
+
+    def make_cursor(self, cursor):
+        return PreparedCursorWrapper(cursor, self)
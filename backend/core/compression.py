@@ -0,0 +1,52 @@
+import gzip
+import re
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESS_BR_QUALITY)
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESS_GZIP_LEVEL, mtime=0
+    )
+
+
+def accepted_encoding(accept_encoding: str):
+    '''Лучшее из поддерживаемых сжатий, которое принимает клиент.'''
+    accepted = {
+        token.split(';')[0].strip()
+        for token in accept_encoding.lower().split(',')
+        if not re.search(r';\s*q=0(\.0*)?\s*$', token)
+    }
+    for encoding in ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str, size: int) -> bool:
+    return (
+        size >= settings.COMPRESS_MIN_SIZE
+        and content_type.split(';')[0].strip()
+        in settings.COMPRESS_CONTENT_TYPES
+    )
+
+
+def compress_all(content: bytes, content_type: str) -> dict:
+    '''Все варианты сжатия, которые меньше исходного содержимого.'''
+    if not is_compressible(content_type, len(content)):
+        return {}
+    variants = {}
+    for encoding in ENCODINGS:
+        compressed = compress(content, encoding)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
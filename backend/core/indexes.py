@@ -0,0 +1,147 @@
+import re
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import connections, models
+
+from .slow_queries import read_log
+
+CONDITION = re.compile(
+    r'\(*(?P<column>[a-z_][a-z0-9_]*)\)*(?:::[a-z ]+)?\s*'
+    r'(?P<operator>= ANY|<>|<=|>=|=|<|>|IS NOT NULL|IS NULL)'
+)
+EQUALITY = ('=', '= ANY')
+RANGE = ('<', '>', '<=', '>=')
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def table_models() -> dict:
+    return {
+        model._meta.db_table: model for model in apps.get_models()
+        if not model._meta.proxy
+    }
+
+
+def field_names(model) -> dict:
+    return {
+        field.column: field.name for field in model._meta.concrete_fields
+    }
+
+
+def split_condition(condition, columns) -> tuple:
+    '''
+    Столбцы условия Filter из плана: сравнения на равенство,
+    диапазоны и проверки на NULL. LIKE и OR индексом b-tree
+    не ускоряются и не учитываются.
+    '''
+    equality, ranges, nulls = [], [], []
+    if ' OR ' in condition:
+        return equality, ranges, nulls
+    for match in CONDITION.finditer(condition):
+        column, operator = match.group('column', 'operator')
+        if column not in columns:
+            continue
+        if operator in EQUALITY:
+            target = equality
+        elif operator in RANGE:
+            target = ranges
+        else:
+            target = nulls
+            column = (column, operator)
+        if column not in target:
+            target.append(column)
+    return equality, ranges, nulls
+
+
+def existing_indexes(table, using) -> list:
+    with connections[using].cursor() as cursor:
+        constraints = connections[using].introspection.get_constraints(
+            cursor, table
+        )
+    return [
+        constraint['columns'] for constraint in constraints.values()
+        if constraint['index'] or constraint['unique']
+        or constraint['primary_key']
+    ]
+
+
+def is_covered(columns, indexes) -> bool:
+    return any(index[:len(columns)] == columns for index in indexes)
+
+
+def advise(path, using='default', min_queries=1) -> list:
+    '''
+    Предлагает индексы по журналу медленных запросов. Для каждого
+    последовательного чтения или фильтра после индекса в плане
+    собирается ключ: сначала столбцы с равенством, затем один столбец
+    с диапазоном; проверки на NULL становятся условием частичного
+    индекса. Ключи, которые уже покрыты индексом, пропускаются.
+    '''
+    models_by_table = table_models()
+    stats = defaultdict(lambda: {'queries': 0, 'duration': 0.0, 'rql': set()})
+    for entry in read_log(path):
+        for plan in entry.get('plan') or ():
+            for node in plan_nodes(plan['Plan']):
+                model = models_by_table.get(node.get('Relation Name'))
+                if model is None or 'Filter' not in node:
+                    continue
+                equality, ranges, nulls = split_condition(
+                    node['Filter'], field_names(model)
+                )
+                key_columns = tuple(equality + ranges[:1])
+                if not key_columns:
+                    continue
+                key = (model, key_columns, tuple(nulls))
+                stats[key]['queries'] += 1
+                stats[key]['duration'] += entry['duration']
+                stats[key]['rql'].add(entry['rql'])
+
+    advice = []
+    for (model, key_columns, nulls), stat in stats.items():
+        if stat['queries'] < min_queries:
+            continue
+        if not nulls and is_covered(
+            list(key_columns), existing_indexes(model._meta.db_table, using)
+        ):
+            continue
+        names = field_names(model)
+        advice.append({
+            'model': model,
+            'fields': [names[column] for column in key_columns],
+            'nulls': [(names[column], operator) for column, operator in nulls],
+            **stat,
+        })
+    return sorted(advice, key=lambda item: -item['duration'])
+
+
+def make_index(item) -> models.Index:
+    model = item['model']
+    condition = None
+    if item['nulls']:
+        condition = models.Q(**{
+            f'{field}__isnull': operator == 'IS NULL'
+            for field, operator in item['nulls']
+        })
+    index = models.Index(fields=item['fields'])
+    index.set_name_with_model(model)
+    index.condition = condition
+    return index
+
+
+def index_source(index) -> str:
+    '''
+    Текст models.Index(...) для Meta.indexes модели: индекс, добавленный
+    только миграцией, makemigrations сразу предложит удалить.
+    '''
+    arguments = [f'fields={index.fields!r}', f'name={index.name!r}']
+    if index.condition is not None:
+        lookups = ', '.join(
+            f'{lookup}={value!r}' for lookup, value in index.condition.children
+        )
+        arguments.append(f'condition=models.Q({lookups})')
+    return 'models.Index(\n    ' + ',\n    '.join(arguments) + '\n)'
@@ -0,0 +1,68 @@
+import textwrap
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from core.indexes import advise, index_source, make_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает журнал медленных запросов RQL (SLOW_QUERY_LOG) '
+        'и предлагает составные и частичные индексы. Миграции не '
+        'создаются: индекс, которого нет в Meta.indexes модели, '
+        'makemigrations сразу предложит удалить, поэтому команда '
+        'печатает models.Index(...) для Meta.indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=settings.SLOW_QUERY_LOG,
+            help='Файл журнала медленных запросов'
+        )
+        parser.add_argument(
+            '--min-queries', type=int, default=1,
+            help='Предлагать индекс, если он помог бы хотя бы стольким '
+                 'запросам'
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='База, в которой проверяются существующие индексы'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            advice = advise(
+                options['log'], options['database'], options['min_queries']
+            )
+        except FileNotFoundError:
+            raise CommandError(
+                f'Журнал {options["log"]} не найден. Включите запись '
+                f'медленных запросов через SLOW_QUERY_THRESHOLD.'
+            )
+        if not advice:
+            self.stdout.write(
+                self.style.SUCCESS('Новых индексов не требуется.')
+            )
+            return
+
+        for item in advice:
+            index = make_index(item)
+            model = item['model']
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{model._meta.label}: {index.name} '
+                f'({", ".join(index.fields)})'
+                + (f' WHERE {index.condition}' if index.condition else '')
+            ))
+            self.stdout.write(
+                f'  запросов: {item["queries"]}, '
+                f'суммарно {item["duration"]:.1f} мс'
+            )
+            for rql in sorted(item['rql'])[:5]:
+                self.stdout.write(f'  {rql or "(без фильтра)"}')
+            self.stdout.write(textwrap.indent(index_source(index), '    '))
+
+        self.stdout.write(self.style.NOTICE(
+            'Добавьте нужные индексы в Meta.indexes моделей '
+            'и создайте миграции через makemigrations.'
+        ))
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from rest_framework.test import APIRequestFactory
+
+from api.views import RecipeViewSet
+
+
+def measure(func, iterations) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет накладные расходы на открытие соединения и на разбор '
+        'и планирование запросов списка рецептов с подготовленными '
+        'выражениями и без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def reconnect(self):
+        connection.close()
+        connection.ensure_connection()
+
+    def select(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        view = RecipeViewSet.as_view({'get': 'list'})
+        request = APIRequestFactory().get('/api/recipes/')
+
+        def recipes_list():
+            view(request).render()
+
+        reconnect = measure(self.reconnect, iterations)
+        reuse = measure(self.select, iterations)
+        print(
+            f'Новое соединение: {reconnect:.3f} мс, '
+            f'повторное использование: {reuse:.3f} мс'
+        )
+
+        for prepared in (False, True):
+            with override_settings(DB_PREPARED_STATEMENTS=prepared):
+                self.reconnect()
+                recipes_list()
+                elapsed = measure(recipes_list, iterations)
+            print(
+                f'Список рецептов, prepared={prepared}: {elapsed:.3f} мс, '
+                'подготовлено выражений: '
+                f'{len(getattr(connection, "prepared", ()))}'
+            )
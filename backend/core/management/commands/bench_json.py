@@ -0,0 +1,77 @@
+import io
+import itertools
+import json
+import time
+import tracemalloc
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.serializers import RecipeListSerializer
+from recipes.models import Recipe
+
+PAGE_SIZE = 50
+
+
+def measure(func, iterations):
+    '''Среднее время в мс и пиковая память в МБ.'''
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стандартные JSON рендерер и парсер DRF с orjson '
+        'на странице из 50 рецептов и на POST рецепта с большим видео.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--body-size', type=int, default=20 * 2 ** 20)
+
+    def report(self, name, pairs, iterations):
+        for label, func in pairs:
+            elapsed, peak = measure(func, iterations)
+            print(f'{name}, {label}: {elapsed:.2f} мс, пик {peak:.1f} МБ')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = AnonymousUser()
+        recipes = list(itertools.islice(
+            itertools.cycle(Recipe.objects.all()[:PAGE_SIZE]), PAGE_SIZE
+        ))
+        page = RecipeListSerializer(
+            recipes, many=True, context={'request': request}
+        ).data
+        print(
+            'Вывод совпадает: '
+            f'{JSONRenderer().render(page) == ORJSONRenderer().render(page)}'
+        )
+
+        self.report('Рендеринг страницы', (
+            ('json', lambda: JSONRenderer().render(page)),
+            ('orjson', lambda: ORJSONRenderer().render(page)),
+        ), iterations)
+
+        body = json.dumps({
+            'title': 'Рецепт',
+            'video': 'data:video/mp4;base64,' + 'A' * options['body_size'],
+        }).encode()
+        self.report('Разбор тела запроса', (
+            ('json', lambda: JSONParser().parse(io.BytesIO(body))),
+            ('orjson', lambda: ORJSONParser().parse(io.BytesIO(body))),
+        ), max(1, iterations // 4))
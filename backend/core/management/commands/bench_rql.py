@@ -0,0 +1,83 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from api.filters import RecipeFilters
+from recipes.models import Recipe
+
+QUERIES = (
+    'in(ingredients.id,(1,2,3))',
+    'out(ingredients.id,(1))',
+    'in(tags.id,(1,2))&in(ingredients.id,(1,2))&in(equipment.id,(1,2))',
+    'like(tags.name,*a*)',
+    'like(selections.title,*a*)&gt(servings,1)',
+    'eq(tags.id,1)&eq(tags.id,2)',
+    'and(eq(tags.id,1),eq(tags.id,2))',
+    'eq(tags.name,tag1)&eq(tags.name,tag2)',
+    'or(eq(tags.id,1),eq(tags.id,2))',
+    'out(tags.id,(1))&out(tags.id,(2))',
+)
+
+
+class JoinRecipeFilters(RecipeFilters):
+    SUBQUERY_NAMESPACES = ()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает фильтры RQL по many-to-many через JOIN и через '
+        'подзапросы: совпадение найденных рецептов, число строк, время '
+        'выполнения и (с --explain) планы запросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries', nargs='*',
+            help='RQL-запросы (по умолчанию набор типичных фильтров)'
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--explain', action='store_true')
+
+    def measure(self, queryset, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            rows = list(queryset.values_list('id', flat=True))
+        return rows, (time.perf_counter() - start) / iterations * 1000
+
+    def explain(self, queryset):
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        return queryset.explain(analyze=True)
+
+    def handle(self, *args, **options):
+        mismatches = 0
+        for query in options['queries'] or QUERIES:
+            _, joined = JoinRecipeFilters(
+                Recipe.objects.all()
+            ).apply_filters(query)
+            _, subquery = RecipeFilters(
+                Recipe.objects.all()
+            ).apply_filters(query)
+
+            join_rows, join_time = self.measure(
+                joined, options['iterations']
+            )
+            subquery_rows, subquery_time = self.measure(
+                subquery, options['iterations']
+            )
+            same = set(join_rows) == set(subquery_rows)
+            mismatches += not same
+            print(
+                f'{query}\n'
+                f'  JOIN: {len(join_rows)} строк, {join_time:.3f} мс\n'
+                f'  подзапрос: {len(subquery_rows)} строк, '
+                f'{subquery_time:.3f} мс\n'
+                f'  рецепты совпадают: {"да" if same else "НЕТ"}'
+            )
+            if options['explain']:
+                print('  План JOIN:\n' + self.explain(joined))
+                print('  План подзапроса:\n' + self.explain(subquery))
+
+        if mismatches:
+            raise CommandError(f'Результаты не совпали: {mismatches}.')
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+
+from recipes.recommendations import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассчитывает персональные рекомендации рецептов по избранному '
+        'и рекомендациям пользователей (item-item коллаборативная '
+        'фильтрация).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-n', type=int,
+            help='Сколько рецептов рекомендовать каждому пользователю'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Сколько пользователей обрабатывать за раз'
+        )
+
+    def handle(self, *args, **options):
+        users = refresh(n=options['top_n'], batch_size=options['batch_size'])
+        self.stdout.write(
+            f'Рекомендации рассчитаны для {users} пользователей.'
+        )
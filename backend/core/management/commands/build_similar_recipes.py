@@ -0,0 +1,47 @@
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from recipes.models import Recipe
+from recipes.similarity import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает таблицу похожих рецептов. '
+        'С --since или --recipes обновляет только затронутые рецепты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Обновить рецепты, созданные после даты (ISO 8601)'
+        )
+        parser.add_argument(
+            '--recipes', nargs='+', type=int,
+            help='Обновить указанные рецепты'
+        )
+        parser.add_argument(
+            '--top-k', type=int,
+            help='Сколько соседей хранить для каждого рецепта'
+        )
+
+    def handle(self, *args, **options):
+        recipe_ids = options['recipes']
+
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('Неверный формат даты в --since.')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            recipe_ids = list(recipe_ids or []) + list(
+                Recipe.objects.filter(created__gte=since).values_list(
+                    'id', flat=True
+                )
+            )
+
+        updated = refresh(recipe_ids, k=options['top_k'])
+        self.stdout.write(
+            f'Похожие рецепты пересчитаны для {updated} рецептов.'
+        )
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from recipes.models import Upload
+from recipes.uploads import discard
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет незавершённые и неиспользованные загрузки старше '
+        'UPLOAD_TTL часов вместе с их частями и файлами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.UPLOAD_TTL,
+            help='Возраст загрузки в часах'
+        )
+
+    def handle(self, *args, **options):
+        border = timezone.now() - timedelta(hours=options['hours'])
+        uploads = Upload.objects.filter(created__lt=border)
+        count = 0
+        for upload in uploads.iterator():
+            discard(upload)
+            count += 1
+        self.stdout.write(f'Удалено загрузок: {count}.')
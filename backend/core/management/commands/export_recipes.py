@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.export import export_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает каталог рецептов в NDJSON: одна строка на рецепт '
+        'с ингредиентами, шагами, тегами и ссылками на медиа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help=(
+                'Выгрузить рецепты, созданные или изменённые после даты '
+                '(ISO 8601)'
+            )
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки (по умолчанию stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Сколько рецептов читать из базы за раз'
+        )
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                raise CommandError('Неверный формат даты в --since.')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        lines = export_recipes(
+            since=since, chunk_size=options['chunk_size']
+        )
+        if not options['output']:
+            sys.stdout.buffer.writelines(lines)
+            return
+
+        exported = 0
+        with open(options['output'], 'wb') as output:
+            for line in lines:
+                output.write(line)
+                exported += 1
+        self.stdout.write(f'Выгружено рецептов: {exported}.')
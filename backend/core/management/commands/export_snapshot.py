@@ -0,0 +1,54 @@
+from django.core.management import BaseCommand, CommandError
+
+from core.snapshot import SNAPSHOT_TABLES, export_snapshot, pa
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает согласованный снимок таблиц рецептов, избранного, '
+        'рекомендаций, отзывов и подписок в Parquet для аналитики.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Каталог для выгрузки')
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(SNAPSHOT_TABLES),
+            help='Выгрузить только указанные таблицы'
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=4,
+            help='Сколько таблиц выгружать параллельно'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=100000,
+            help='Сколько строк в одном файле Parquet'
+        )
+        parser.add_argument(
+            '--compression', default='snappy',
+            help='Сжатие Parquet (snappy, zstd, gzip, none)'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную выгрузку по manifest.json'
+        )
+
+    def handle(self, *args, **options):
+        if pa is None:
+            raise CommandError(
+                'Для выгрузки нужен pyarrow: pip install pyarrow.'
+            )
+        try:
+            exported = export_snapshot(
+                options['output'],
+                tables=options['tables'],
+                jobs=options['jobs'],
+                resume=options['resume'],
+                chunk_size=options['chunk_size'],
+                compression=options['compression']
+            )
+        except FileNotFoundError:
+            raise CommandError(
+                'Нечего продолжать: в каталоге нет manifest.json.'
+            )
+        for table, rows in exported.items():
+            self.stdout.write(f'{table}: {rows} строк.')
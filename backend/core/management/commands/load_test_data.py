@@ -8,6 +8,7 @@ from django.core.files.base import ContentFile
 from django.core.management import BaseCommand
 
 from foodgram.settings import BASE_DIR
+from recipes.catalogue import CATALOGUES, catalogue
 from recipes.models import (Category, Cuisine, Equipment, FavoriteRecipe,
                             Ingredient, Recipe, RecipeImage, RecipeIngredient,
                             RecipeReview, RecommendRecipe, Selection,
@@ -187,6 +188,8 @@ class Command(BaseCommand):
 
             else:
                 model.objects.bulk_create([model(**obj) for obj in objs])
+                if model in CATALOGUES:
+                    catalogue(model).invalidate()
 
             print(
                 f'{model.__name__}: Данные из файла {file_name} загружены.\n'
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import re
+import time
+from contextlib import ExitStack
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from rest_framework.permissions import SAFE_METHODS
+
+from api.filters import split_terms
+
+from .compression import (accepted_encoding, compress, compress_all,
+                          is_compressible)
+from .routers import end_request, start_request
+from .singleflight import (SingleFlight, acquire, release, should_refresh,
+                           wait_for)
+from .slow_queries import SlowQueryRecorder
+
+
+class PrimaryPinMiddleware:
+    '''
+    Запросы на запись и чтения того же клиента в течение
+    DB_PRIMARY_PIN_SECONDS после записи идут в основную базу,
+    чтобы клиент сразу видел свои изменения.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def pin_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return 'db:pin:' + hashlib.sha256(authorization.encode()).hexdigest()
+
+    def __call__(self, request):
+        key = self.pin_key(request)
+        writes = request.method not in SAFE_METHODS
+        start_request(writes or (key is not None and bool(cache.get(key))))
+
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request()
+
+        if writes and key is not None:
+            cache.set(key, True, settings.DB_PRIMARY_PIN_SECONDS)
+        return response
+
+
+class CompressionMiddleware:
+    '''
+    Сжимает ответы gzip или brotli. Если ответ взят из кэша
+    (ResponseCacheMiddleware), используются заранее сжатые варианты.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        variants = getattr(response, 'compressed_variants', None)
+        if variants is None and not is_compressible(
+            response.get('Content-Type', ''), len(response.content)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if variants is None:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+        else:
+            compressed = variants.get(encoding)
+            if compressed is None:
+                return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag') and not response['ETag'].startswith(
+            'W/'
+        ):
+            response['ETag'] = 'W/' + response['ETag']
+        return response
+
+
+class ResponseCacheMiddleware:
+    '''
+    Кэширует на API_CACHE_TIMEOUT секунд ответы на анонимные GET
+    к путям из API_CACHE_PATHS. Сжатые варианты считаются один раз
+    при заполнении кэша и хранятся вместе с ответом.
+
+    Одинаковые одновременные запросы при промахе ждут одно вычисление
+    (SingleFlight и блокировка в общем кэше), а записи обновляются
+    досрочно с вероятностью, растущей к концу срока (XFetch), пока
+    остальные запросы получают прежний ответ.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = re.compile(settings.API_CACHE_PATHS)
+        self.flights = SingleFlight()
+
+    def is_cacheable(self, request) -> bool:
+        return (
+            settings.API_CACHE_TIMEOUT > 0
+            and request.method in ('GET', 'HEAD')
+            and 'HTTP_AUTHORIZATION' not in request.META
+            and self.paths.match(request.path) is not None
+        )
+
+    @staticmethod
+    def cache_key(request) -> str:
+        '''
+        Условия делятся до раскодирования: %26 - это символ & внутри
+        значения, а не разделитель. Раскодированные условия после
+        сортировки записываются списком JSON, чтобы такой символ не
+        склеивал их заново.
+        '''
+        query = json.dumps(sorted(
+            unquote(term)
+            for term in split_terms(request.META.get('QUERY_STRING', ''))
+        ), ensure_ascii=False)
+        key = '\n'.join((
+            request.path, query, request.META.get('HTTP_ACCEPT', '')
+        ))
+        return 'api:response:' + hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def make_entry(response, delta) -> dict:
+        content_type = response['Content-Type']
+        return {
+            'content': response.content,
+            'content_type': content_type,
+            'headers': [
+                (header, value) for header, value in response.items()
+                if header.lower() not in ('content-type', 'content-length')
+            ],
+            'variants': compress_all(response.content, content_type),
+            'delta': delta,
+            'expires': time.time() + settings.API_CACHE_TIMEOUT,
+        }
+
+    @staticmethod
+    def from_entry(entry):
+        response = HttpResponse(
+            entry['content'], content_type=entry['content_type']
+        )
+        for header, value in entry['headers']:
+            response[header] = value
+        response.compressed_variants = entry['variants']
+        return response
+
+    def compute(self, request, key):
+        '''Ответ представления и запись кэша (None, если не кэшируется).'''
+        start = time.monotonic()
+        response = self.get_response(request)
+        if response.status_code != 200 or response.streaming:
+            return response, None
+
+        entry = self.make_entry(response, time.monotonic() - start)
+        cache.set(key, entry, settings.API_CACHE_TIMEOUT)
+        response.compressed_variants = entry['variants']
+        return response, entry
+
+    def compute_locked(self, request, key, lock_key):
+        '''
+        Вычисляет ответ, если блокировка свободна, иначе ждёт запись
+        от процесса, который её держит.
+        '''
+        locked = acquire(lock_key)
+        if not locked:
+            entry = wait_for(key, lock_key)
+            if entry is not None:
+                return None, entry
+        try:
+            return self.compute(request, key)
+        finally:
+            if locked:
+                release(lock_key)
+
+    def __call__(self, request):
+        if not self.is_cacheable(request):
+            return self.get_response(request)
+
+        key = self.cache_key(request)
+        lock_key = key + ':lock'
+        entry = cache.get(key)
+        if entry is not None:
+            if not should_refresh(entry['expires'], entry['delta']):
+                return self.from_entry(entry)
+            if not acquire(lock_key):
+                return self.from_entry(entry)
+            try:
+                return self.compute(request, key)[0]
+            finally:
+                release(lock_key)
+
+        result, shared = self.flights.do(
+            key, lambda: self.compute_locked(request, key, lock_key)
+        )
+        response, entry = result or (None, None)
+        if response is not None and not shared:
+            return response
+        if entry is not None:
+            return self.from_entry(entry)
+        return self.compute(request, key)[0]
+
+
+class SlowQueryMiddleware:
+    '''
+    Включает SlowQueryRecorder на всех подключениях к базам,
+    если задан SLOW_QUERY_THRESHOLD.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.SLOW_QUERY_THRESHOLD <= 0:
+            return self.get_response(request)
+
+        recorder = SlowQueryRecorder(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
@@ -0,0 +1,142 @@
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+_state = threading.local()
+
+
+def pin_to_primary(pinned=True) -> None:
+    _state.pinned = pinned
+
+
+def is_pinned() -> bool:
+    return getattr(_state, 'pinned', False)
+
+
+def start_request(pinned=False) -> None:
+    '''
+    Начало обработки HTTP-запроса: реплика выбирается один раз
+    на весь запрос, а после первой записи чтение идёт в default.
+    '''
+    _state.pinned = pinned
+    _state.replica = None
+    _state.in_request = True
+
+
+def end_request() -> None:
+    _state.pinned = False
+    _state.replica = None
+    _state.in_request = False
+
+
+def in_request() -> bool:
+    return getattr(_state, 'in_request', False)
+
+
+class ReplicaSelector:
+    '''
+    Выбор реплики для чтения: по кругу или с наименьшим отставанием.
+    Недоступная реплика исключается на DB_REPLICA_RETRY_SECONDS.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.down_until = {}
+        self.lag = {}
+        self.lag_checked = 0
+        self.cycle = itertools.cycle(settings.DB_REPLICAS or [None])
+
+    def is_available(self, alias) -> bool:
+        if self.down_until.get(alias, 0) > time.monotonic():
+            return False
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            self.mark_down(alias)
+            return False
+        return True
+
+    def mark_down(self, alias) -> None:
+        self.down_until[alias] = (
+            time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+        )
+
+    def measure_lag(self) -> None:
+        for alias in settings.DB_REPLICAS:
+            if not self.is_available(alias):
+                continue
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute(
+                        'SELECT COALESCE(EXTRACT(EPOCH FROM '
+                        'now() - pg_last_xact_replay_timestamp()), 0)'
+                    )
+                    self.lag[alias] = float(cursor.fetchone()[0])
+            except DatabaseError:
+                self.mark_down(alias)
+        self.lag_checked = time.monotonic()
+
+    def least_lag(self):
+        if (
+            time.monotonic() - self.lag_checked
+            > settings.DB_REPLICA_LAG_CHECK_SECONDS
+        ):
+            self.measure_lag()
+        candidates = sorted(
+            (lag, alias) for alias, lag in self.lag.items()
+            if lag <= settings.DB_REPLICA_MAX_LAG
+        )
+        for _, alias in candidates:
+            if self.is_available(alias):
+                return alias
+        return None
+
+    def round_robin(self):
+        for _ in range(len(settings.DB_REPLICAS)):
+            with self.lock:
+                alias = next(self.cycle)
+            if self.is_available(alias):
+                return alias
+        return None
+
+    def choose(self):
+        if not settings.DB_REPLICAS:
+            return None
+        if settings.DB_REPLICA_SELECTION == 'least_lag':
+            return self.least_lag()
+        return self.round_robin()
+
+
+selector = ReplicaSelector()
+
+
+class ReplicaRouter:
+    '''
+    Чтение с реплик, запись в default. Если запрос закреплён за
+    основной базой (см. PrimaryPinMiddleware), уже что-то записал
+    или реплики недоступны, чтение тоже идёт в default. Внутри
+    HTTP-запроса все чтения идут в одну и ту же реплику.
+    '''
+
+    def db_for_read(self, model, **hints):
+        if is_pinned():
+            return 'default'
+        if not in_request():
+            return selector.choose() or 'default'
+        if _state.replica is None:
+            _state.replica = selector.choose() or 'default'
+        return _state.replica
+
+    def db_for_write(self, model, **hints):
+        if in_request():
+            pin_to_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
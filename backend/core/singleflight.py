@@ -0,0 +1,85 @@
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class SingleFlight:
+    '''
+    Объединение одинаковых одновременных вычислений. Внутри процесса
+    потоки с одним ключом ждут первый поток; между процессами
+    вычисляет тот, кто взял блокировку в общем кэше, а остальные
+    ждут появления результата в кэше.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, compute) -> tuple:
+        '''
+        Результат compute() и признак того, что он получен от другого
+        потока. Если вычисление в другом потоке упало или не успело
+        за API_CACHE_LOCK_TIMEOUT, результат - None.
+        '''
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {
+                    'done': threading.Event(), 'result': None
+                }
+
+        if not leader:
+            call['done'].wait(settings.API_CACHE_LOCK_TIMEOUT)
+            return call['result'], True
+
+        try:
+            call['result'] = compute()
+            return call['result'], False
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+
+
+def acquire(lock_key) -> bool:
+    return cache.add(lock_key, True, settings.API_CACHE_LOCK_TIMEOUT)
+
+
+def release(lock_key) -> None:
+    cache.delete(lock_key)
+
+
+def wait_for(key, lock_key):
+    '''
+    Ждёт, пока другой процесс положит значение в кэш: до снятия
+    блокировки, но не дольше API_CACHE_LOCK_TIMEOUT.
+    '''
+    deadline = time.monotonic() + settings.API_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            return cache.get(key)
+        time.sleep(settings.API_CACHE_LOCK_POLL)
+    return None
+
+
+def should_refresh(expires, delta) -> bool:
+    '''
+    Вероятностное досрочное обновление (XFetch): чем ближе срок
+    истечения и чем дольше считалось значение, тем вероятнее, что
+    очередной запрос обновит его заранее, а не все разом после
+    истечения.
+    '''
+    return (
+        time.time()
+        - delta * settings.API_CACHE_XFETCH_BETA
+        * math.log(1.0 - random.random())
+        >= expires
+    )
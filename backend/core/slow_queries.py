@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+_lock = threading.Lock()
+
+
+def explain(connection, sql, params):
+    '''План запроса без выполнения; только для PostgreSQL.'''
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def write_entry(entry) -> None:
+    line = json.dumps(entry, ensure_ascii=False, default=str)
+    with _lock, open(settings.SLOW_QUERY_LOG, 'a') as log:
+        log.write(line + '\n')
+
+
+def read_log(path):
+    '''Записи журнала медленных запросов; испорченные строки пропускаются.'''
+    with open(path) as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class SlowQueryRecorder:
+    '''
+    Обёртка connection.execute_wrapper: запросы, выполненные дольше
+    SLOW_QUERY_THRESHOLD мс в ответ на запрос с RQL-фильтром,
+    пишутся в SLOW_QUERY_LOG вместе с нормализованным фильтром
+    и планом выполнения.
+    '''
+
+    def __init__(self, request):
+        self.request = request
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining or many:
+            return execute(sql, params, many, context)
+
+        with self.timing(context['connection'], sql, params):
+            return execute(sql, params, many, context)
+
+    @contextmanager
+    def timing(self, connection, sql, params):
+        '''Упавшие запросы не записываются: EXPLAIN в них тоже упадёт.'''
+        start = time.perf_counter()
+        yield
+        elapsed = (time.perf_counter() - start) * 1000
+        rql = getattr(self.request, 'rql_query', None)
+        if rql is not None and elapsed >= settings.SLOW_QUERY_THRESHOLD:
+            self.record(connection, sql, params, rql, elapsed)
+
+    def record(self, connection, sql, params, rql, elapsed) -> None:
+        self.explaining = True
+        try:
+            plan = explain(connection, sql, params)
+        finally:
+            self.explaining = False
+        write_entry({
+            'time': timezone.now().isoformat(),
+            'path': self.request.path,
+            'rql': rql,
+            'sql': sql,
+            'params': list(params or ()),
+            'duration': round(elapsed, 3),
+            'database': connection.alias,
+            'plan': plan,
+        })
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from recipes.models import (FavoriteRecipe, Recipe, RecipeIngredient,
+                            RecipeReview, RecommendRecipe)
+from users.models import Follow
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+SNAPSHOT_TABLES = {
+    'recipes': (Recipe, (
+        'id', 'title', 'description', 'servings', 'cooking_time',
+        'cuisine', 'author', 'created'
+    )),
+    'recipe_ingredients': (RecipeIngredient, (
+        'id', 'recipe', 'ingredient', 'amount', 'measurement_unit'
+    )),
+    'favorite_recipes': (FavoriteRecipe, ('id', 'user', 'recipe')),
+    'recommend_recipes': (RecommendRecipe, ('id', 'user', 'recipe')),
+    'recipe_reviews': (RecipeReview, (
+        'id', 'user', 'recipe', 'comment', 'created'
+    )),
+    'follows': (Follow, ('id', 'user', 'following')),
+}
+CATEGORICAL = {'measurement_unit'}
+MANIFEST = 'manifest.json'
+
+
+def arrow_type(field):
+    internal_type = field.get_internal_type()
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    if internal_type == 'FloatField':
+        return pa.float64()
+    if internal_type in ('CharField', 'TextField'):
+        return pa.string()
+    return pa.int64()
+
+
+class Manifest:
+    '''
+    Состояние выгрузки: для каждой таблицы последний выгруженный id,
+    число файлов и строк. Сохраняется после каждого файла, поэтому
+    прерванную выгрузку можно продолжить с --resume.
+    '''
+
+    def __init__(self, path, tables=None):
+        self.path = path
+        self.tables = tables or {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as manifest:
+            return cls(path, json.load(manifest)['tables'])
+
+    def get(self, table) -> dict:
+        with self.lock:
+            return dict(self.tables.setdefault(
+                table, {'last_id': None, 'parts': 0, 'rows': 0, 'done': False}
+            ))
+
+    def update(self, table, **state) -> None:
+        with self.lock:
+            self.tables[table].update(state)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as manifest:
+                json.dump({'tables': self.tables}, manifest, indent=2)
+            os.replace(tmp, self.path)
+
+
+def write_part(path, schema, rows, compression) -> None:
+    arrays = []
+    columns = list(zip(*rows)) or [()] * len(schema)
+    for column, values in zip(schema, columns):
+        if pa.types.is_dictionary(column.type):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, column.type))
+    tmp = path + '.tmp'
+    pq.write_table(
+        pa.Table.from_arrays(arrays, schema=schema), tmp,
+        compression=compression
+    )
+    os.replace(tmp, path)
+
+
+def export_table(name, output, manifest, snapshot=None,
+                 chunk_size=100000, compression='snappy',
+                 using=DEFAULT_DB_ALIAS) -> int:
+    '''
+    Выгружает таблицу кусками по chunk_size строк (по возрастанию id,
+    без OFFSET), по файлу Parquet на кусок. Если передан snapshot
+    (результат pg_export_snapshot), читает данные из этого снимка.
+    '''
+    model, field_names = SNAPSHOT_TABLES[name]
+    fields = [model._meta.get_field(field) for field in field_names]
+    schema = pa.schema([
+        (field.column, pa.dictionary(pa.int32(), pa.string())
+         if field.name in CATEGORICAL else arrow_type(field))
+        for field in fields
+    ])
+
+    state = manifest.get(name)
+    if state['done']:
+        return state['rows']
+    os.makedirs(os.path.join(output, name), exist_ok=True)
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = quote(model._meta.pk.column)
+    select = ', '.join(quote(field.column) for field in fields)
+
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            if snapshot is not None:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ'
+                )
+                cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot])
+            while True:
+                if state['last_id'] is None:
+                    cursor.execute(
+                        f'SELECT {select} FROM {table} '
+                        f'ORDER BY {pk} LIMIT %s', [chunk_size]
+                    )
+                else:
+                    cursor.execute(
+                        f'SELECT {select} FROM {table} WHERE {pk} > %s '
+                        f'ORDER BY {pk} LIMIT %s',
+                        [state['last_id'], chunk_size]
+                    )
+                rows = cursor.fetchall()
+                if not rows and state['parts']:
+                    break
+                write_part(
+                    os.path.join(
+                        output, name, f'part-{state["parts"]:05d}.parquet'
+                    ),
+                    schema, rows, compression
+                )
+                state['parts'] += 1
+                if not rows:
+                    break
+                state['last_id'] = rows[-1][0]
+                state['rows'] += len(rows)
+                manifest.update(name, **state)
+    finally:
+        if snapshot is not None:
+            connection.close()
+
+    state['done'] = True
+    manifest.update(name, **state)
+    return state['rows']
+
+
+def export_snapshot(output, tables=None, jobs=4, resume=False,
+                    using=DEFAULT_DB_ALIAS, **options) -> dict:
+    '''
+    Согласованный снимок таблиц в Parquet. В PostgreSQL таблицы
+    выгружаются параллельно в jobs потоков, каждый читает один и тот же
+    снимок REPEATABLE READ, экспортированный через pg_export_snapshot(),
+    поэтому выгрузка не блокирует запись. В других СУБД таблицы
+    выгружаются по очереди в одной транзакции.
+    '''
+    tables = tables or list(SNAPSHOT_TABLES)
+    os.makedirs(output, exist_ok=True)
+    path = os.path.join(output, MANIFEST)
+    manifest = Manifest.load(path) if resume else Manifest(path)
+
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if connection.vendor != 'postgresql':
+            return {
+                name: export_table(
+                    name, output, manifest, using=using, **options
+                )
+                for name in tables
+            }
+
+        cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        cursor.execute('SELECT pg_export_snapshot()')
+        snapshot = cursor.fetchone()[0]
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                name: executor.submit(
+                    export_table, name, output, manifest, snapshot,
+                    using=using, **options
+                )
+                for name in tables
+            }
+            return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,75 @@
+from unittest import skipUnless
+
+from django.db import OperationalError, connection, connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from core.backends.postgresql import base
+from core.backends.postgresql.base import DatabaseWrapper, to_prepared_sql
+
+QUERY = 'SELECT %s::integer + %s::integer, \'100%%\''
+
+
+class PreparedSqlTests(SimpleTestCase):
+
+    def test_placeholders_are_numbered(self):
+        self.assertEqual(
+            to_prepared_sql('SELECT %s, %s FROM t WHERE a LIKE \'%%x\''),
+            'SELECT $1, $2 FROM t WHERE a LIKE \'%x\''
+        )
+
+
+@skipUnless(
+    isinstance(connections['default'], DatabaseWrapper),
+    'Нужна база с бэкендом core.backends.postgresql.'
+)
+class DatabaseWrapperTests(TransactionTestCase):
+
+    def run_query(self, cursor, first, second):
+        cursor.execute(QUERY, [first, second])
+        return cursor.fetchone()
+
+    @override_settings(DB_PREPARED_STATEMENTS=True, DB_PREPARE_THRESHOLD=2)
+    def test_repeated_select_is_prepared(self):
+        with connection.cursor() as cursor:
+            results = [
+                self.run_query(cursor, number, 1) for number in range(3)
+            ]
+            cursor.execute(
+                'SELECT count(*) FROM pg_prepared_statements '
+                'WHERE name = %s',
+                [connection.prepared.get(QUERY)]
+            )
+            prepared = cursor.fetchone()[0]
+        self.assertEqual(results, [(1, '100%'), (2, '100%'), (3, '100%')])
+        self.assertIn(QUERY, connection.prepared)
+        self.assertEqual(prepared, 1)
+
+    @override_settings(
+        DB_PREPARED_STATEMENTS=True, DB_PREPARE_THRESHOLD=1,
+        DB_PREPARED_STATEMENTS_SIZE=1
+    )
+    def test_evicted_statement_is_deallocated(self):
+        with connection.cursor() as cursor:
+            self.run_query(cursor, 1, 1)
+            cursor.execute('SELECT %s::integer', [1])
+            cursor.execute('SELECT count(*) FROM pg_prepared_statements')
+            prepared = cursor.fetchone()[0]
+        self.assertEqual(list(connection.prepared), ['SELECT %s::integer'])
+        self.assertEqual(prepared, 1)
+
+    @override_settings(DB_POOL_SIZE=1, DB_POOL_TIMEOUT=0)
+    def test_pool_limits_connections_per_alias(self):
+        alias = 'pool_test'
+        self.addCleanup(base._pools.pop, alias, None)
+        first = DatabaseWrapper(connection.settings_dict, alias)
+        second = DatabaseWrapper(connection.settings_dict, alias)
+        self.addCleanup(second.close)
+        self.addCleanup(first.close)
+
+        first.ensure_connection()
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+
+        first.close()
+        second.ensure_connection()
+        self.assertTrue(second.is_usable())
@@ -0,0 +1,82 @@
+import gzip
+import json
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APITestCase
+
+from core.compression import ENCODINGS, accepted_encoding, compress_all
+from recipes.tests.factories import (IsolatedTestMixin, create_recipe,
+                                     create_user)
+
+URL = '/api/recipes/'
+
+
+class AcceptEncodingTests(SimpleTestCase):
+
+    def test_best_accepted_encoding(self):
+        self.assertEqual(accepted_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(accepted_encoding('GZIP;q=0.5'), 'gzip')
+        self.assertEqual(accepted_encoding(''), None)
+        self.assertEqual(accepted_encoding('identity'), None)
+        self.assertEqual(accepted_encoding('gzip;q=0, br;q=0.0'), None)
+        self.assertEqual(accepted_encoding('gzip, br'), ENCODINGS[0])
+
+    @override_settings(COMPRESS_MIN_SIZE=10)
+    def test_compress_all_skips_small_and_binary_content(self):
+        content = b'{"title": "recipe"}' * 10
+        variants = compress_all(content, 'application/json; charset=utf-8')
+        self.assertEqual(set(variants), set(ENCODINGS))
+        self.assertEqual(gzip.decompress(variants['gzip']), content)
+
+        self.assertEqual(compress_all(b'{}', 'application/json'), {})
+        self.assertEqual(compress_all(content, 'image/png'), {})
+
+
+@override_settings(COMPRESS_MIN_SIZE=100)
+class CompressionMiddlewareTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = create_user('author')
+        for number in range(5):
+            create_recipe(author, title=f'Рецепт {number}', tags=['суп'])
+
+    def get(self, **headers):
+        return self.client.get(URL, {'projection': 0}, **headers)
+
+    def test_gzip_response(self):
+        plain = self.get()
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+        self.assertEqual(
+            json.loads(gzip.decompress(response.content)),
+            json.loads(plain.content)
+        )
+
+    @override_settings(COMPRESS_MIN_SIZE=10 ** 6)
+    def test_small_response_is_not_compressed(self):
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(API_CACHE_TIMEOUT=60)
+    def test_anonymous_reads_cached_with_compressed_variants(self):
+        first = self.get()
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(cached.content), first.content)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token unknown')
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertGreater(len(queries), 0)
@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from core.indexes import advise, index_source, make_index, split_condition
+from recipes.models import Recipe
+
+COLUMNS = {'servings', 'cooking_time', 'cuisine_id', 'author_id'}
+
+
+def plan(condition, table='recipes_recipe') -> list:
+    return [{'Plan': {
+        'Node Type': 'Limit',
+        'Plans': [{
+            'Node Type': 'Seq Scan',
+            'Relation Name': table,
+            'Filter': condition,
+        }],
+    }}]
+
+
+class SplitConditionTests(SimpleTestCase):
+
+    def test_equality_range_and_null(self):
+        self.assertEqual(
+            split_condition(
+                '((servings = 2) AND (cooking_time > 30) '
+                'AND (cuisine_id IS NULL))',
+                COLUMNS
+            ),
+            (['servings'], ['cooking_time'], [('cuisine_id', 'IS NULL')])
+        )
+
+    def test_casts_and_any(self):
+        self.assertEqual(
+            split_condition(
+                "((author_id)::integer = ANY ('{1,2}'::integer[]))", COLUMNS
+            ),
+            (['author_id'], [], [])
+        )
+
+    def test_unsupported_conditions_ignored(self):
+        self.assertEqual(
+            split_condition(
+                '((servings = 2) OR (cooking_time > 30))', COLUMNS
+            ),
+            ([], [], [])
+        )
+        self.assertEqual(
+            split_condition(
+                "((title)::text ~~ '%суп%'::text) AND (unknown = 1)", COLUMNS
+            ),
+            ([], [], [])
+        )
+
+
+class AdviseTests(TestCase):
+
+    def setUp(self):
+        handle, self.log = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.remove, self.log)
+
+    def write_log(self, *entries) -> None:
+        with open(self.log, 'w') as log:
+            for rql, condition, duration in entries:
+                log.write(json.dumps({
+                    'rql': rql, 'duration': duration, 'plan': plan(condition)
+                }, ensure_ascii=False) + '\n')
+            log.write('испорченная строка\n')
+
+    def test_composite_and_partial_indexes(self):
+        self.write_log(
+            ('eq(servings,2)&gt(cooking_time,30)',
+             '((servings = 2) AND (cooking_time > 30))', 100.0),
+            ('eq(servings,4)&gt(cooking_time,10)',
+             '((cooking_time > 10) AND (servings = 4))', 50.0),
+            ('eq(servings,2)&eq(cuisine,null())',
+             '((cuisine_id IS NULL) AND (servings = 2))', 400.0),
+        )
+        advice = advise(self.log)
+        self.assertEqual(
+            [(item['fields'], item['nulls'], item['queries'])
+             for item in advice],
+            [
+                (['servings'], [('cuisine', 'IS NULL')], 1),
+                (['servings', 'cooking_time'], [], 2),
+            ]
+        )
+        self.assertEqual(advice[1]['duration'], 150.0)
+        self.assertEqual(advice[1]['model'], Recipe)
+
+        self.assertIn(
+            'condition=models.Q(cuisine__isnull=True)',
+            index_source(make_index(advice[0]))
+        )
+        self.assertEqual(advise(self.log, min_queries=2), advice[1:])
+
+    def test_covered_keys_skipped(self):
+        self.write_log(
+            ('eq(author,1)', '(author_id = 1)', 10.0),
+            ('', '(id > 5)', 10.0),
+        )
+        self.assertEqual(advise(self.log), [])
+
+    def test_command(self):
+        self.write_log((
+            'eq(servings,2)&gt(cooking_time,30)',
+            '((servings = 2) AND (cooking_time > 30))', 100.0
+        ))
+        stdout = io.StringIO()
+        call_command('advise_indexes', log=self.log, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("fields=['servings', 'cooking_time']", output)
+        self.assertIn('запросов: 1, суммарно 100.0 мс', output)
+
+        self.write_log()
+        stdout = io.StringIO()
+        call_command('advise_indexes', log=self.log, stdout=stdout)
+        self.assertIn('Новых индексов не требуется.', stdout.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('advise_indexes', log=self.log + '.missing')
@@ -0,0 +1,117 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import routers
+from core.middleware import PrimaryPinMiddleware
+from core.routers import ReplicaRouter, ReplicaSelector
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+@override_settings(DB_REPLICAS=REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.down = set()
+        self.selector = ReplicaSelector()
+        patcher = mock.patch.object(
+            ReplicaSelector, 'is_available',
+            lambda selector, alias: alias not in self.down
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(routers, 'selector', self.selector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(routers.end_request)
+        self.router = ReplicaRouter()
+
+    def test_round_robin_skips_unavailable(self):
+        self.assertEqual(
+            [self.selector.choose() for _ in range(4)], REPLICAS * 2
+        )
+        self.down.add('replica_1')
+        self.assertEqual(
+            [self.selector.choose() for _ in range(2)], ['replica_2'] * 2
+        )
+        self.down.add('replica_2')
+        self.assertIsNone(self.selector.choose())
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    @override_settings(DB_REPLICA_SELECTION='least_lag', DB_REPLICA_MAX_LAG=5)
+    def test_least_lag(self):
+        self.selector.lag = {'replica_1': 2.0, 'replica_2': 0.5}
+        self.selector.lag_checked = time.monotonic()
+        self.assertEqual(self.selector.choose(), 'replica_2')
+
+        self.down.add('replica_2')
+        self.assertEqual(self.selector.choose(), 'replica_1')
+
+        self.selector.lag['replica_1'] = 10.0
+        self.assertIsNone(self.selector.choose())
+
+    def test_one_replica_per_request(self):
+        routers.start_request()
+        reads = {self.router.db_for_read(None) for _ in range(3)}
+        self.assertEqual(reads, {'replica_1'})
+
+        routers.end_request()
+        self.assertEqual(self.router.db_for_read(None), 'replica_2')
+        self.assertEqual(self.router.db_for_read(None), 'replica_1')
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        routers.start_request()
+        self.assertEqual(self.router.db_for_read(None), 'replica_1')
+        self.assertEqual(self.router.db_for_write(None), 'default')
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+        routers.end_request()
+        self.assertFalse(routers.is_pinned())
+
+    @override_settings(DB_REPLICAS=[])
+    def test_without_replicas_everything_goes_to_default(self):
+        selector = ReplicaSelector()
+        with mock.patch.object(routers, 'selector', selector):
+            routers.start_request()
+            self.assertEqual(self.router.db_for_read(None), 'default')
+
+    def test_allow_migrate_only_on_default(self):
+        self.assertTrue(self.router.allow_migrate('default', 'recipes'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'recipes'))
+
+
+class PrimaryPinMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.pinned = []
+
+        def get_response(request):
+            self.pinned.append(routers.is_pinned())
+            return HttpResponse()
+
+        self.middleware = PrimaryPinMiddleware(get_response)
+
+    def test_reads_after_write_are_pinned_for_same_client(self):
+        client = {'HTTP_AUTHORIZATION': 'Token a'}
+        self.middleware(self.factory.get('/api/recipes/', **client))
+        self.middleware(self.factory.post('/api/recipes/', **client))
+        self.middleware(self.factory.get('/api/recipes/', **client))
+        self.middleware(self.factory.get(
+            '/api/recipes/', HTTP_AUTHORIZATION='Token b'
+        ))
+        self.middleware(self.factory.get('/api/recipes/'))
+        self.assertEqual(self.pinned, [False, True, True, False, False])
+        self.assertFalse(routers.is_pinned())
+
+    @override_settings(DB_PRIMARY_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        client = {'HTTP_AUTHORIZATION': 'Token a'}
+        self.middleware(self.factory.post('/api/recipes/', **client))
+        self.middleware(self.factory.get('/api/recipes/', **client))
+        self.assertEqual(self.pinned, [True, False])
@@ -0,0 +1,195 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import singleflight
+from core.middleware import ResponseCacheMiddleware
+from core.singleflight import (SingleFlight, acquire, release, should_refresh,
+                               wait_for)
+
+URL = '/api/recipes/'
+
+
+def run_threads(target, count) -> list:
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(target) for _ in range(count)]
+    return [future.result() for future in futures]
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def test_concurrent_calls_share_one_computation(self):
+        flights = SingleFlight()
+        started, release_leader = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release_leader.wait(5)
+            return 'result'
+
+        leader = threading.Thread(target=flights.do, args=('key', compute))
+        leader.start()
+        started.wait(5)
+        results, followers = [], [
+            threading.Thread(
+                target=lambda: results.append(flights.do('key', compute))
+            )
+            for _ in range(3)
+        ]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.1)
+        release_leader.set()
+        leader.join()
+        for thread in followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [('result', True)] * 3)
+        self.assertEqual(flights.calls, {})
+        self.assertEqual(flights.do('key', lambda: 'next'), ('next', False))
+
+    def test_failed_leader_gives_followers_none(self):
+        flights = SingleFlight()
+        started, release_leader = threading.Event(), threading.Event()
+        results = []
+
+        def compute():
+            started.set()
+            release_leader.wait(5)
+            raise ValueError
+
+        def lead():
+            with self.assertRaises(ValueError):
+                flights.do('key', compute)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(
+            target=lambda: results.append(flights.do('key', compute))
+        )
+        follower.start()
+        time.sleep(0.1)
+        release_leader.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(results, [(None, True)])
+
+
+@override_settings(API_CACHE_LOCK_TIMEOUT=1, API_CACHE_LOCK_POLL=0.01)
+class CacheLockTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_acquire_and_release(self):
+        self.assertTrue(acquire('lock'))
+        self.assertFalse(acquire('lock'))
+        release('lock')
+        self.assertTrue(acquire('lock'))
+
+    def test_wait_for_value_from_other_process(self):
+        acquire('lock')
+        timer = threading.Timer(0.05, cache.set, ('key', 'value'))
+        timer.start()
+        self.assertEqual(wait_for('key', 'lock'), 'value')
+        timer.join()
+
+    def test_wait_for_released_or_expired_lock(self):
+        self.assertIsNone(wait_for('key', 'lock'))
+
+        acquire('lock')
+        start = time.monotonic()
+        self.assertIsNone(wait_for('key', 'lock'))
+        self.assertGreaterEqual(time.monotonic() - start, 1)
+
+
+@override_settings(API_CACHE_XFETCH_BETA=1)
+class ShouldRefreshTests(SimpleTestCase):
+
+    def test_refresh_probability_grows_near_expiry(self):
+        now = time.time()
+        with mock.patch.object(singleflight.random, 'random', return_value=0):
+            self.assertFalse(should_refresh(now + 60, 1))
+            self.assertTrue(should_refresh(now - 1, 1))
+        with mock.patch.object(
+            singleflight.random, 'random', return_value=0.99
+        ):
+            self.assertFalse(should_refresh(now + 60, 1))
+            self.assertTrue(should_refresh(now + 3, 1))
+            self.assertFalse(should_refresh(now + 3, 0.1))
+
+
+@override_settings(API_CACHE_TIMEOUT=60, API_CACHE_LOCK_TIMEOUT=5)
+class ResponseCacheMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = []
+        self.middleware = ResponseCacheMiddleware(self.get_response)
+
+    def get_response(self, request):
+        self.calls.append(request.path)
+        time.sleep(0.05)
+        return HttpResponse(
+            f'{{"call": {len(self.calls)}}}', content_type='application/json'
+        )
+
+    def key(self, query='', **headers) -> str:
+        return ResponseCacheMiddleware.cache_key(
+            self.factory.get(f'{URL}?{query}', **headers)
+        )
+
+    def test_cache_key(self):
+        self.assertEqual(
+            self.key('eq(servings,2)&in(tags.id,(1,2))&page_size=5'),
+            self.key('page_size=5&in(tags.id,(1,2))&eq(servings,2)')
+        )
+        self.assertNotEqual(
+            self.key('eq(title,a%26b)'), self.key('eq(title,a)&b')
+        )
+        self.assertNotEqual(self.key(), self.key(HTTP_ACCEPT='text/html'))
+        self.assertNotEqual(
+            self.key(),
+            ResponseCacheMiddleware.cache_key(self.factory.get('/api/tags/'))
+        )
+
+    def test_concurrent_misses_compute_once(self):
+        responses = run_threads(
+            lambda: self.middleware(self.factory.get(URL)), 5
+        )
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(
+            {response.content for response in responses}, {b'{"call": 1}'}
+        )
+
+    def test_cached_and_uncacheable_requests(self):
+        self.middleware(self.factory.get(URL))
+        self.assertEqual(
+            self.middleware(self.factory.get(URL)).content, b'{"call": 1}'
+        )
+        self.middleware(self.factory.get(URL, HTTP_AUTHORIZATION='Token x'))
+        self.middleware(self.factory.get('/api/tags/'))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_early_refresh(self):
+        self.middleware(self.factory.get(URL))
+        with mock.patch(
+            'core.middleware.should_refresh', return_value=True
+        ):
+            response = self.middleware(self.factory.get(URL))
+            self.assertEqual(response.content, b'{"call": 2}')
+
+            acquire(self.key() + ':lock')
+            response = self.middleware(self.factory.get(URL))
+            self.assertEqual(response.content, b'{"call": 2}')
+        self.assertEqual(len(self.calls), 2)
@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import skipIf
+
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from core.snapshot import MANIFEST, export_snapshot, pa, pq
+from recipes.models import FavoriteRecipe
+from recipes.tests.factories import (IsolatedTestMixin, create_ingredients,
+                                     create_recipe, create_user)
+
+
+@skipIf(pa is None, 'pyarrow не установлен.')
+class SnapshotTests(IsolatedTestMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+        author = create_user('author')
+        ingredients = create_ingredients(2)
+        self.recipes = [
+            create_recipe(author, ingredients=ingredients) for _ in range(5)
+        ]
+        FavoriteRecipe.objects.create(user=author, recipe=self.recipes[0])
+
+    def read(self, table):
+        return pq.read_table(os.path.join(self.output, table))
+
+    def parts(self, table) -> list:
+        return sorted(os.listdir(os.path.join(self.output, table)))
+
+    def test_tables_exported_in_chunks(self):
+        exported = export_snapshot(self.output, jobs=2, chunk_size=2)
+        self.assertEqual(exported['recipes'], 5)
+        self.assertEqual(exported['recipe_ingredients'], 10)
+        self.assertEqual(exported['favorite_recipes'], 1)
+        self.assertEqual(exported['follows'], 0)
+
+        self.assertEqual(len(self.parts('recipes')), 3)
+        self.assertEqual(
+            self.read('recipes').column('id').to_pylist(),
+            [recipe.pk for recipe in self.recipes]
+        )
+        units = self.read('recipe_ingredients').column('measurement_unit')
+        self.assertTrue(pa.types.is_dictionary(units.type))
+        self.assertEqual(self.read('follows').num_rows, 0)
+
+        with open(os.path.join(self.output, MANIFEST)) as manifest:
+            state = json.load(manifest)['tables']['recipes']
+        self.assertEqual(state, {
+            'last_id': self.recipes[-1].pk, 'parts': 3, 'rows': 5,
+            'done': True
+        })
+
+    def test_resume_skips_finished_tables(self):
+        export_snapshot(self.output, tables=['recipes'], chunk_size=2)
+        create_recipe(self.recipes[0].author)
+
+        exported = export_snapshot(self.output, resume=True, chunk_size=2)
+        self.assertEqual(exported['recipes'], 5)
+        self.assertEqual(exported['recipe_ingredients'], 10)
+        self.assertEqual(len(self.parts('recipes')), 3)
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command(
+            'export_snapshot', self.output, tables=['recipes'], stdout=stdout
+        )
+        self.assertEqual(stdout.getvalue(), 'recipes: 5 строк.\n')
+
+        with self.assertRaises(CommandError):
+            call_command(
+                'export_snapshot', os.path.join(self.output, 'missing'),
+                resume=True
+            )
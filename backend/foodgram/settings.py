@@ -33,13 +33,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ResponseCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'foodgram.urls'
@@ -64,12 +68,55 @@ WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        'ENGINE': os.getenv('DB_ENGINE', default='core.backends.postgresql'),
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default=''),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default=''),
         'HOST': os.getenv('DB_HOST', default=''),
-        'PORT': os.getenv('DB_PORT', default='')
+        'PORT': os.getenv('DB_PORT', default=''),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+    }
+}
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', default=10))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', default=10))
+DB_CONN_HEALTH_CHECKS = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', default='false').lower() == 'true'
+)
+DB_PREPARED_STATEMENTS = (
+    os.getenv('DB_PREPARED_STATEMENTS', default='false').lower() == 'true'
+)
+DB_PREPARED_STATEMENTS_SIZE = 100
+DB_PREPARE_THRESHOLD = 5
+
+DB_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))
+):
+    host, _, port = address.partition(':')
+    DB_REPLICAS.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DB_REPLICA_SELECTION = os.getenv('DB_REPLICA_SELECTION', default='round_robin')
+DB_REPLICA_RETRY_SECONDS = int(
+    os.getenv('DB_REPLICA_RETRY_SECONDS', default=30)
+)
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', default=10))
+DB_REPLICA_LAG_CHECK_SECONDS = 5
+DB_PRIMARY_PIN_SECONDS = int(os.getenv('DB_PRIMARY_PIN_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
     }
 }
 
@@ -92,18 +139,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', default='json')
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer'
+        if API_JSON_BACKEND == 'orjson'
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser'
+        if API_JSON_BACKEND == 'orjson'
+        else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
+    'DEFAULT_THROTTLE_RATES': {
+        'export': os.getenv('EXPORT_THROTTLE_RATE', default='10/hour'),
+    },
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -147,3 +215,91 @@ DJOSER = {
         'current_user': 'api.serializers.UserSerializer',
     },
 }
+
+
+FEED_FANOUT_LIMIT = int(os.getenv('FEED_FANOUT_LIMIT', default=10000))
+FEED_BACKFILL_SIZE = int(os.getenv('FEED_BACKFILL_SIZE', default=50))
+FEED_BATCH_SIZE = int(os.getenv('FEED_BATCH_SIZE', default=1000))
+FEED_CELEBRITIES_TIMEOUT = int(
+    os.getenv('FEED_CELEBRITIES_TIMEOUT', default=300)
+)
+
+MATCH_INDEX_TTL = int(os.getenv('MATCH_INDEX_TTL', default=300))
+MATCH_INDEX_CHECK_SECONDS = int(
+    os.getenv('MATCH_INDEX_CHECK_SECONDS', default=5)
+)
+MATCH_INDEX_MAX_REPLAY = 1000
+MATCH_INDEX_CHUNK_SIZE = 10000
+MATCH_MAX_MISSING = 5
+MATCH_MAX_INGREDIENTS = 50
+MATCH_RESULTS_LIMIT = 50
+
+SIMILAR_TOP_K = 20
+SIMILAR_MAX_POSTING = int(os.getenv('SIMILAR_MAX_POSTING', default=5000))
+
+RECOMMEND_TOP_N = 100
+RECOMMEND_NEIGHBOURS = 50
+RECOMMEND_BATCH_SIZE = 1000
+RECOMMEND_CHUNK_SIZE = 100000
+
+RELATIONS_BULK_LIMIT = 100
+
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', default=10000))
+TOKEN_CACHE_TIMEOUT = int(os.getenv('TOKEN_CACHE_TIMEOUT', default=600))
+TOKEN_CACHE_LOCAL_TIMEOUT = int(
+    os.getenv('TOKEN_CACHE_LOCAL_TIMEOUT', default=30)
+)
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', default=1024))
+COMPRESS_CONTENT_TYPES = (
+    'application/json',
+    'text/html',
+    'text/plain',
+)
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BR_QUALITY = 5
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=0))
+API_CACHE_PATHS = r'^/api/(recipes|selections)/'
+API_CACHE_LOCK_TIMEOUT = int(os.getenv('API_CACHE_LOCK_TIMEOUT', default=30))
+API_CACHE_LOCK_POLL = 0.05
+API_CACHE_XFETCH_BETA = float(os.getenv('API_CACHE_XFETCH_BETA', default=1))
+API_LIST_PROJECTIONS = (
+    os.getenv('API_LIST_PROJECTIONS', default='true').lower() == 'true'
+)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=1000))
+SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', default=500))
+SYNC_LAG = int(os.getenv('SYNC_LAG', default=5))
+RQL_CACHE_SIZE = int(os.getenv('RQL_CACHE_SIZE', default=500))
+CATALOGUE_CHECK_SECONDS = int(
+    os.getenv('CATALOGUE_CHECK_SECONDS', default=5)
+)
+CATALOGUE_MAX_AGE = int(os.getenv('CATALOGUE_MAX_AGE', default=300))
+FACETS_CACHE_TIMEOUT = int(os.getenv('FACETS_CACHE_TIMEOUT', default=60))
+FACETS_COOKING_TIME_BOUNDS = (15, 30, 60, 120, 240)
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', default=100))
+RQL_MAX_NAMESPACES = int(os.getenv('RQL_MAX_NAMESPACES', default=3))
+RQL_MAX_SEARCH_TERMS = int(os.getenv('RQL_MAX_SEARCH_TERMS', default=4))
+RQL_MAX_PLAN_COST = float(os.getenv('RQL_MAX_PLAN_COST', default=500000))
+RQL_COST_CACHE_TIMEOUT = 300
+LIST_STATEMENT_TIMEOUT = int(os.getenv('LIST_STATEMENT_TIMEOUT', default=3000))
+FACETS_STATEMENT_TIMEOUT = int(
+    os.getenv('FACETS_STATEMENT_TIMEOUT', default=5000)
+)
+SLOW_QUERY_THRESHOLD = int(os.getenv('SLOW_QUERY_THRESHOLD', default=0))
+SLOW_QUERY_LOG = os.getenv(
+    'SLOW_QUERY_LOG', default=os.path.join(BASE_DIR, 'slow_queries.jsonl')
+)
+UPLOAD_TEMP_DIR = os.getenv(
+    'UPLOAD_TEMP_DIR', default=os.path.join(BASE_DIR, 'uploads')
+)
+UPLOAD_CHUNK_SIZE = int(
+    os.getenv('UPLOAD_CHUNK_SIZE', default=5 * 1024 * 1024)
+)
+UPLOAD_BUFFER_SIZE = 64 * 1024
+UPLOAD_MAX_IMAGE_SIZE = int(
+    os.getenv('UPLOAD_MAX_IMAGE_SIZE', default=10 * 1024 * 1024)
+)
+UPLOAD_MAX_VIDEO_SIZE = int(
+    os.getenv('UPLOAD_MAX_VIDEO_SIZE', default=500 * 1024 * 1024)
+)
+UPLOAD_TTL = int(os.getenv('UPLOAD_TTL', default=24))
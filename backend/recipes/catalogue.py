@@ -0,0 +1,114 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Cuisine, Equipment, Ingredient, Tag
+
+
+class Catalogue:
+    '''
+    Справочник в памяти процесса: все объекты модели по id и по имени.
+    Версия справочника хранится в общем кэше и меняется при каждом
+    сохранении или удалении объекта, поэтому остальные процессы
+    перечитывают справочник не позже чем через CATALOGUE_CHECK_SECONDS.
+
+    bulk_create, update() и SQL мимо ORM сигналов не посылают, поэтому
+    объект, которого нет в справочнике, ищется в базе и добавляется
+    в него, а сам справочник перечитывается не реже чем раз
+    в CATALOGUE_MAX_AGE секунд.
+    '''
+
+    def __init__(self, model, slug_field='name'):
+        self.model = model
+        self.slug_field = slug_field
+        self.version_key = f'catalogue:{model._meta.label_lower}'
+        self.version = None
+        self.checked_at = None
+        self.loaded_at = None
+        self.by_pk = {}
+        self.by_slug = {}
+        self.lock = threading.Lock()
+
+    def load(self, version) -> None:
+        by_pk = self.model.objects.in_bulk()
+        by_slug = {
+            getattr(obj, self.slug_field): obj for obj in by_pk.values()
+        }
+        with self.lock:
+            self.by_pk, self.by_slug = by_pk, by_slug
+            self.version = version
+            self.checked_at = self.loaded_at = time.monotonic()
+
+    def remember(self, objs) -> None:
+        with self.lock:
+            for obj in objs:
+                self.by_pk[obj.pk] = obj
+                self.by_slug[getattr(obj, self.slug_field)] = obj
+
+    def ensure_fresh(self) -> None:
+        if (
+            self.checked_at is not None
+            and time.monotonic() - self.checked_at
+            < settings.CATALOGUE_CHECK_SECONDS
+        ):
+            return
+        version = cache.get(self.version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(
+                self.version_key, version, settings.CATALOGUE_MAX_AGE
+            ):
+                version = cache.get(self.version_key)
+        if (
+            self.checked_at is None
+            or version != self.version
+            or time.monotonic() - self.loaded_at > settings.CATALOGUE_MAX_AGE
+        ):
+            self.load(version)
+        else:
+            self.checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        cache.set(
+            self.version_key, uuid.uuid4().hex, settings.CATALOGUE_MAX_AGE
+        )
+        with self.lock:
+            self.checked_at = None
+
+    def get(self, pk):
+        self.ensure_fresh()
+        obj = self.by_pk.get(pk)
+        if obj is None:
+            obj = self.model.objects.filter(pk=pk).first()
+            if obj is not None:
+                self.remember([obj])
+        return obj
+
+    def get_by_slug(self, slug):
+        self.ensure_fresh()
+        obj = self.by_slug.get(slug)
+        if obj is None:
+            obj = self.model.objects.filter(**{self.slug_field: slug}).first()
+            if obj is not None:
+                self.remember([obj])
+        return obj
+
+    def in_bulk(self, pks) -> dict:
+        self.ensure_fresh()
+        missing = [pk for pk in pks if pk not in self.by_pk]
+        if missing:
+            self.remember(self.model.objects.in_bulk(missing).values())
+        return {pk: self.by_pk[pk] for pk in pks if pk in self.by_pk}
+
+
+CATALOGUES = {
+    model: Catalogue(model)
+    for model in (Tag, Cuisine, Category, Equipment, Ingredient)
+}
+
+
+def catalogue(model) -> Catalogue:
+    return CATALOGUES[model]
@@ -0,0 +1,96 @@
+import base64
+import binascii
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from users.models import Follow
+
+from .models import (ChangeLog, FavoriteRecipe, FavoriteSelection, Recipe,
+                     Selection, SelectionRecipe)
+
+TRACKED = {
+    Recipe: (ChangeLog.RECIPE, 'pk', None),
+    Selection: (ChangeLog.SELECTION, 'pk', None),
+    SelectionRecipe: (ChangeLog.SELECTION, 'selection_id', None),
+    FavoriteRecipe: (ChangeLog.FAVORITE_RECIPE, 'recipe_id', 'user_id'),
+    FavoriteSelection: (
+        ChangeLog.FAVORITE_SELECTION, 'selection_id', 'user_id'
+    ),
+    Follow: (ChangeLog.FOLLOW, 'following_id', 'user_id'),
+}
+
+
+def log_changes(kind, object_ids, user_id=None, deleted=False) -> None:
+    ChangeLog.objects.bulk_create([
+        ChangeLog(
+            kind=kind, object_id=object_id, user_id=user_id, deleted=deleted
+        )
+        for object_id in object_ids
+    ])
+
+
+def log_instance(instance, deleted=False) -> None:
+    kind, object_field, user_field = TRACKED[type(instance)]
+    log_changes(
+        kind,
+        [getattr(instance, object_field)],
+        getattr(instance, user_field) if user_field else None,
+        deleted
+    )
+
+
+def encode_token(sequence) -> str:
+    return base64.urlsafe_b64encode(
+        f'v1:{sequence}'.encode()
+    ).decode().rstrip('=')
+
+
+def decode_token(token):
+    '''Номер изменения из токена или None, если токен испорчен.'''
+    try:
+        version, sequence = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)
+        ).decode().split(':')
+        if version != 'v1':
+            return None
+        return int(sequence)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def head() -> int:
+    '''
+    Последний номер изменения, который можно отдавать клиентам.
+    Изменения младше SYNC_LAG секунд не учитываются: их транзакции
+    могли ещё не зафиксироваться вместе с более ранними номерами.
+    '''
+    border = timezone.now() - timedelta(seconds=settings.SYNC_LAG)
+    return ChangeLog.objects.filter(created__lte=border).aggregate(
+        head=Max('id')
+    )['head'] or 0
+
+
+def changes_since(user, since, limit=None):
+    '''
+    Изменения после since, видимые пользователю. Для каждого объекта
+    остаётся только последнее изменение. Возвращает словарь
+    {тип: {id объекта: удалён ли}}, номер последнего просмотренного
+    изменения и признак того, что изменения ещё остались.
+    '''
+    limit = limit or settings.SYNC_BATCH_SIZE
+    entries = list(ChangeLog.objects.filter(
+        Q(user=None) | Q(user=user), id__gt=since, id__lte=head()
+    ).order_by('id').values_list('id', 'kind', 'object_id', 'deleted')[
+        :limit + 1
+    ])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changes = {kind: {} for kind, _ in ChangeLog.KINDS}
+    for _, kind, object_id, deleted in entries:
+        changes[kind][object_id] = deleted
+    last = entries[-1][0] if entries else since
+    return changes, last, has_more
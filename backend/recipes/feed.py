@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from users.models import Follow
+
+from .models import FeedEntry, Recipe
+
+CELEBRITIES_CACHE_KEY = 'feed:celebrities'
+
+
+def get_celebrities() -> set:
+    '''
+    Авторы, у которых подписчиков больше FEED_FANOUT_LIMIT.
+    Их рецепты не раскладываются по лентам при создании,
+    а подтягиваются в ленту при чтении.
+    '''
+    celebrities = cache.get(CELEBRITIES_CACHE_KEY)
+    if celebrities is None:
+        celebrities = set(
+            Follow.objects.values('following').annotate(
+                followers=Count('id')
+            ).filter(
+                followers__gt=settings.FEED_FANOUT_LIMIT
+            ).values_list('following', flat=True)
+        )
+        cache.set(
+            CELEBRITIES_CACHE_KEY, celebrities,
+            settings.FEED_CELEBRITIES_TIMEOUT
+        )
+    return celebrities
+
+
+def add_entries(user_ids, recipes) -> None:
+    entries = [
+        FeedEntry(user_id=user_id, recipe_id=recipe.id, created=recipe.created)
+        for user_id in user_ids
+        for recipe in recipes
+    ]
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fan_out(recipe) -> None:
+    '''Раскладывает новый рецепт по лентам подписчиков автора.'''
+    if recipe.author_id in get_celebrities():
+        return
+
+    followers = Follow.objects.filter(
+        following_id=recipe.author_id
+    ).values_list('user_id', flat=True)
+    add_entries(followers.iterator(), [recipe])
+
+
+def backfill(user_id, author_id) -> None:
+    '''Добавляет в ленту последние рецепты автора после подписки.'''
+    recipes = Recipe.objects.filter(author_id=author_id).only(
+        'id', 'created'
+    ).order_by('-created')[:settings.FEED_BACKFILL_SIZE]
+    add_entries([user_id], recipes)
+
+
+def remove_author(user_id, author_id) -> None:
+    FeedEntry.objects.filter(
+        user_id=user_id, recipe__author_id=author_id
+    ).delete()
+
+
+def pull_celebrities(user) -> None:
+    '''
+    Fan-out on read: подтягивает в ленту пользователя свежие рецепты
+    популярных авторов, на которых он подписан.
+    '''
+    celebrities = get_celebrities()
+    if not celebrities:
+        return
+
+    following = Follow.objects.filter(
+        user=user, following_id__in=celebrities
+    ).values_list('following_id', flat=True)
+    recipes = Recipe.objects.filter(author_id__in=following).only(
+        'id', 'created'
+    ).order_by('-created')[:settings.FEED_BACKFILL_SIZE]
+    add_entries([user.id], recipes)
+
+
+def get_feed(user, first_page=True):
+    '''
+    Лента пользователя. Рецепты популярных авторов подтягиваются только
+    при запросе первой страницы: дальше клиент листает уже собранную
+    ленту.
+    '''
+    if first_page:
+        pull_celebrities(user)
+    return FeedEntry.objects.filter(user=user)
@@ -0,0 +1,220 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import RecipeIngredient
+
+CHANGES_KEY = 'matching:changes'
+
+
+def change_key(number) -> str:
+    return f'{CHANGES_KEY}:{number}'
+
+
+def publish(recipe_id) -> None:
+    '''
+    Сообщает другим процессам об изменении рецепта: номер изменения
+    берётся из счётчика в общем кэше, id рецепта хранится под этим
+    номером MATCH_INDEX_TTL секунд.
+    '''
+    cache.add(CHANGES_KEY, 0, None)
+    try:
+        number = cache.incr(CHANGES_KEY)
+    except ValueError:
+        return
+    cache.set(change_key(number), recipe_id, settings.MATCH_INDEX_TTL)
+
+
+class IngredientIndex:
+    '''
+    Инвертированный индекс в памяти процесса: ингредиент -> число
+    ингредиентов рецепта -> отсортированный массив id рецептов.
+    Рецепт, в котором ингредиентов больше, чем have + max_missing,
+    подойти не может, поэтому такие списки при поиске не читаются.
+
+    Индекс перестраивает один поток, остальные тем временем читают
+    старый; рецепты, изменённые во время перестройки, применяются
+    к новому индексу заново. Изменения из других процессов приходят
+    через общий кэш (publish) и применяются не позже чем через
+    MATCH_INDEX_CHECK_SECONDS; если часть из них уже вытеснена из кэша,
+    индекс перестраивается целиком.
+    '''
+
+    def __init__(self):
+        self.postings = {}
+        self.recipes = {}
+        self.built_at = None
+        self.checked_at = None
+        self.seen = 0
+        self.pending = None
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+
+    def read(self) -> tuple:
+        recipes = {}
+        rows = RecipeIngredient.objects.order_by(
+            'recipe_id', 'ingredient_id'
+        ).values_list('recipe_id', 'ingredient_id').iterator(
+            chunk_size=settings.MATCH_INDEX_CHUNK_SIZE
+        )
+        for recipe_id, ingredient_id in rows:
+            recipes.setdefault(recipe_id, array('l')).append(ingredient_id)
+
+        postings = {}
+        for recipe_id, ingredient_ids in recipes.items():
+            for ingredient_id in ingredient_ids:
+                postings.setdefault(ingredient_id, {}).setdefault(
+                    len(ingredient_ids), array('l')
+                ).append(recipe_id)
+        return postings, recipes
+
+    def build(self) -> None:
+        with self.lock:
+            self.pending = set()
+        seen = cache.get(CHANGES_KEY, 0)
+        try:
+            postings, recipes = self.read()
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with self.lock:
+            self.postings = postings
+            self.recipes = recipes
+            self.built_at = self.checked_at = time.monotonic()
+            self.seen = seen
+            pending, self.pending = self.pending, None
+        for recipe_id in pending:
+            self.update_recipe(recipe_id)
+
+    def sync(self) -> None:
+        '''Применяет изменения из других процессов.'''
+        self.checked_at = time.monotonic()
+        last = cache.get(CHANGES_KEY, 0)
+        if last == self.seen:
+            return
+        keys = [
+            change_key(number) for number in range(self.seen + 1, last + 1)
+        ]
+        if not keys or len(keys) > settings.MATCH_INDEX_MAX_REPLAY:
+            self.build()
+            return
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            self.build()
+            return
+        for recipe_id in set(changes.values()):
+            self.update_recipe(recipe_id)
+        self.seen = last
+
+    def is_stale(self) -> bool:
+        return (
+            self.built_at is None
+            or time.monotonic() - self.built_at > settings.MATCH_INDEX_TTL
+        )
+
+    def should_sync(self) -> bool:
+        return (
+            time.monotonic() - self.checked_at
+            >= settings.MATCH_INDEX_CHECK_SECONDS
+        )
+
+    def ensure_fresh(self) -> None:
+        if not self.is_stale() and not self.should_sync():
+            return
+        # Без индекса ждём первую сборку, устаревший читаем до замены.
+        if not self.build_lock.acquire(blocking=self.built_at is None):
+            return
+        try:
+            if self.is_stale():
+                self.build()
+            elif self.should_sync():
+                self.sync()
+        finally:
+            self.build_lock.release()
+
+    def remember(self, recipe_id) -> None:
+        if self.pending is not None:
+            self.pending.add(recipe_id)
+
+    def remove_recipe(self, recipe_id) -> None:
+        with self.lock:
+            self.remember(recipe_id)
+            ingredient_ids = self.recipes.pop(recipe_id, ())
+            for ingredient_id in ingredient_ids:
+                posting = self.postings.get(ingredient_id, {}).get(
+                    len(ingredient_ids)
+                )
+                if posting is None:
+                    continue
+                position = bisect_left(posting, recipe_id)
+                if (
+                    position < len(posting)
+                    and posting[position] == recipe_id
+                ):
+                    del posting[position]
+
+    def update_recipe(self, recipe_id) -> None:
+        with self.lock:
+            self.remember(recipe_id)
+        if self.built_at is None:
+            return
+
+        ingredient_ids = sorted(RecipeIngredient.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id', flat=True))
+
+        with self.lock:
+            self.remove_recipe(recipe_id)
+            if not ingredient_ids:
+                return
+            self.recipes[recipe_id] = array('l', ingredient_ids)
+            for ingredient_id in ingredient_ids:
+                insort(
+                    self.postings.setdefault(ingredient_id, {}).setdefault(
+                        len(ingredient_ids), array('l')
+                    ),
+                    recipe_id
+                )
+
+    def changed(self, recipe_id) -> None:
+        '''Изменение рецепта в этом процессе: сразу и для остальных.'''
+        publish(recipe_id)
+        self.update_recipe(recipe_id)
+
+    def match(self, have, max_missing=0) -> list:
+        '''
+        Рецепты, для которых не хватает не больше max_missing
+        ингредиентов. Отсортированы по доле имеющихся ингредиентов.
+        '''
+        self.ensure_fresh()
+        have = set(have)
+        max_size = len(have) + max_missing
+        hits = Counter()
+
+        with self.lock:
+            for ingredient_id in have:
+                for size, posting in self.postings.get(
+                    ingredient_id, {}
+                ).items():
+                    if size <= max_size:
+                        hits.update(posting)
+
+            matches = []
+            for recipe_id, matched in hits.items():
+                total = len(self.recipes[recipe_id])
+                missing = total - matched
+                if missing <= max_missing:
+                    matches.append((recipe_id, matched, missing, total))
+
+        matches.sort(key=lambda item: (-item[1] / item[3], item[2], -item[0]))
+        return matches
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,181 @@
+# Generated by Django 2.2.28 on 2026-10-19 19:40
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('name', models.CharField(help_text='Дайте название категории подборок', max_length=200, unique=True, verbose_name='Название')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Cuisine',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('name', models.CharField(max_length=200, unique=True, verbose_name='Название')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Equipment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Введите название', max_length=250, verbose_name='Название')),
+                ('description', models.TextField(blank=True, help_text='Добавьте описание', verbose_name='Описание')),
+                ('image', models.ImageField(help_text='Загрузите картинку', upload_to='equipment/images/', verbose_name='Картинка')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FavoriteRecipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FavoriteSelection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Введите название', max_length=200, verbose_name='Ингредиент')),
+                ('description', models.TextField(help_text='Опишите ингредиент', verbose_name='Описание')),
+                ('species', models.CharField(blank=True, help_text='Укажите подвид, если нужно', max_length=200, verbose_name='Подвид')),
+                ('image', models.ImageField(help_text='Загрузите картинку ингредиента', upload_to='ingredients/images', verbose_name='Фото')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('title', models.CharField(help_text='Дайте название рецепту', max_length=200, verbose_name='Название')),
+                ('description', models.TextField(blank=True, help_text='Опишите блюдо', verbose_name='Описание')),
+                ('servings', models.PositiveSmallIntegerField(default=1, help_text='Укажите кол-во порций', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)], verbose_name='Кол-во порций')),
+                ('cooking_time', models.PositiveSmallIntegerField(help_text='Укажите время, необходимое для приготовления блюда (мин)', validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(600)], verbose_name='Время приготовления')),
+                ('ending_phrase', models.TextField(blank=True, default='Приятного аппетита!', help_text='Завершите рецепт пожеланием приятного аппетита или вашей авторской фразой', verbose_name='Завершающая фраза')),
+                ('video', models.FileField(blank=True, help_text='Загрузите видео приготовления блюда по этому рецепту', null=True, upload_to='recipes/videos', verbose_name='Видео приготовления')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeImage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(help_text='Загрузите картинку готового блюда', upload_to='recipes/images/', verbose_name='Фото')),
+                ('is_cover', models.BooleanField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(help_text='Укажите количество', verbose_name='Количество')),
+                ('measurement_unit', models.CharField(choices=[('г', 'г'), ('кг', 'кг'), ('л', 'литр'), ('мл', 'мл'), ('ун', 'унция'), ('шт', 'шт'), ('щ', 'щепотка'), ('ч', 'чашка'), ('ч л', 'чайная ложка'), ('с л', 'столовая ложка'), ('д л', 'десертная ложка'), ('п', 'пинта'), ('пв', 'по вкусу')], help_text='Выберите единицу измерения', max_length=3, verbose_name='Единица измерения')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeReview',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('comment', models.CharField(help_text='Оставьте свой комментарий', max_length=500, verbose_name='Комментарий')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RecommendRecipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecommendSelection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Selection',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('title', models.CharField(help_text='Дайте название подборке', max_length=200, verbose_name='Название')),
+                ('description', models.TextField(blank=True, help_text='Опишите подборку', verbose_name='Описание')),
+                ('cover', models.ImageField(help_text='Загрузите обложку для подборки', upload_to='selections/', verbose_name='Картинка')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ShoppingCart',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Step',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serial_num', models.PositiveSmallIntegerField(help_text='Укажите порядковый номер шага', verbose_name='Порядковый номер')),
+                ('title', models.CharField(blank=True, help_text='Дайте короткое название шагу', max_length=200, verbose_name='Название')),
+                ('description', models.CharField(help_text='Опишите действия на этом шаге', max_length=500, verbose_name='Описание')),
+                ('note', models.CharField(blank=True, help_text='Добавьте уточняющие детали к описанию шага', max_length=250, verbose_name='Примечание')),
+                ('ingredients', models.ManyToManyField(help_text='Выберите ингредиенты, используемые на этом шаге', to='recipes.Ingredient', verbose_name='Ингредиенты')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='recipes.Recipe')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Добавьте тег', max_length=50, unique=True, verbose_name='Тег')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StepImage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(help_text='Загрузите фото к шагу', upload_to='recipes/steps/images/', verbose_name='Фото')),
+                ('step', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='recipes.Step')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SelectionRecipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Recipe')),
+                ('selection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Selection')),
+            ],
+        ),
+    ]
@@ -0,0 +1,169 @@
+# Generated by Django 2.2.28 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import recipes.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='selection',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='selections', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='selection',
+            name='category',
+            field=models.ForeignKey(on_delete=models.SET(recipes.models.get_default_category), related_name='selections', to='recipes.Category'),
+        ),
+        migrations.AddField(
+            model_name='selection',
+            name='favorited_by',
+            field=models.ManyToManyField(related_name='favorite_selections', through='recipes.FavoriteSelection', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='selection',
+            name='recommended_by',
+            field=models.ManyToManyField(related_name='recommend_selections', through='recipes.RecommendSelection', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recommendselection',
+            name='selection',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Selection'),
+        ),
+        migrations.AddField(
+            model_name='recommendselection',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recommendrecipe',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Recipe'),
+        ),
+        migrations.AddField(
+            model_name='recommendrecipe',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recipereview',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='recipes.Recipe'),
+        ),
+        migrations.AddField(
+            model_name='recipereview',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='ingredient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipes_info', to='recipes.Ingredient'),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingredients_info', to='recipes.Recipe'),
+        ),
+        migrations.AddField(
+            model_name='recipeimage',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='recipes.Recipe'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipes', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='cuisine',
+            field=models.ForeignKey(blank=True, help_text='Выберите кухню, к которой относится блюдо', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recipes', to='recipes.Cuisine', verbose_name='Национальная кухня'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='equipment',
+            field=models.ManyToManyField(help_text='Укажите используемое оборудование', to='recipes.Equipment', verbose_name='Оборудование'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorited_by',
+            field=models.ManyToManyField(related_name='favorite_recipes', through='recipes.FavoriteRecipe', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients',
+            field=models.ManyToManyField(help_text='Укажите ингредиенты, используемые в рецепте', through='recipes.RecipeIngredient', to='recipes.Ingredient', verbose_name='Ингредиенты'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='recommended_by',
+            field=models.ManyToManyField(related_name='recommend_recipes', through='recipes.RecommendRecipe', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='selections',
+            field=models.ManyToManyField(help_text='Добавьте рецепт в подборку', related_name='recipes', through='recipes.SelectionRecipe', to='recipes.Selection', verbose_name='Подборки'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tags',
+            field=models.ManyToManyField(help_text='Добавьте теги к рецепту', to='recipes.Tag', verbose_name='Теги'),
+        ),
+        migrations.AddField(
+            model_name='favoriteselection',
+            name='selection',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Selection'),
+        ),
+        migrations.AddField(
+            model_name='favoriteselection',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='favoriterecipe',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.Recipe'),
+        ),
+        migrations.AddField(
+            model_name='favoriterecipe',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='selectionrecipe',
+            constraint=models.UniqueConstraint(fields=('selection', 'recipe'), name='unique_selection_recipe'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendselection',
+            constraint=models.UniqueConstraint(fields=('user', 'selection'), name='unique_selection_recommend'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendrecipe',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_recipe_recommend'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_recipe_ingredient'),
+        ),
+        migrations.AddConstraint(
+            model_name='favoriteselection',
+            constraint=models.UniqueConstraint(fields=('user', 'selection'), name='unique_selection_favorite'),
+        ),
+        migrations.AddConstraint(
+            model_name='favoriterecipe',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_recipe_favorite'),
+        ),
+    ]
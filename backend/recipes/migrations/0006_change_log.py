@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0005_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('recipe', 'Рецепт'), ('selection', 'Подборка'), ('favorite_recipe', 'Избранный рецепт'), ('favorite_selection', 'Избранная подборка'), ('follow', 'Подписка')], max_length=20, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id объекта')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Удалён')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_change_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['created', 'id'], name='recipe_created_id_idx'),
+        ),
+    ]
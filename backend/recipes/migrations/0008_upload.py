@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-19 19:40
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import recipes.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0007_recipe_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('video', 'Видео'), ('image', 'Картинка')], max_length=10, verbose_name='Тип файла')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('size', models.BigIntegerField(verbose_name='Размер, байт')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Размер части, байт')),
+                ('file', models.FileField(blank=True, upload_to=recipes.models.upload_path, verbose_name='Собранный файл')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
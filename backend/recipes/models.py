@@ -1,3 +1,5 @@
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -68,6 +70,9 @@ class Tag(models.Model):
         help_text='Добавьте тег'
     )
 
+    class Meta:
+        ordering = ['name']
+
     def __str__(self) -> str:
         return self.name
 
@@ -263,8 +268,13 @@ class Recipe(CreatedModel):
         related_name='recommend_recipes'
     )
 
-    # class Meta:
-    #     ordering = ['-created']
+    class Meta:
+        # ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['created', 'id'], name='recipe_created_id_idx'
+            )
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -468,6 +478,181 @@ class RecommendSelection(models.Model):
         )
 
 
+class FeedEntry(models.Model):
+    '''Материализованная лента подписок: рецепт автора у подписчика.'''
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    created = models.DateTimeField('Дата создания рецепта')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'], name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-id'],
+                name='feed_user_created_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'Рецепт {self.recipe} в ленте у {self.user}'
+
+
+class SimilarRecipe(models.Model):
+    '''Предрасчитанные ближайшие соседи рецепта.'''
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='neighbours'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'], name='unique_similar_recipe')
+        ]
+        indexes = [
+            models.Index(
+                fields=['recipe', '-score'], name='similar_recipe_score_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'Рецепт {self.similar} похож на {self.recipe}'
+
+
+class UserRecommendation(models.Model):
+    '''Персональные рекомендации рецептов, рассчитанные офлайн.'''
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recipe_suggestions'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(verbose_name='Оценка')
+    rank = models.PositiveIntegerField(verbose_name='Позиция')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'], name='unique_user_recommendation'),
+            models.UniqueConstraint(
+                fields=['user', 'rank'],
+                name='unique_user_recommendation_rank'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'Рецепт {self.recipe} рекомендован для {self.user}'
+
+
+class ChangeLog(models.Model):
+    '''
+    Журнал изменений для синхронизации клиентов. Изменения рецептов
+    и подборок общие (user пустой), избранное и подписки видны только
+    своему пользователю.
+    '''
+    RECIPE = 'recipe'
+    SELECTION = 'selection'
+    FAVORITE_RECIPE = 'favorite_recipe'
+    FAVORITE_SELECTION = 'favorite_selection'
+    FOLLOW = 'follow'
+    KINDS = [
+        (RECIPE, 'Рецепт'),
+        (SELECTION, 'Подборка'),
+        (FAVORITE_RECIPE, 'Избранный рецепт'),
+        (FAVORITE_SELECTION, 'Избранная подборка'),
+        (FOLLOW, 'Подписка'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(
+        max_length=20, choices=KINDS, verbose_name='Тип объекта'
+    )
+    object_id = models.PositiveIntegerField(verbose_name='id объекта')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True,
+        verbose_name='Пользователь'
+    )
+    deleted = models.BooleanField(default=False, verbose_name='Удалён')
+    created = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    def __str__(self) -> str:
+        action = 'удалён' if self.deleted else 'изменён'
+        return f'{self.get_kind_display()} {self.object_id} {action}'
+
+
+def upload_path(instance, filename) -> str:
+    return f'{Upload.DIRECTORIES[instance.kind]}{filename}'
+
+
+class Upload(CreatedModel):
+    '''
+    Загрузка файла по частям. После сборки id загрузки служит токеном,
+    по которому файл прикрепляется к рецепту; использованная загрузка
+    удаляется, а файл остаётся за рецептом.
+    '''
+    VIDEO = 'video'
+    IMAGE = 'image'
+    KINDS = [
+        (VIDEO, 'Видео'),
+        (IMAGE, 'Картинка'),
+    ]
+    DIRECTORIES = {
+        VIDEO: 'recipes/videos/',
+        IMAGE: 'recipes/images/',
+    }
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name='Автор'
+    )
+    kind = models.CharField(
+        max_length=10, choices=KINDS, verbose_name='Тип файла'
+    )
+    filename = models.CharField(max_length=255, verbose_name='Имя файла')
+    size = models.BigIntegerField(verbose_name='Размер, байт')
+    chunk_size = models.PositiveIntegerField(
+        verbose_name='Размер части, байт'
+    )
+    file = models.FileField(
+        upload_to=upload_path,
+        blank=True,
+        verbose_name='Собранный файл'
+    )
+
+    def __str__(self) -> str:
+        return f'Загрузка {self.filename} пользователя {self.author}'
+
+
 class Step(models.Model):
     serial_num = models.PositiveSmallIntegerField(
         verbose_name='Порядковый номер',
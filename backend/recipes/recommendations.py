@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import transaction
+
+import numpy as np
+from scipy import sparse
+
+from .models import (FavoriteRecipe, FavoriteSelection, RecommendRecipe,
+                     RecommendSelection, UserRecommendation)
+
+SIGNAL_WEIGHTS = (
+    (FavoriteRecipe, 'recipe_id', 1.0),
+    (RecommendRecipe, 'recipe_id', 2.0),
+    (FavoriteSelection, 'selection__selectionrecipe__recipe_id', 0.5),
+    (RecommendSelection, 'selection__selectionrecipe__recipe_id', 1.0),
+)
+
+
+def load_interactions():
+    '''Матрица пользователь x рецепт из избранного и рекомендаций.'''
+    users, recipes, weights = [], [], []
+    for model, recipe_field, weight in SIGNAL_WEIGHTS:
+        rows = model.objects.exclude(**{recipe_field: None}).values_list(
+            'user_id', recipe_field
+        ).iterator(chunk_size=settings.RECOMMEND_CHUNK_SIZE)
+        chunk = np.fromiter(
+            (value for row in rows for value in row), dtype=np.int64
+        ).reshape(-1, 2)
+        users.append(chunk[:, 0])
+        recipes.append(chunk[:, 1])
+        weights.append(np.full(len(chunk), weight, dtype=np.float32))
+
+    user_ids, user_index = np.unique(
+        np.concatenate(users), return_inverse=True
+    )
+    recipe_ids, recipe_index = np.unique(
+        np.concatenate(recipes), return_inverse=True
+    )
+    matrix = sparse.csr_matrix(
+        (np.concatenate(weights), (user_index, recipe_index)),
+        shape=(len(user_ids), len(recipe_ids)),
+        dtype=np.float32
+    )
+    return user_ids, recipe_ids, matrix
+
+
+def item_similarity(matrix, neighbours):
+    '''
+    Косинусное сходство рецептов по совместной встречаемости.
+    У каждого рецепта остаются только neighbours ближайших соседей.
+    '''
+    binary = matrix.copy()
+    binary.data[:] = 1
+    cooccurrence = (binary.T @ binary).tocsr()
+    cooccurrence.setdiag(0)
+    cooccurrence.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(binary.sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    scale = sparse.diags(1 / norms)
+    similarity = (scale @ cooccurrence @ scale).tocsr()
+
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        if end - start > neighbours:
+            data = similarity.data[start:end]
+            data[np.argsort(data)[:-neighbours]] = 0
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def top_n(scores, seen, n):
+    '''Индексы и оценки n лучших рецептов строки, кроме уже известных.'''
+    mask = ~np.isin(scores.indices, seen)
+    indices, data = scores.indices[mask], scores.data[mask]
+    if len(data) > n:
+        best = np.argpartition(-data, n)[:n]
+        indices, data = indices[best], data[best]
+    order = np.argsort(-data, kind='stable')
+    return indices[order], data[order]
+
+
+def refresh(n=None, batch_size=None) -> int:
+    n = n or settings.RECOMMEND_TOP_N
+    batch_size = batch_size or settings.RECOMMEND_BATCH_SIZE
+    user_ids, recipe_ids, matrix = load_interactions()
+    similarity = item_similarity(matrix, settings.RECOMMEND_NEIGHBOURS)
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = matrix[start:start + batch_size]
+        scores = (batch @ similarity).tocsr()
+        rows = []
+        for offset in range(batch.shape[0]):
+            seen = batch.indices[
+                batch.indptr[offset]:batch.indptr[offset + 1]
+            ]
+            indices, data = top_n(scores[offset], seen, n)
+            user_id = int(user_ids[start + offset])
+            rows.extend(
+                UserRecommendation(
+                    user_id=user_id,
+                    recipe_id=int(recipe_ids[index]),
+                    score=float(score),
+                    rank=rank
+                )
+                for rank, (index, score) in enumerate(zip(indices, data))
+            )
+
+        with transaction.atomic():
+            UserRecommendation.objects.filter(
+                user_id__in=user_ids[start:start + batch_size].tolist()
+            ).delete()
+            UserRecommendation.objects.bulk_create(rows, batch_size=1000)
+
+    return len(user_ids)
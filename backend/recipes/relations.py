@@ -0,0 +1,77 @@
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .changelog import TRACKED, log_changes
+
+
+def _columns(model, field):
+    quote = connection.ops.quote_name
+    relation = model._meta.get_field(field)
+    return (
+        quote(model._meta.db_table),
+        quote(model._meta.get_field('user').column),
+        quote(relation.column),
+        quote(relation.related_model._meta.db_table),
+        quote(relation.target_field.column),
+    )
+
+
+def log_relations(model, user_id, ids, deleted=False) -> None:
+    '''Сырой SQL обходит сигналы, поэтому журнал пишется здесь.'''
+    if ids and model in TRACKED:
+        log_changes(TRACKED[model][0], ids, user_id, deleted)
+
+
+@transaction.atomic
+def add_relations(model, user_id, field, ids) -> list:
+    '''
+    Одним запросом добавляет связи пользователя с объектами.
+    Несуществующие объекты и уже существующие связи пропускаются.
+    Возвращает id объектов, для которых связь действительно создана.
+    '''
+    if not ids:
+        return []
+    table, user_column, object_column, target_table, target_pk = _columns(
+        model, field
+    )
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({user_column}, {object_column}) '
+            f'SELECT %s, {target_pk} FROM {target_table} '
+            f'WHERE {target_pk} IN ({placeholders}) '
+            f'ON CONFLICT DO NOTHING RETURNING {object_column}',
+            [user_id, *ids]
+        )
+        added = [row[0] for row in cursor.fetchall()]
+    log_relations(model, user_id, added)
+    return added
+
+
+@transaction.atomic
+def remove_relations(model, user_id, field, ids) -> list:
+    '''
+    Одним запросом удаляет связи пользователя с объектами.
+    Возвращает id объектов, для которых связь действительно удалена.
+    '''
+    if not ids:
+        return []
+    table, user_column, object_column, *_ = _columns(model, field)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {user_column} = %s '
+            f'AND {object_column} IN ({placeholders}) '
+            f'RETURNING {object_column}',
+            [user_id, *ids]
+        )
+        removed = [row[0] for row in cursor.fetchall()]
+    log_relations(model, user_id, removed, deleted=True)
+    return removed
+
+
+def count_relations(model, field, ids) -> dict:
+    counts = dict(model.objects.filter(**{f'{field}__in': ids}).values(
+        field
+    ).annotate(amount=Count('id')).values_list(field, 'amount'))
+    return {pk: counts.get(pk, 0) for pk in ids}
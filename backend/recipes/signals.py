@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Follow
+
+from . import feed
+from .catalogue import CATALOGUES
+from .changelog import TRACKED, log_changes, log_instance
+from .matching import ingredient_index, publish
+from .models import Recipe, RecipeIngredient, SelectionRecipe
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_fan_out(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: feed.fan_out(instance))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def ingredient_index_update(sender, instance, **kwargs):
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    transaction.on_commit(lambda: ingredient_index.changed(recipe_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def ingredient_index_remove(sender, instance, **kwargs):
+    recipe_id = instance.pk
+    ingredient_index.remove_recipe(recipe_id)
+    transaction.on_commit(lambda: publish(recipe_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_backfill(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            lambda: feed.backfill(instance.user_id, instance.following_id)
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_cleanup(sender, instance, **kwargs):
+    feed.remove_author(instance.user_id, instance.following_id)
+
+
+def changelog_save(sender, instance, **kwargs):
+    log_instance(instance)
+
+
+def changelog_delete(sender, instance, **kwargs):
+    log_instance(instance, deleted=True)
+
+
+for model in TRACKED:
+    post_save.connect(changelog_save, sender=model)
+    if model is not SelectionRecipe:
+        post_delete.connect(changelog_delete, sender=model)
+# Удаление рецепта из подборки - изменение подборки, а не её удаление.
+post_delete.connect(changelog_save, sender=SelectionRecipe)
+
+
+@receiver(m2m_changed, sender=SelectionRecipe)
+def changelog_selection_recipes(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    '''
+    add() и set() создают связи bulk_create, без post_save. Удаление
+    связей идёт через delete() и попадает в журнал по post_delete.
+    '''
+    if action != 'post_add' or not pk_set:
+        return
+    log_changes(
+        TRACKED[SelectionRecipe][0], [instance.pk] if reverse else pk_set
+    )
+
+
+def catalogue_invalidate(sender, **kwargs):
+    transaction.on_commit(CATALOGUES[sender].invalidate)
+
+
+for model in CATALOGUES:
+    post_save.connect(catalogue_invalidate, sender=model)
+    post_delete.connect(catalogue_invalidate, sender=model)
@@ -0,0 +1,120 @@
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Recipe, RecipeIngredient, SimilarRecipe
+
+FEATURE_WEIGHTS = {
+    'ingredient': 1.0,
+    'tag': 0.5,
+    'cuisine': 0.5,
+    'equipment': 0.25,
+}
+
+
+def load_features() -> dict:
+    '''Разреженные векторы рецептов: {recipe_id: {признак: вес}}.'''
+    features = defaultdict(dict)
+    sources = (
+        ('ingredient', RecipeIngredient.objects.values_list(
+            'recipe_id', 'ingredient_id'
+        )),
+        ('tag', Recipe.tags.through.objects.values_list(
+            'recipe_id', 'tag_id'
+        )),
+        ('equipment', Recipe.equipment.through.objects.values_list(
+            'recipe_id', 'equipment_id'
+        )),
+        ('cuisine', Recipe.objects.exclude(cuisine=None).values_list(
+            'id', 'cuisine_id'
+        )),
+    )
+    for kind, rows in sources:
+        weight = FEATURE_WEIGHTS[kind]
+        for recipe_id, value in rows.iterator(chunk_size=10000):
+            features[recipe_id][(kind, value)] = weight
+    return features
+
+
+def build_postings(features) -> dict:
+    '''
+    Признак -> рецепты. Слишком частые признаки (встречаются больше чем
+    в SIMILAR_MAX_POSTING рецептах) отбрасываются как стоп-слова.
+    '''
+    postings = defaultdict(list)
+    for recipe_id, vector in features.items():
+        for feature in vector:
+            postings[feature].append(recipe_id)
+    return {
+        feature: recipes for feature, recipes in postings.items()
+        if len(recipes) <= settings.SIMILAR_MAX_POSTING
+    }
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.features = load_features()
+        self.postings = build_postings(self.features)
+        self.norms = {
+            recipe_id: math.sqrt(sum(
+                weight ** 2 for feature, weight in vector.items()
+                if feature in self.postings
+            ))
+            for recipe_id, vector in self.features.items()
+        }
+
+    def candidates(self, recipe_id) -> set:
+        return {
+            other
+            for feature in self.features.get(recipe_id, ())
+            for other in self.postings.get(feature, ())
+            if other != recipe_id
+        }
+
+    def neighbours(self, recipe_id, k) -> list:
+        dots = defaultdict(float)
+        for feature, weight in self.features.get(recipe_id, {}).items():
+            for other in self.postings.get(feature, ()):
+                if other != recipe_id:
+                    dots[other] += weight ** 2
+
+        norm = self.norms.get(recipe_id)
+        if not norm:
+            return []
+        return heapq.nlargest(k, (
+            (dot / (norm * self.norms[other]), other)
+            for other, dot in dots.items()
+        ))
+
+
+def refresh(recipe_ids=None, k=None, batch_size=1000) -> int:
+    '''
+    Пересчитывает соседей. Если переданы recipe_ids, пересчитываются
+    только они и рецепты, у которых они могут оказаться в топе.
+    '''
+    k = k or settings.SIMILAR_TOP_K
+    index = SimilarityIndex()
+
+    if recipe_ids is None:
+        targets = set(Recipe.objects.values_list('id', flat=True))
+    else:
+        targets = set(recipe_ids)
+        for recipe_id in recipe_ids:
+            targets |= index.candidates(recipe_id)
+
+    targets = sorted(targets)
+    for start in range(0, len(targets), batch_size):
+        batch = targets[start:start + batch_size]
+        rows = [
+            SimilarRecipe(recipe_id=recipe_id, similar_id=other, score=score)
+            for recipe_id in batch
+            for score, other in index.neighbours(recipe_id, k)
+        ]
+        with transaction.atomic():
+            SimilarRecipe.objects.filter(recipe_id__in=batch).delete()
+            SimilarRecipe.objects.bulk_create(rows, batch_size=batch_size)
+
+    return len(targets)
@@ -0,0 +1,120 @@
+import base64
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.utils import timezone
+
+from PIL import Image
+
+from recipes.catalogue import CATALOGUES
+from recipes.models import (Category, Ingredient, Recipe, RecipeImage,
+                            RecipeIngredient, Selection, Step, Tag)
+
+User = get_user_model()
+
+UNIT = RecipeIngredient.MEASUREMENT_UNITS[0][0]
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def png() -> str:
+    '''Картинка в виде data URI, как её присылает клиент.'''
+    encoded = base64.b64encode(png_bytes()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def create_user(username, **fields) -> User:
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com',
+        password='password', **fields
+    )
+
+
+def create_ingredients(amount) -> list:
+    start = Ingredient.objects.count()
+    return [
+        Ingredient.objects.create(name=f'ingredient{number}')
+        for number in range(start, start + amount)
+    ]
+
+
+def create_recipe(author, title='Рецепт', tags=(), ingredients=(),
+                  steps=0, images=0, created=None, **fields) -> Recipe:
+    '''
+    Рецепт напрямую через ORM. tags - имена тегов, ingredients -
+    объекты Ingredient; created переписывается после сохранения,
+    потому что поле заполняется автоматически.
+    '''
+    fields.setdefault('cooking_time', 30)
+    recipe = Recipe.objects.create(author=author, title=title, **fields)
+    recipe.tags.set([Tag.objects.get_or_create(name=name)[0] for name in tags])
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(
+            recipe=recipe, ingredient=ingredient,
+            measurement_unit=UNIT, amount=1
+        )
+        for ingredient in ingredients
+    ])
+    for number in range(1, steps + 1):
+        Step.objects.create(
+            recipe=recipe, serial_num=number, title=f'Шаг {number}',
+            description='Описание шага'
+        )
+    for number in range(images):
+        RecipeImage.objects.create(
+            recipe=recipe, is_cover=number == 0,
+            image=ContentFile(png_bytes(), f'{number}.png')
+        )
+    if created is not None:
+        Recipe.objects.filter(pk=recipe.pk).update(created=created)
+        recipe.created = created
+    return recipe
+
+
+def create_selection(author, title='Подборка', recipes=()) -> Selection:
+    selection = Selection.objects.create(
+        title=title, author=author,
+        category=Category.objects.get_or_create(name='Категория')[0]
+    )
+    selection.recipes.set(recipes)
+    return selection
+
+
+def minutes_ago(minutes):
+    return timezone.now() - timedelta(minutes=minutes)
+
+
+class IsolatedTestMixin:
+    '''
+    Пустой общий кэш и справочники перед каждым тестом и отдельный
+    каталог MEDIA_ROOT на класс тестов.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for catalogue in CATALOGUES.values():
+            catalogue.invalidate()
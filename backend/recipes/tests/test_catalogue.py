@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from recipes.catalogue import CATALOGUES, Catalogue
+from recipes.models import Tag
+
+from .factories import IsolatedTestMixin
+
+
+@override_settings(CATALOGUE_CHECK_SECONDS=60, CATALOGUE_MAX_AGE=300)
+class CatalogueTests(IsolatedTestMixin, TransactionTestCase):
+    '''
+    Справочник сбрасывается сигналами в transaction.on_commit,
+    поэтому тесты идут в TransactionTestCase.
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.soup, self.salad = (
+            Tag.objects.create(name=name) for name in ('суп', 'салат')
+        )
+        self.catalogue = Catalogue(Tag)
+
+    def assert_cached(self, lookup, expected) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(lookup(), expected)
+        self.assertEqual(len(queries), 0)
+
+    def test_loaded_once(self):
+        self.assertEqual(self.catalogue.get(self.soup.pk), self.soup)
+        self.assert_cached(
+            lambda: self.catalogue.get_by_slug('салат'), self.salad
+        )
+        self.assert_cached(
+            lambda: self.catalogue.in_bulk([self.soup.pk, self.salad.pk]),
+            {self.soup.pk: self.soup, self.salad.pk: self.salad}
+        )
+
+    def test_objects_created_without_signals_are_found(self):
+        self.catalogue.get(self.soup.pk)
+        Tag.objects.bulk_create([Tag(name='обед'), Tag(name='ужин')])
+        lunch, dinner = Tag.objects.filter(name__in=('обед', 'ужин'))
+
+        self.assertEqual(self.catalogue.get_by_slug('обед'), lunch)
+        self.assertEqual(
+            self.catalogue.in_bulk([self.soup.pk, dinner.pk, 0]),
+            {self.soup.pk: self.soup, dinner.pk: dinner}
+        )
+        self.assert_cached(lambda: self.catalogue.get(dinner.pk), dinner)
+        self.assertIsNone(self.catalogue.get_by_slug('нет такого'))
+
+    def test_save_invalidates_other_processes(self):
+        self.catalogue.get(self.soup.pk)
+        version = cache.get(self.catalogue.version_key)
+
+        self.soup.name = 'суп-пюре'
+        self.soup.save()
+        self.assertNotEqual(cache.get(self.catalogue.version_key), version)
+        self.assertEqual(self.catalogue.get(self.soup.pk).name, 'суп')
+
+        with override_settings(CATALOGUE_CHECK_SECONDS=0):
+            self.assertEqual(self.catalogue.get(self.soup.pk).name, 'суп-пюре')
+            self.assert_cached(
+                lambda: self.catalogue.get(self.soup.pk), self.soup
+            )
+
+    def test_delete_invalidates(self):
+        self.catalogue.get(self.soup.pk)
+        self.salad.delete()
+        with override_settings(CATALOGUE_CHECK_SECONDS=0):
+            self.assertIsNone(self.catalogue.get_by_slug('салат'))
+
+    @override_settings(CATALOGUE_CHECK_SECONDS=0)
+    def test_reloaded_after_max_age(self):
+        self.catalogue.get(self.soup.pk)
+        Tag.objects.filter(pk=self.soup.pk).update(name='щи')
+        self.assertEqual(self.catalogue.get(self.soup.pk).name, 'суп')
+
+        self.catalogue.loaded_at -= 301
+        self.assertEqual(self.catalogue.get(self.soup.pk).name, 'щи')
+
+    def test_shared_catalogues(self):
+        self.assertIs(CATALOGUES[Tag].model, Tag)
+        self.assertEqual(CATALOGUES[Tag].get_by_slug('суп'), self.soup)
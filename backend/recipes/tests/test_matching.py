@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from recipes.matching import (CHANGES_KEY, IngredientIndex, change_key,
+                              ingredient_index)
+from recipes.models import RecipeIngredient
+
+from .factories import (UNIT, IsolatedTestMixin, create_ingredients,
+                        create_recipe, create_user)
+
+URL = '/api/recipes/match/'
+
+
+class IngredientIndexTests(IsolatedTestMixin, APITransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        ingredient_index.built_at = None
+        self.author = create_user('author')
+        self.salt, self.pepper, self.oil, self.flour = create_ingredients(4)
+        self.full = create_recipe(
+            self.author, ingredients=[self.salt, self.pepper]
+        )
+        self.larger = create_recipe(
+            self.author, ingredients=[self.salt, self.pepper, self.oil]
+        )
+        self.half = create_recipe(
+            self.author, ingredients=[self.salt, self.flour]
+        )
+        self.index = IngredientIndex()
+
+    def match_ids(self, index, have, max_missing=0) -> list:
+        return [
+            recipe_id for recipe_id, *_ in index.match(
+                [ingredient.pk for ingredient in have], max_missing
+            )
+        ]
+
+    def test_ranked_by_share_of_available_ingredients(self):
+        self.assertEqual(
+            self.index.match([self.salt.pk, self.pepper.pk], 1), [
+                (self.full.pk, 2, 0, 2),
+                (self.larger.pk, 2, 1, 3),
+                (self.half.pk, 1, 1, 2),
+            ]
+        )
+        self.assertEqual(
+            self.match_ids(self.index, [self.salt, self.pepper]),
+            [self.full.pk]
+        )
+
+    def test_recipes_larger_than_possible_are_not_scanned(self):
+        self.index.ensure_fresh()
+        self.assertEqual(
+            sorted(self.index.postings[self.salt.pk]), [2, 3]
+        )
+        self.assertEqual(self.match_ids(self.index, [self.salt], 1), [
+            self.half.pk, self.full.pk
+        ])
+
+    def test_changes_in_this_process_update_index(self):
+        self.assertEqual(
+            self.match_ids(ingredient_index, [self.oil]), []
+        )
+        with transaction.atomic():
+            recipe = create_recipe(self.author, ingredients=[self.oil])
+        self.assertEqual(
+            self.match_ids(ingredient_index, [self.oil]), [recipe.pk]
+        )
+
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=self.flour,
+            measurement_unit=UNIT, amount=1
+        )
+        self.assertEqual(self.match_ids(ingredient_index, [self.oil]), [])
+        self.assertEqual(
+            self.match_ids(ingredient_index, [self.oil, self.flour]),
+            [recipe.pk]
+        )
+
+        recipe.delete()
+        self.assertEqual(
+            self.match_ids(ingredient_index, [self.oil, self.flour]), []
+        )
+
+    @override_settings(MATCH_INDEX_CHECK_SECONDS=0)
+    def test_changes_from_other_process_are_replayed(self):
+        self.index.ensure_fresh()
+        built_at = self.index.built_at
+
+        with transaction.atomic():
+            recipe = create_recipe(self.author, ingredients=[self.oil])
+        self.full.delete()
+        self.assertEqual(
+            self.match_ids(self.index, [self.salt, self.pepper]), []
+        )
+        self.assertEqual(self.match_ids(self.index, [self.oil]), [recipe.pk])
+        self.assertEqual(self.index.built_at, built_at)
+
+    @override_settings(MATCH_INDEX_CHECK_SECONDS=0)
+    def test_rebuilds_when_changes_evicted(self):
+        self.index.ensure_fresh()
+        built_at = self.index.built_at
+
+        with transaction.atomic():
+            recipe = create_recipe(self.author, ingredients=[self.oil])
+        cache.delete(change_key(cache.get(CHANGES_KEY)))
+        self.assertEqual(self.match_ids(self.index, [self.oil]), [recipe.pk])
+        self.assertNotEqual(self.index.built_at, built_at)
+
+    def test_match_endpoint(self):
+        response = self.client.get(URL, {
+            'have': f'{self.salt.pk},{self.pepper.pk}', 'max_missing': 1
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [self.full.pk, self.larger.pk, self.half.pk]
+        )
+        self.assertEqual(response.data['results'][1]['missing_amount'], 1)
+
+    @override_settings(MATCH_MAX_INGREDIENTS=1)
+    def test_match_endpoint_limits_ingredients(self):
+        response = self.client.get(
+            URL, {'have': f'{self.salt.pk},{self.pepper.pk}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
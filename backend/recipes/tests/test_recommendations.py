@@ -0,0 +1,122 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import numpy as np
+from rest_framework import status
+from rest_framework.test import APITestCase
+from scipy import sparse
+
+from recipes.models import (FavoriteRecipe, FavoriteSelection, RecommendRecipe,
+                            UserRecommendation)
+from recipes.recommendations import item_similarity, refresh, top_n
+
+from .factories import (IsolatedTestMixin, create_recipe, create_selection,
+                        create_user)
+
+URL = '/api/recipes/recommended/'
+
+
+class SimilarityMathTests(SimpleTestCase):
+
+    def test_item_similarity_keeps_nearest_neighbours(self):
+        matrix = sparse.csr_matrix(np.array([
+            [1, 1, 1],
+            [1, 1, 0],
+            [2, 0, 0],
+        ], dtype=np.float32))
+        similarity = item_similarity(matrix, 2).toarray()
+        self.assertEqual(similarity.diagonal().tolist(), [0, 0, 0])
+        self.assertAlmostEqual(
+            similarity[0, 1], 2 / (3 ** 0.5 * 2 ** 0.5), places=6
+        )
+        self.assertAlmostEqual(similarity[1, 2], 1 / 2 ** 0.5, places=6)
+
+        pruned = item_similarity(matrix, 1).toarray()
+        self.assertEqual((pruned > 0).sum(axis=1).tolist(), [1, 1, 1])
+        self.assertEqual(pruned[0].argmax(), 1)
+
+    def test_top_n_skips_seen(self):
+        scores = sparse.csr_matrix(
+            np.array([[0.5, 0.9, 0.1, 0.7]], dtype=np.float32)
+        )
+        indices, data = top_n(scores, np.array([1]), 2)
+        self.assertEqual(indices.tolist(), [3, 0])
+        np.testing.assert_allclose(data, [0.7, 0.5])
+
+
+class RecommendationsTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = create_user('author')
+        self.soup, self.salad, self.cake, self.bread = (
+            create_recipe(author, title=title)
+            for title in ('Суп', 'Салат', 'Торт', 'Хлеб')
+        )
+        self.first, self.second, self.reader = (
+            create_user(name) for name in ('first', 'second', 'reader')
+        )
+        for user, recipes in (
+            (self.first, (self.soup, self.salad)),
+            (self.second, (self.soup, self.salad, self.cake)),
+            (self.reader, (self.soup,)),
+        ):
+            FavoriteRecipe.objects.bulk_create(
+                FavoriteRecipe(user=user, recipe=recipe) for recipe in recipes
+            )
+
+    def recommended(self, user) -> list:
+        return list(UserRecommendation.objects.filter(user=user).order_by(
+            'rank'
+        ).values_list('recipe_id', flat=True))
+
+    def test_item_based_recommendations(self):
+        self.assertEqual(refresh(), 3)
+        self.assertEqual(
+            self.recommended(self.reader), [self.salad.pk, self.cake.pk]
+        )
+        self.assertEqual(self.recommended(self.first), [self.cake.pk])
+        self.assertEqual(self.recommended(self.second), [])
+
+        refresh(n=1)
+        self.assertEqual(self.recommended(self.reader), [self.salad.pk])
+
+    def test_recommendations_and_selections_count(self):
+        RecommendRecipe.objects.create(user=self.reader, recipe=self.cake)
+        FavoriteSelection.objects.create(
+            user=self.first,
+            selection=create_selection(self.first, recipes=[self.bread])
+        )
+        refresh()
+        self.assertEqual(
+            self.recommended(self.reader), [self.salad.pk, self.bread.pk]
+        )
+        self.assertEqual(self.recommended(self.second), [self.bread.pk])
+        self.assertGreater(
+            UserRecommendation.objects.get(
+                user=self.reader, recipe=self.salad
+            ).score,
+            2 * UserRecommendation.objects.get(
+                user=self.reader, recipe=self.bread
+            ).score
+        )
+
+    def test_endpoint(self):
+        self.assertEqual(
+            self.client.get(URL).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        call_command('build_recommendations', stdout=io.StringIO())
+        self.client.force_authenticate(self.reader)
+        response = self.client.get(URL, {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [self.salad.pk]
+        )
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [self.cake.pk]
+        )
@@ -0,0 +1,102 @@
+import io
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import SimilarRecipe
+from recipes.similarity import SimilarityIndex, refresh
+
+from .factories import (IsolatedTestMixin, create_ingredients, create_recipe,
+                        create_user, minutes_ago)
+
+
+class SimilarRecipesTests(IsolatedTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = create_user('author')
+        self.ingredients = create_ingredients(4)
+        first, second, third, other = self.ingredients
+        created = minutes_ago(60)
+        self.recipe = create_recipe(
+            author, tags=['суп'], ingredients=[first, second, third],
+            created=created
+        )
+        self.same = create_recipe(
+            author, ingredients=[first, second, third], created=created
+        )
+        self.close = create_recipe(
+            author, ingredients=[first, second], created=created
+        )
+        self.unrelated = create_recipe(
+            author, ingredients=[other], created=created
+        )
+
+    def neighbours(self, recipe) -> list:
+        return list(SimilarRecipe.objects.filter(recipe=recipe).order_by(
+            '-score'
+        ).values_list('similar_id', flat=True))
+
+    def test_cosine_neighbours(self):
+        self.assertEqual(refresh(), 4)
+        self.assertEqual(
+            self.neighbours(self.recipe), [self.same.pk, self.close.pk]
+        )
+        self.assertEqual(self.neighbours(self.unrelated), [])
+        score = SimilarRecipe.objects.get(
+            recipe=self.recipe, similar=self.same
+        ).score
+        self.assertAlmostEqual(score, 3 / (3.25 ** 0.5 * 3 ** 0.5))
+
+        refresh(k=1)
+        self.assertEqual(self.neighbours(self.recipe), [self.same.pk])
+
+    @override_settings(SIMILAR_MAX_POSTING=2)
+    def test_frequent_features_ignored(self):
+        index = SimilarityIndex()
+        first, second, third, _ = self.ingredients
+        self.assertNotIn(('ingredient', first.pk), index.postings)
+        self.assertEqual(
+            sorted(index.postings[('ingredient', third.pk)]),
+            [self.recipe.pk, self.same.pk]
+        )
+        self.assertEqual(
+            index.candidates(self.close.pk), set()
+        )
+
+    def test_incremental_refresh(self):
+        refresh()
+        new = create_recipe(
+            create_user('other'), ingredients=self.ingredients[:3]
+        )
+        self.assertEqual(refresh([new.pk]), 4)
+        self.assertIn(new.pk, self.neighbours(self.recipe))
+        self.assertEqual(self.neighbours(self.unrelated), [])
+
+    def test_endpoint(self):
+        refresh()
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/similar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data],
+            [self.same.pk, self.close.pk]
+        )
+
+    def test_command(self):
+        refresh()
+        new = create_recipe(
+            create_user('other'), ingredients=self.ingredients[:1]
+        )
+        stdout = io.StringIO()
+        call_command(
+            'build_similar_recipes', since=minutes_ago(1).isoformat(),
+            stdout=stdout
+        )
+        self.assertIn('пересчитаны для 4 рецептов', stdout.getvalue())
+        self.assertIn(new.pk, self.neighbours(self.close))
+
+        with self.assertRaises(CommandError):
+            call_command('build_similar_recipes', since='вчера')
@@ -0,0 +1,168 @@
+import io
+import math
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import suppress
+
+from django.conf import settings
+from django.core.files import File
+
+from PIL import Image
+
+from .models import Upload
+
+EXTENSIONS = {
+    Upload.IMAGE: ('jpeg', 'jpg', 'png', 'gif', 'webp'),
+    Upload.VIDEO: ('mp4', 'webm', 'mov', 'mkv'),
+}
+
+
+def max_size(kind) -> int:
+    if kind == Upload.VIDEO:
+        return settings.UPLOAD_MAX_VIDEO_SIZE
+    return settings.UPLOAD_MAX_IMAGE_SIZE
+
+
+def extension(filename) -> str:
+    return os.path.splitext(filename)[1].lstrip('.').lower()
+
+
+def chunk_count(upload) -> int:
+    return max(1, math.ceil(upload.size / upload.chunk_size))
+
+
+def chunk_length(upload, number) -> int:
+    '''Длина части: все части, кроме последней, ровно chunk_size.'''
+    if number < chunk_count(upload) - 1:
+        return upload.chunk_size
+    return upload.size - upload.chunk_size * number
+
+
+def chunks_dir(upload) -> str:
+    return os.path.join(settings.UPLOAD_TEMP_DIR, str(upload.pk))
+
+
+def chunk_path(upload, number) -> str:
+    return os.path.join(chunks_dir(upload), str(number))
+
+
+def received_chunks(upload) -> list:
+    try:
+        names = os.listdir(chunks_dir(upload))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def write_chunk(upload, number, stream, length) -> bool:
+    '''
+    Переписывает часть из потока на диск блоками по UPLOAD_BUFFER_SIZE.
+    Часть пишется в отдельный временный файл и переименовывается только
+    целиком, поэтому оборванную передачу можно просто повторить, а
+    одновременные повторы одной части не пишут в один файл. Возвращает
+    False, если поток закончился раньше времени.
+    '''
+    os.makedirs(chunks_dir(upload), exist_ok=True)
+    target = tempfile.NamedTemporaryFile(
+        dir=chunks_dir(upload), prefix=f'{number}.', suffix='.part',
+        delete=False
+    )
+    written = 0
+    try:
+        with target:
+            while written < length:
+                block = stream.read(
+                    min(settings.UPLOAD_BUFFER_SIZE, length - written)
+                )
+                if not block:
+                    break
+                target.write(block)
+                written += len(block)
+        if written != length:
+            return False
+        os.replace(target.name, chunk_path(upload, number))
+        return True
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(target.name)
+
+
+class ChunksReader(io.RawIOBase):
+    '''Части загрузки по порядку как один поток, без склейки на диске.'''
+
+    def __init__(self, upload):
+        self.paths = [
+            chunk_path(upload, number)
+            for number in range(chunk_count(upload))
+        ]
+        self.current = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self.paths or self.current is not None:
+            if self.current is None:
+                self.current = open(self.paths.pop(0), 'rb')
+            read = self.current.readinto(buffer)
+            if read:
+                return read
+            self.current.close()
+            self.current = None
+        return 0
+
+    def close(self) -> None:
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def check_image(field) -> None:
+    try:
+        with field.open('rb'), Image.open(field) as image:
+            image.verify()
+    except Exception:
+        raise ValueError('Загруженный файл не является изображением.')
+
+
+def assemble(upload) -> None:
+    '''
+    Переписывает части прямо в хранилище одним потоком и удаляет их.
+    Ни часть, ни файл целиком в память не читаются, промежуточный
+    склеенный файл не создаётся. Картинка проверяется уже в хранилище
+    и удаляется, если не открывается.
+    '''
+    missing = sorted(
+        set(range(chunk_count(upload))) - set(received_chunks(upload))
+    )
+    if missing:
+        raise ValueError(
+            f'Не получены части: {", ".join(map(str, missing))}.'
+        )
+
+    name = f'{uuid.uuid4()}.{extension(upload.filename)}'
+    with io.BufferedReader(
+        ChunksReader(upload), settings.UPLOAD_BUFFER_SIZE
+    ) as stream:
+        content = File(stream)
+        content.size = upload.size
+        upload.file.save(name, content, save=False)
+    if upload.kind == Upload.IMAGE:
+        try:
+            check_image(upload.file)
+        except ValueError:
+            upload.file.delete(False)
+            raise
+    upload.save(update_fields=['file'])
+    shutil.rmtree(chunks_dir(upload), ignore_errors=True)
+
+
+def discard(upload) -> None:
+    '''Удаляет загрузку вместе с частями и собранным файлом.'''
+    shutil.rmtree(chunks_dir(upload), ignore_errors=True)
+    if upload.file:
+        upload.file.delete(False)
+    upload.delete()